@@ -0,0 +1,139 @@
+# Measures the memory held per million buffered metric points: by naive per-point Python objects (a dict, or a tuple
+# in a deque as the ring buffer sink used to keep them), by the compact Point_Buffer, and by the buffers of the
+# reporter built on it: Ring_Buffer_Sink and Metric_Batcher. The pending row group of Arrow_Sink is a Point_Buffer.
+# Each buffer is measured in a fresh interpreter, as memory freed by an earlier one would hide the growth of RSS.
+# Usage: python benchmark/benchmark_buffer_memory.py [--points 1000000] [--names 100]
+import argparse
+import collections
+import gc
+import os
+import subprocess
+import sys
+import tracemalloc
+
+import fakes
+import metric_batcher
+import metric_buffer
+import metric_sinks
+
+
+def resident_bytes():
+    """Get the resident set size of the process, on Linux.
+    """
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def measure(fill, points, names, traced: bool):
+    """Fill a buffer and measure the memory it holds.
+    :param fill: A function of (index, name) buffering one point, returning the buffer once called with None.
+    :param traced: Mark True to measure the allocations with tracemalloc, False to measure the growth of RSS, which
+    tracemalloc would inflate.
+    :return: The bytes held after buffering, per point.
+    """
+    gc.collect()
+    if traced:
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+    else:
+        before = resident_bytes()
+        if before is None:
+            return None
+    for index in range(points):
+        fill(index, names[index % len(names)])
+    buffer = fill(None, None)  # noqa: F841, keeps the buffer alive until measured
+    gc.collect()
+    if traced:
+        held = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+    else:
+        held = resident_bytes() - before
+    return held / points
+
+
+def dicts():
+    records = []
+
+    def fill(index, name):
+        if index is None:
+            return records
+        records.append({"name": name, "value": index * 0.5, "step": index, "timestamp": 1.7e9 + index})
+    return fill
+
+
+def tuples():
+    records = collections.deque()
+
+    def fill(index, name):
+        if index is None:
+            return records
+        records.append((1.7e9 + index, name, index * 0.5, index, None))
+    return fill
+
+
+def point_buffer():
+    points = metric_buffer.Point_Buffer()
+
+    def fill(index, name):
+        if index is None:
+            return points
+        points.append(name, index * 0.5, 1.7e9 + index, index)
+    return fill
+
+
+def ring_buffer_sink(points):
+    sink = metric_sinks.Ring_Buffer_Sink(capacity=points)
+
+    def fill(index, name):
+        if index is None:
+            return sink
+        sink.write(name, index * 0.5, step=index)
+    return fill
+
+
+def batcher(points):
+    batcher = metric_batcher.Metric_Batcher(lambda *args: None, batch_size=points, batch_interval=1e9)
+    run = fakes.Fake_Run()
+
+    def fill(index, name):
+        if index is None:
+            return batcher
+        batcher.add_value(run, name, index * 0.5)
+    return fill
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, default=1000000, help="Number of buffered points.")
+    parser.add_argument("--names", type=int, default=100, help="Number of distinct metric names.")
+    parser.add_argument("--variant", help=argparse.SUPPRESS)
+    parser.add_argument("--traced", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    variants = {"dict per point": dicts, "tuple per point in a deque": tuples, "Point_Buffer": point_buffer,
+                "Ring_Buffer_Sink": lambda: ring_buffer_sink(args.points),
+                "Metric_Batcher": lambda: batcher(args.points)}
+    if args.variant:
+        # The names are built at run time, as the names of reported metrics are, so they are not interned already.
+        names = ["".join(["metric_", str(index)]) for index in range(args.names)]
+        held = measure(variants[args.variant](), args.points, names, args.traced)
+        print(held if held is not None else "")
+        return
+
+    scale = 1000000 / 2 ** 20
+    print("%-28s %16s %16s" % ("buffer", "traced MiB/1M", "RSS MiB/1M"))
+    for name in variants:
+        results = []
+        for traced in (["--traced"], []):
+            output = subprocess.run([sys.executable, __file__, "--variant", name, "--points", str(args.points),
+                                     "--names", str(args.names)] + traced,
+                                    stdout=subprocess.PIPE, universal_newlines=True, check=True).stdout.strip()
+            results.append("%.1f" % (float(output) * scale) if output else "n/a")
+        print("%-28s %16s %16s" % (name, results[0], results[1]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# Measures the import time of condensed_binocular with `python -X importtime`, in a fresh interpreter.
+# Usage: python benchmark/benchmark_import_time.py [--module condensed_binocular] [--repeat 5] [--top 10] [--max-ms 200]
+# With --max-ms, the script exits with status 1 when the median import time exceeds the budget.
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+def import_times(module: str):
+    """Import a module in a fresh interpreter and parse the output of -X importtime.
+    :param module: The name of the module to import.
+    :return: A dict of cumulative import time in microseconds per imported module.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SRC_DIR, os.environ.get("PYTHONPATH")])))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import " + module],
+                            env=env, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="condensed_binocular", help="The module to import.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of fresh interpreters to import in.")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to list.")
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail when the median import time exceeds this.")
+    args = parser.parse_args()
+
+    runs = [import_times(args.module) for _ in range(args.repeat)]
+    median_ms = statistics.median(times[args.module] for times in runs) / 1000
+
+    print("import %s: %.1f ms (median of %d)" % (args.module, median_ms, args.repeat))
+    slowest = sorted(runs[-1].items(), key=lambda item: item[1], reverse=True)
+    for name, cumulative in slowest[1:args.top + 1]:
+        print("  %8.1f ms  %s" % (cumulative / 1000, name))
+
+    if args.max_ms is not None and median_ms > args.max_ms:
+        print("import time exceeds the budget of %.1f ms" % args.max_ms)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# Measures the resources left behind by many short runs in one process, like a HyperDrive sweep or a notebook:
+# each run creates a reporter, reports a few metrics and closes it. Prints the threads, open sockets and traced
+# memory after each batch of runs, with a reporter of its own per run and with reporters of a shared Reporter_Pool.
+# Usage: python benchmark/benchmark_many_runs.py [--runs 300] [--every 50] [--metrics 20]
+import argparse
+import gc
+import logging
+import os
+import threading
+import tracemalloc
+from unittest import mock
+
+from fakes import Fake_Ingestion_Server, Fake_Run, make_reporter
+import reporter_pool
+
+
+def open_sockets():
+    """Count the open sockets of the process, on Linux.
+    """
+    try:
+        descriptors = os.listdir("/proc/self/fd")
+    except OSError:
+        return None
+    count = 0
+    for descriptor in descriptors:
+        try:
+            count += os.readlink(os.path.join("/proc/self/fd", descriptor)).startswith("socket:")
+        except OSError:
+            pass
+    return count
+
+
+def run_many(new_reporter, runs, every, metrics):
+    """Create, use and close a reporter per run, printing the resources in use after every batch of runs.
+    """
+    names = ["metric_%d" % index for index in range(metrics)]
+    tracemalloc.start()
+    gc.collect()
+    started = tracemalloc.get_traced_memory()[0]
+    for run in range(1, runs + 1):
+        reporter = new_reporter(Fake_Run("Run_%d" % run))
+        for index, name in enumerate(names):
+            reporter.report_metric(name, index * 0.5)
+        reporter.close()
+        if run % every == 0:
+            gc.collect()
+            print("%5d runs: %3d threads  %3s sockets  %8.1f KiB" % (
+                run, threading.active_count(), open_sockets(),
+                (tracemalloc.get_traced_memory()[0] - started) / 1024))
+    tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=300, help="Number of runs.")
+    parser.add_argument("--every", type=int, default=50, help="Number of runs between two measurements.")
+    parser.add_argument("--metrics", type=int, default=20, help="Number of metrics reported per run.")
+    args = parser.parse_args()
+    logging.getLogger("opencensus").setLevel(logging.ERROR)
+
+    with Fake_Ingestion_Server() as ingestion:
+        print("a reporter of its own per run")
+        run_many(lambda run: make_reporter(run, ingestion), args.runs, args.every, args.metrics)
+
+        connection_key = "InstrumentationKey=00000000-0000-0000-0000-000000000000;IngestionEndpoint={}".format(
+            ingestion.endpoint)
+        with mock.patch.dict(os.environ, {"APP_INSIGHTS_CONNECTION_KEY": connection_key}):
+            pool = reporter_pool.Reporter_Pool()
+        print("reporters of a shared Reporter_Pool")
+        run_many(lambda run: make_reporter(run, ingestion, pool=pool), args.runs, args.every, args.metrics)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# Measures the throughput and overhead of each report_* method against a Fake_Run and a local AppInsights ingestion
+# endpoint: calls per second, per-call latency percentiles, CPU time per call and memory growth, for workloads with
+# many metric names, high frequency, parent reporting and several threads. The results are written as JSON, and
+# compared with the results of an earlier release when --baseline is given.
+# Usage: python benchmark/benchmark_suite.py [--calls 20000] [--names 100] [--threads 4] [--output results.json]
+#        [--baseline previous.json] [--only report_metric report_row] [--fake-exporter]
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from fakes import Fake_Ingestion_Server, make_reporter
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(values, rank):
+    """Get a percentile of sorted values with the nearest-rank method.
+    """
+    return values[max(0, -(-len(values) * rank // 100) - 1)]
+
+
+def workloads(names, image_path):
+    """The workloads of the suite: a name, the reporter options and a function of (reporter, index) making one call.
+    """
+    metric_names = ["metric_%d" % index for index in range(names)]
+    return [
+        ("report_metric", {}, lambda reporter, index: reporter.report_metric(metric_names[index % names], index * 0.5)),
+        ("report_metric_parent", {},
+         lambda reporter, index: reporter.report_metric(metric_names[index % names], index * 0.5,
+                                                        report_to_parent=True)),
+        ("report_metric_batched", {"batch_size": 100},
+         lambda reporter, index: reporter.report_metric(metric_names[index % names], index * 0.5)),
+        ("report_metric_non_blocking", {"non_blocking": True},
+         lambda reporter, index: reporter.report_metric(metric_names[index % names], index * 0.5)),
+        ("report_metric_thread_buffered", {"thread_buffering": True},
+         lambda reporter, index: reporter.report_metric(metric_names[index % names], index * 0.5)),
+        ("report_metrics", {},
+         lambda reporter, index: reporter.report_metrics({"loss": index * 0.5, "accuracy": 0.9, "lr": 0.001})),
+        ("report_metric_with_run_tagging", {},
+         lambda reporter, index: reporter.report_metric_with_run_tagging(metric_names[index % names], index * 0.5)),
+        ("report_list", {}, lambda reporter, index: reporter.report_list(metric_names[index % names], [1, 2, 3])),
+        ("report_row", {}, lambda reporter, index: reporter.report_row("rows", epoch=index, loss=index * 0.5)),
+        ("report_table", {},
+         lambda reporter, index: reporter.report_table("table", {"x": [1, 2, 3], "y": [0.1, 0.2, 0.3]})),
+        ("report_image", {}, lambda reporter, index: reporter.report_image("image", path=image_path)),
+    ]
+
+
+def run_calls(reporter, call, calls, threads):
+    """Make the calls from the given number of threads, timing each call.
+    :return: The sorted latencies in seconds, the wall time and the CPU time.
+    """
+    latencies = []
+    per_thread = max(1, calls // threads)
+    barrier = threading.Barrier(threads)
+
+    def work(offset):
+        timings = []
+        clock = time.perf_counter
+        barrier.wait()
+        for index in range(offset, offset + per_thread):
+            started = clock()
+            call(reporter, index)
+            timings.append(clock() - started)
+        latencies.extend(timings)
+
+    workers = [threading.Thread(target=work, args=(number * per_thread,)) for number in range(threads)]
+    wall_started, cpu_started = time.perf_counter(), time.process_time()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    reporter.flush()
+    wall, cpu = time.perf_counter() - wall_started, time.process_time() - cpu_started
+    return sorted(latencies), wall, cpu
+
+
+def measure_memory(reporter, call, calls):
+    """Make the calls under tracemalloc, which slows them down, so it is a pass of its own.
+    :return: The memory growth and peak in bytes.
+    """
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for index in range(calls):
+        call(reporter, index)
+    reporter.flush()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    growth = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return growth, peak
+
+
+def release(reporter):
+    """Close a reporter, which also detaches its exporter, so the exporters of earlier passes do not slow down the
+    next ones.
+    """
+    reporter.close()
+
+
+def benchmark(options, call, args, ingestion):
+    """Benchmark one workload with a fresh reporter per pass.
+    :return: The results of the workload, a JSON-serializable dictionary.
+    """
+    results = {}
+    for threads in sorted({1, args.threads}):
+        reporter = make_reporter(ingestion=ingestion, **options)
+        # Warm up, so the measures and views of the names are registered before timing.
+        for index in range(args.names):
+            call(reporter, index)
+        latencies, wall, cpu = run_calls(reporter, call, args.calls, threads)
+        release(reporter)
+        results["threads_%d" % threads] = {
+            "calls": len(latencies),
+            "calls_per_second": len(latencies) / wall,
+            "latency_us": dict({"p%d" % rank: percentile(latencies, rank) * 1e6 for rank in PERCENTILES},
+                               mean=sum(latencies) / len(latencies) * 1e6, max=latencies[-1] * 1e6),
+            "cpu_us_per_call": cpu / len(latencies) * 1e6,
+            "cpu_utilization": cpu / wall,
+        }
+
+    reporter = make_reporter(ingestion=ingestion, **options)
+    growth, peak = measure_memory(reporter, call, args.memory_calls)
+    release(reporter)
+    results["memory"] = {"calls": args.memory_calls, "growth_bytes": growth, "peak_bytes": peak,
+                         "growth_bytes_per_call": growth / args.memory_calls}
+    return results
+
+
+def git_revision():
+    """Get the git revision of the working tree, if any.
+    """
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    """Print the change of throughput and p99 latency of each workload against a baseline.
+    """
+    for name, workload in results["workloads"].items():
+        previous = baseline.get("workloads", {}).get(name)
+        if previous is None:
+            continue
+        for key, current in workload.items():
+            if key == "memory" or key not in previous:
+                continue
+            throughput = current["calls_per_second"] / previous[key]["calls_per_second"]
+            p99 = current["latency_us"]["p99"] / previous[key]["latency_us"]["p99"]
+            print("%-34s %-10s throughput %6.2fx  p99 latency %6.2fx" % (name, key, throughput, p99),
+                  file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20000, help="Number of timed calls per workload.")
+    parser.add_argument("--memory-calls", type=int, default=5000, help="Number of calls of the memory pass.")
+    parser.add_argument("--names", type=int, default=100, help="Number of distinct metric names.")
+    parser.add_argument("--threads", type=int, default=4, help="Number of threads of the multithreaded pass.")
+    parser.add_argument("--only", nargs="*", help="Names of the workloads to run, all by default.")
+    parser.add_argument("--fake-exporter", action="store_true",
+                        help="Drop the AppInsights metrics instead of exporting them to the local ingestion endpoint.")
+    parser.add_argument("--output", help="Path of the JSON results, standard output by default.")
+    parser.add_argument("--baseline", help="Path of earlier JSON results to compare with.")
+    args = parser.parse_args()
+    logging.getLogger("opencensus").setLevel(logging.ERROR)
+
+    with tempfile.NamedTemporaryFile(suffix=".png") as image, Fake_Ingestion_Server() as ingestion:
+        results = {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": {"calls": args.calls, "memory_calls": args.memory_calls, "names": args.names,
+                           "threads": args.threads, "fake_exporter": args.fake_exporter},
+            "workloads": {},
+        }
+        for name, options, call in workloads(args.names, image.name):
+            if args.only and name not in args.only:
+                continue
+            print("benchmarking %s" % name, file=sys.stderr)
+            results["workloads"][name] = benchmark(options, call, args,
+                                                   None if args.fake_exporter else ingestion)
+        results["ingestion"] = {"requests": ingestion.requests, "envelopes": ingestion.envelopes}
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            compare(results, json.load(file))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# Local stand-ins for the Azure services, so the benchmarks run without network access.
+import contextlib
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import condensed_binocular  # noqa: E402
+
+
+class Fake_Run:
+    """ An AML Run replacement that keeps the logged calls in memory.
+    """
+
+    def __init__(self, run_id="BenchmarkRun", parent=None):
+        self.id = run_id
+        self.parent = parent
+        self.experiment = SimpleNamespace(name="BenchmarkExperiment")
+        self.properties = {}
+        self.calls = 0
+
+    def log(self, name, value, description="", step=None):
+        self.calls += 1
+
+    def log_list(self, name, value, description=""):
+        self.calls += 1
+
+    def log_row(self, name, description="", **kwargs):
+        self.calls += 1
+
+    def log_table(self, name, value, description=""):
+        self.calls += 1
+
+    def log_image(self, name, path=None, plot=None, description=""):
+        self.calls += 1
+
+    def tag(self, key, value=None):
+        self.calls += 1
+
+
+class Fake_Exporter:
+    """ A metrics exporter replacement that drops everything it is given.
+    """
+
+    def __init__(self, **options):
+        self.options = options
+        self.processors = []
+
+    def add_telemetry_processor(self, processor):
+        self.processors.append(processor)
+
+    def apply_telemetry_processors(self, envelopes):
+        return envelopes
+
+    def export_metrics(self, metrics):
+        pass
+
+    def shutdown(self):
+        pass
+
+
+class Fake_Ingestion_Handler(BaseHTTPRequestHandler):
+    """ Accepts the telemetry posted by the AppInsights exporter, like the ingestion endpoint does.
+    """
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        received = len(json.loads(body))
+        self.server.requests += 1
+        self.server.envelopes += received
+        response = json.dumps({"itemsReceived": received, "itemsAccepted": received, "errors": []}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Fake_Ingestion_Server:
+    """ An AppInsights ingestion endpoint on localhost, counting the requests and envelopes it receives.
+    e.g. with Fake_Ingestion_Server() as server: make_reporter(ingestion=server)
+    """
+
+    def __init__(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Fake_Ingestion_Handler)
+        self.server.requests = 0
+        self.server.envelopes = 0
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def endpoint(self):
+        return "http://127.0.0.1:{}".format(self.server.server_address[1])
+
+    @property
+    def requests(self):
+        return self.server.requests
+
+    @property
+    def envelopes(self):
+        return self.server.envelopes
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def make_reporter(run=None, ingestion=None, **kwargs):
+    """Build a Condensed_Binocular bound to a Fake_Run, and to a Fake_Exporter or a real exporter that sends to a
+    Fake_Ingestion_Server.
+    :param run: The run to report to, a new Fake_Run with a Fake_Run parent by default.
+    :param ingestion: The Fake_Ingestion_Server to export to, or None to use a Fake_Exporter.
+    :param kwargs: Additional keyword arguments for Condensed_Binocular.
+    :return: reporter
+    """
+    run = run or Fake_Run(parent=Fake_Run("BenchmarkParentRun"))
+    connection_key = "InstrumentationKey=00000000-0000-0000-0000-000000000000"
+    if ingestion is not None:
+        connection_key = "{};IngestionEndpoint={}".format(connection_key, ingestion.endpoint)
+        # Statsbeat would report the exporter's own usage to Azure, it is read when the exporter sends.
+        os.environ["APPLICATIONINSIGHTS_STATSBEAT_DISABLED_ALL"] = "true"
+    with contextlib.ExitStack() as stack:
+        mock_run = stack.enter_context(mock.patch.object(condensed_binocular, "Run"))
+        if ingestion is None:
+            stack.enter_context(mock.patch.object(condensed_binocular.metrics_exporter, "new_metrics_exporter",
+                                                  Fake_Exporter))
+        stack.enter_context(mock.patch.dict(os.environ, {"APP_INSIGHTS_CONNECTION_KEY": connection_key}))
+        mock_run.get_context.return_value = run
+        return condensed_binocular.Condensed_Binocular(**kwargs)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The modules in src import each other by their plain names, e.g. "import constants"
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
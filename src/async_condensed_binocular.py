@@ -0,0 +1,242 @@
+import asyncio
+import logging
+import constants
+from concurrent.futures import ThreadPoolExecutor
+from typing import Mapping, Optional, TYPE_CHECKING, Union
+
+if TYPE_CHECKING:
+    import numpy
+    from matplotlib import pyplot
+
+logger = logging.getLogger(__name__)
+
+
+class Async_Condensed_Binocular:
+    """ This class is the asyncio sibling of Condensed_Binocular. The blocking AML and AppInsights work runs on a
+    bounded thread pool, and the calls made during one tick of the event loop are sent to it as a single batch.
+    e.g.
+        async with Async_Condensed_Binocular() as reporting:
+            reporting.report_metric_nowait("latency", 0.02)
+            await reporting.report_metric("accuracy", 0.9)
+    """
+
+    def __init__(self, reporter=None, max_workers: int = constants.DEFAULT_ASYNC_WORKERS, **kwargs):
+        """Initializes Async_Condensed_Binocular.
+        :param reporter: The Condensed_Binocular to report with, a new one by default.
+        :param max_workers: The number of threads that run the blocking work. With more than one thread, calls made
+        during different ticks may reach AML out of order.
+        :param kwargs: The keyword arguments of a new Condensed_Binocular.
+        """
+        if reporter is None:
+            from condensed_binocular import Condensed_Binocular
+            reporter = Condensed_Binocular(**kwargs)
+        self.reporter = reporter
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="condensed-binocular")
+        self.pending = []
+        self.drain_scheduled = False
+        self.batches = set()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def report_metric(self, name: str, value: float, description="", report_to_parent: bool = False,
+                            tags: Optional[Mapping[str, str]] = None):
+        """Report a metric value like Condensed_Binocular.report_metric, and wait until it has been sent.
+        """
+        await self.submit("report_metric", (name, value, description, report_to_parent), self.tag_kwargs(tags),
+                          wait=True)
+
+    def report_metric_nowait(self, name: str, value: float, description="", report_to_parent: bool = False,
+                             tags: Optional[Mapping[str, str]] = None):
+        """Report a metric value like Condensed_Binocular.report_metric, without waiting.
+        """
+        self.submit("report_metric", (name, value, description, report_to_parent), self.tag_kwargs(tags), wait=False)
+
+    @staticmethod
+    def tag_kwargs(tags: Optional[Mapping[str, str]]):
+        """Get the keyword arguments passing tags on, so calls without tags stay unchanged.
+        :param tags: The tags of the call, or None.
+        :return: A dictionary of keyword arguments.
+        """
+        return {"tags": dict(tags)} if tags else {}
+
+    @staticmethod
+    def copy_values(values: Mapping):
+        """Copy a mapping and its list or array values, which the caller may change before the call is sent.
+        :param values: A dictionary of scalars, lists or NumPy arrays, e.g. the values of report_metrics or the
+        columns of report_table.
+        :return: The copy.
+        """
+        return {name: value.copy() if hasattr(value, "copy") else value for name, value in values.items()}
+
+    async def report_metrics(self, values: Mapping[str, Union[float, list, "numpy.ndarray"]], description="",
+                             step: Optional[int] = None, report_to_parent: bool = False,
+                             tags: Optional[Mapping[str, str]] = None):
+        """Report many metrics like Condensed_Binocular.report_metrics, and wait until they have been sent.
+        """
+        await self.submit("report_metrics", (self.copy_values(values), description, step, report_to_parent),
+                          self.tag_kwargs(tags), wait=True)
+
+    def report_metrics_nowait(self, values: Mapping[str, Union[float, list, "numpy.ndarray"]], description="",
+                              step: Optional[int] = None, report_to_parent: bool = False,
+                              tags: Optional[Mapping[str, str]] = None):
+        """Report many metrics like Condensed_Binocular.report_metrics, without waiting.
+        """
+        self.submit("report_metrics", (self.copy_values(values), description, step, report_to_parent),
+                    self.tag_kwargs(tags), wait=False)
+
+    async def report_step(self, name: str, value: float, step: int, description="", report_to_parent: bool = False,
+                          tags: Optional[Mapping[str, str]] = None):
+        """Report a value of a series like Condensed_Binocular.report_step, and wait until it has been sent.
+        """
+        await self.submit("report_step", (name, value, step, description, report_to_parent), self.tag_kwargs(tags),
+                          wait=True)
+
+    def report_step_nowait(self, name: str, value: float, step: int, description="", report_to_parent: bool = False,
+                           tags: Optional[Mapping[str, str]] = None):
+        """Report a value of a series like Condensed_Binocular.report_step, without waiting.
+        """
+        self.submit("report_step", (name, value, step, description, report_to_parent), self.tag_kwargs(tags),
+                    wait=False)
+
+    async def report_metric_with_run_tagging(self, name: str, value: float, description=""):
+        """Report and tag a metric like Condensed_Binocular.report_metric_with_run_tagging, and wait until it has
+        been sent.
+        """
+        await self.submit("report_metric_with_run_tagging", (name, value, description), {}, wait=True)
+
+    def report_metric_with_run_tagging_nowait(self, name: str, value: float, description=""):
+        """Report and tag a metric like Condensed_Binocular.report_metric_with_run_tagging, without waiting.
+        """
+        self.submit("report_metric_with_run_tagging", (name, value, description), {}, wait=False)
+
+    async def report_list(self, name: str, value: list, report_to_parent: bool = False):
+        """Report a list like Condensed_Binocular.report_list, and wait until it has been sent.
+        """
+        await self.submit("report_list", (name, list(value), report_to_parent), {}, wait=True)
+
+    def report_list_nowait(self, name: str, value: list, report_to_parent: bool = False):
+        """Report a list like Condensed_Binocular.report_list, without waiting.
+        """
+        self.submit("report_list", (name, list(value), report_to_parent), {}, wait=False)
+
+    async def report_row(self, name: str, report_to_parent: bool = False, **kwargs: dict):
+        """Report a row like Condensed_Binocular.report_row, and wait until it has been sent.
+        """
+        await self.submit("report_row", (name, report_to_parent), kwargs, wait=True)
+
+    def report_row_nowait(self, name: str, report_to_parent: bool = False, **kwargs: dict):
+        """Report a row like Condensed_Binocular.report_row, without waiting.
+        """
+        self.submit("report_row", (name, report_to_parent), kwargs, wait=False)
+
+    async def report_table(self, name: str, value: dict, report_to_parent: bool = False):
+        """Report a table like Condensed_Binocular.report_table, and wait until it has been sent.
+        """
+        await self.submit("report_table", (name, self.copy_values(value), report_to_parent), {}, wait=True)
+
+    def report_table_nowait(self, name: str, value: dict, report_to_parent: bool = False):
+        """Report a table like Condensed_Binocular.report_table, without waiting.
+        """
+        self.submit("report_table", (name, self.copy_values(value), report_to_parent), {}, wait=False)
+
+    async def report_image(self, name: str, path: Optional[str] = None, plot: Optional["pyplot.plot"] = None,
+                           image: Optional[Union["numpy.ndarray", bytes]] = None):
+        """Report an image like Condensed_Binocular.report_image, and wait until it has been sent.
+        """
+        await self.submit("report_image", (name, path, plot, self.copy_image(image)), {}, wait=True)
+
+    def report_image_nowait(self, name: str, path: Optional[str] = None, plot: Optional["pyplot.plot"] = None,
+                            image: Optional[Union["numpy.ndarray", bytes]] = None):
+        """Report an image like Condensed_Binocular.report_image, without waiting. A plot is reported from the thread
+        pool, so it must not be changed until it has been sent.
+        """
+        self.submit("report_image", (name, path, plot, self.copy_image(image)), {}, wait=False)
+
+    @staticmethod
+    def copy_image(image):
+        """Copy an image array or buffer, which the caller may change before the call is sent.
+        :param image: A NumPy array, encoded image bytes, or None.
+        :return: The copy, or the immutable bytes as they are.
+        """
+        if isinstance(image, bytearray):
+            return bytes(image)
+        return image.copy() if hasattr(image, "copy") else image
+
+    def submit(self, method: str, args: tuple, kwargs: dict, wait: bool):
+        """Queue a call of the reporter, to be sent with the other calls of this tick of the event loop.
+        Must be called from the event loop.
+        :param method: The name of the Condensed_Binocular method.
+        :param args: The positional arguments of the call.
+        :param kwargs: The keyword arguments of the call.
+        :param wait: Mark True to get a future for the result of the call.
+        :return: An asyncio future if wait is True, None otherwise.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future() if wait else None
+        self.pending.append((method, args, kwargs, future))
+        if not self.drain_scheduled:
+            self.drain_scheduled = True
+            loop.call_soon(self.drain, loop)
+        return future
+
+    def drain(self, loop):
+        """Send the calls queued during this tick to the thread pool as a single batch.
+        :param loop: The running event loop.
+        """
+        calls, self.pending = self.pending, []
+        self.drain_scheduled = False
+        if not calls:
+            return
+        batch = loop.run_in_executor(self.executor, self.run_calls, calls)
+        self.batches.add(batch)
+        batch.add_done_callback(lambda done: self.resolve(done, calls))
+
+    def run_calls(self, calls: list):
+        """Run a batch of calls on a thread of the pool.
+        :param calls: The calls of the batch.
+        :return: A list of (succeeded, result or exception) tuples, one per call.
+        """
+        outcomes = []
+        for method, args, kwargs, _ in calls:
+            try:
+                outcomes.append((True, getattr(self.reporter, method)(*args, **kwargs)))
+            except Exception as exception:
+                outcomes.append((False, exception))
+        return outcomes
+
+    def resolve(self, batch, calls: list):
+        """Pass the outcomes of a batch to the callers waiting for them, on the event loop.
+        :param batch: The finished future of the batch.
+        :param calls: The calls of the batch.
+        """
+        self.batches.discard(batch)
+        for (method, _, _, future), (succeeded, outcome) in zip(calls, batch.result()):
+            if future is None:
+                if not succeeded:
+                    logger.warning("%s failed.", method, exc_info=outcome)
+            elif not future.cancelled():
+                if succeeded:
+                    future.set_result(outcome)
+                else:
+                    future.set_exception(outcome)
+
+    async def flush(self):
+        """Send the queued calls, wait for them, and flush the reporter.
+        """
+        self.drain(asyncio.get_running_loop())
+        if self.batches:
+            await asyncio.gather(*self.batches)
+        await asyncio.get_running_loop().run_in_executor(self.executor, self.reporter.flush)
+
+    async def close(self):
+        """Send the queued calls, close the reporter and stop the thread pool.
+        """
+        self.drain(asyncio.get_running_loop())
+        if self.batches:
+            await asyncio.gather(*self.batches)
+        await asyncio.get_running_loop().run_in_executor(self.executor, self.reporter.close)
+        self.executor.shutdown()
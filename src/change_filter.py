@@ -0,0 +1,48 @@
+import threading
+from typing import Hashable, Optional
+
+
+class Change_Filter:
+    """ This class remembers the last value written per key, e.g. per (run, "tag", name), and lets a value through
+    only if it differs from the last one by more than a tolerance, or if the last write is older than the heartbeat
+    interval, so the series still shows the run is alive.
+    """
+
+    def __init__(self, tolerance: float = 0.0, heartbeat_interval: Optional[float] = None):
+        """Initializes the filter.
+        :param tolerance: The largest difference between two numbers that still counts as unchanged.
+        :param heartbeat_interval: The number of seconds after which an unchanged value is written again, or None to
+        never write it again.
+        """
+        self.tolerance = tolerance
+        self.heartbeat_interval = heartbeat_interval
+        self.last_values = {}
+        self.suppressed = 0
+        self.lock = threading.Lock()
+
+    def changed(self, key: Hashable, value, now: float):
+        """Check whether a value should be written, and remember it if so.
+        e.g. Change_Filter.changed((run, "tag", "accuracy"), 0.9, time.monotonic())
+        :param key: The key of the series.
+        :param value: The value to be written.
+        :param now: The current time.monotonic().
+        :return: True if the value changed or the heartbeat is due, False if it should be suppressed.
+        """
+        with self.lock:
+            last = self.last_values.get(key)
+            if last is not None and not self.is_changed(last[0], value) and (
+                    self.heartbeat_interval is None or now - last[1] < self.heartbeat_interval):
+                self.suppressed += 1
+                return False
+            self.last_values[key] = (value, now)
+            return True
+
+    def is_changed(self, last, value):
+        """Compare a value with the last value written: numbers within the tolerance and equal values are unchanged.
+        :param last: The last value written.
+        :param value: The new value.
+        :return: True if the value changed.
+        """
+        if isinstance(value, (int, float)) and isinstance(last, (int, float)) and not isinstance(value, bool):
+            return abs(value - last) > self.tolerance
+        return value != last
@@ -1,64 +1,451 @@
+import atexit
+import change_filter
+import logging
+import os
+import threading
+import time
 import uuid
 import constants
-from matplotlib import pyplot
-from typing import Optional
-from environs import Env
-from azureml.core import Run
-from opencensus.ext.azure import metrics_exporter
-from opencensus.stats import aggregation as aggregation_module
-from opencensus.stats import measure as measure_module
-from opencensus.stats import stats as stats_module
-from opencensus.stats import view as view_module
-from opencensus.tags import tag_map as tag_map_module
+import dispatcher
+import metric_batcher
+import metric_dimensions
+import metric_limiter
+import metric_retry
+import metric_series
+import metric_sinks
+import metric_spool
+import metric_summary
+import reporter_stats
+import sweeper
+import table_stream
+import thread_buffers
+from typing import Callable, Collection, List, Mapping, Optional, TYPE_CHECKING, Union
+from lazy_import import Lazy_Import
+
+if TYPE_CHECKING:
+    import numpy
+    from matplotlib import pyplot
+
+logger = logging.getLogger(__name__)
+
+# The heavy dependencies are only imported on first use, to keep the import of this module cheap.
+Env = Lazy_Import("environs", "Env")
+Run = Lazy_Import("azureml.core", "Run")
+metrics_exporter = Lazy_Import("opencensus.ext.azure.metrics_exporter")
+aggregation_module = Lazy_Import("opencensus.stats.aggregation")
+measure_module = Lazy_Import("opencensus.stats.measure")
+stats_module = Lazy_Import("opencensus.stats.stats")
+view_module = Lazy_Import("opencensus.stats.view")
+tag_map_module = Lazy_Import("opencensus.tags.tag_map")
+image_pipeline = Lazy_Import("image_pipeline")
 
 
 class Condensed_Binocular:
     """ This class allows to report metrics to Azure ML and/or to Application Insights simultaneously.
+    A reporter can be shared by threads: measures and views are registered once under a lock, and the summaries and
+    rate limiting are updated under a lock. With thread_buffering, report_metric, report_metric_with_run_tagging and
+    report_row only append to a buffer of the calling thread, and a single flusher thread reports the calls.
     """
 
-    def __init__(self):
+    def __init__(self, non_blocking: bool = False, queue_size: int = constants.DEFAULT_QUEUE_SIZE,
+                 backpressure: str = constants.BACKPRESSURE_BLOCK, batch_size: Optional[int] = None,
+                 batch_interval: float = constants.DEFAULT_BATCH_INTERVAL, ancestor_depth: int = 1,
+                 summary_interval: Optional[float] = None, export_interval: Optional[float] = None,
+                 export_batch_size: Optional[int] = None, export_retry_interval: Optional[float] = None,
+                 export_local_storage: Optional[bool] = None, run=None, spool_path: Optional[str] = None,
+                 rate_limit: Optional[float] = None, rate_burst: Optional[float] = None,
+                 sample_every: Optional[int] = None, reservoir_size: Optional[int] = None,
+                 sampling_window: float = constants.DEFAULT_SAMPLING_WINDOW, background_images: bool = False,
+                 image_format: str = constants.DEFAULT_IMAGE_FORMAT, image_quality: int = constants.DEFAULT_IMAGE_QUALITY,
+                 image_max_pixels: Optional[int] = None, instrument: bool = False,
+                 stats_window: int = constants.DEFAULT_STATS_WINDOW, emit_stats: bool = False,
+                 stats_interval: Optional[float] = None, thread_buffering: bool = False,
+                 thread_buffer_interval: float = constants.DEFAULT_THREAD_BUFFER_INTERVAL, changes_only: bool = False,
+                 change_tolerance: float = 0.0,
+                 heartbeat_interval: Optional[float] = constants.DEFAULT_HEARTBEAT_INTERVAL,
+                 sinks: Optional[list] = None, aml_metrics: Optional[Union[Collection[str], Callable]] = None,
+                 app_insights_metrics: Optional[Union[Collection[str], Callable]] = None,
+                 series_strategy: str = constants.SERIES_LTTB, series_resolution: int = constants.DEFAULT_SERIES_RESOLUTION,
+                 series_range: int = constants.DEFAULT_SERIES_RANGE, pool=None,
+                 retry_attempts: int = constants.DEFAULT_RETRY_ATTEMPTS,
+                 retry_max_delay: float = constants.DEFAULT_RETRY_MAX_DELAY,
+                 failure_threshold: int = constants.DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = constants.DEFAULT_RESET_TIMEOUT):
         """Initializes Condensed_Binocular using the Run object of azureml.core, and adding a
         metric exporter for ApplicationInsights using the opencensus library.
+        :param non_blocking: Mark True to send the AML logging calls from a background thread instead of the caller.
+        :param queue_size: The maximum number of pending AML logging calls in non-blocking mode, and of buffered calls
+        per thread with thread_buffering.
+        :param backpressure: What to do in non-blocking mode when the queue is full, and with thread_buffering when the
+        buffer of a thread is full.
+        :type backpressure: One of constants.BACKPRESSURE_POLICIES.
+        :param batch_size: If set, report_metric and report_row buffer up to this many values per metric, and upload
+        them to AML in a single log_list or log_table call.
+        :param batch_interval: The number of seconds after which buffered values are uploaded, even if the batch is not full
+        and nothing else is reported.
+        :param ancestor_depth: The number of ancestor runs to report to with report_to_parent, e.g. 2 for the parent
+        and grandparent runs of a HyperDrive child run in a pipeline step.
+        :param summary_interval: The number of seconds over which the metrics registered with a summary aggregation
+        are aggregated before they are recorded for AppInsights, export_interval by default.
+        :param export_interval: The number of seconds between two exports to AppInsights by the background export
+        thread, or the APP_INSIGHTS_EXPORT_INTERVAL environment variable.
+        :param export_batch_size: The maximum number of metrics sent to AppInsights per request, or the
+        APP_INSIGHTS_MAX_BATCH_SIZE environment variable.
+        :param export_retry_interval: The minimum number of seconds before an export that failed is retried, or the
+        APP_INSIGHTS_RETRY_INTERVAL environment variable.
+        :param export_local_storage: Mark False to drop failed exports instead of keeping them on local storage
+        and retrying them, or the APP_INSIGHTS_LOCAL_STORAGE environment variable. True by default.
+        :param run: The AML run to report to, the run of the current context by default.
+        :param spool_path: If set, every report_* call is also appended to this local file, and failing AML logging
+        calls are logged as warnings instead of raised. Upload the spool later with `python metric_spool.py`.
+        :param rate_limit: If set, report_metric reports at most this many values per second per metric.
+        :param rate_burst: The number of values per metric that can exceed rate_limit at once, rate_limit by default.
+        :param sample_every: If set, report_metric only reports every Nth value per metric.
+        :param reservoir_size: If set, report_metric only reports a uniform random sample of this many values per
+        metric per sampling_window, at the end of the window, even if the metric is not reported again.
+        :param sampling_window: The number of seconds after which the numbers of values dropped by rate_limit and
+        left out by sampling are reported, as metrics named after the metric, e.g. "loss_dropped" and
+        "loss_sampled_out".
+        :param background_images: Mark True to render, compress and upload the images of report_image on a background
+        thread. The caller only waits for a snapshot of the plot.
+        :param image_format: The format plots and arrays are rendered to by report_image, e.g. "png" or "jpeg".
+        :param image_quality: The quality of lossy image formats, from 1 to 95.
+        :param image_max_pixels: If set, plots and arrays are downsized to at most this many pixels by report_image.
+        :param instrument: Mark True to measure the calls of the report_* methods and of the AppInsights batch
+        processing, readable with stats(). Without it, the methods run unchanged.
+        :param stats_window: The number of most recent calls per method that the latency percentiles are computed over.
+        :param emit_stats: Mark True to also record the statistics of instrument as AppInsights metrics named
+        "condensed_binocular_*", once per stats_interval.
+        :param stats_interval: The number of seconds between two emissions of the statistics, export_interval by default.
+        :param thread_buffering: Mark True to buffer the report_metric, report_metric_with_run_tagging and report_row
+        calls per thread, so threads that report concurrently do not wait on each other. The calls are reported by a
+        single flusher thread, in order per thread, and right away by flush and close.
+        :param thread_buffer_interval: The number of seconds between two flushes of the thread buffers.
+        :param changes_only: Mark True to skip the AML logging calls and run tags of a metric whose value has not
+        changed since the last one written to the same run. Values with a step are always written.
+        :param change_tolerance: The largest difference between two values of a metric that counts as unchanged.
+        :param heartbeat_interval: The number of seconds after which an unchanged value is written again, so the
+        metric still shows the run is alive, or None to never write it again.
+        :param sinks: Additional destinations of the scalar metric values, e.g. metric_sinks.Arrow_Sink("metrics.parquet"),
+        Ring_Buffer_Sink or Prometheus_Sink, flushed and closed with the reporter.
+        :param aml_metrics: The names of the metrics logged to AML, or a function of the name deciding it, all by
+        default. Leave out high-volume metrics, e.g. to keep them in a local sink only.
+        :param app_insights_metrics: The names of the metrics recorded for AppInsights, or a function of the name
+        deciding it, all by default.
+        :param series_strategy: How report_step downsamples a series for AML: "lttb" keeps the shape of the series,
+        "min_max" keeps the minimum and maximum of each bucket.
+        :type series_strategy: One of constants.SERIES_STRATEGIES.
+        :param series_resolution: The number of points of a series uploaded to AML per series_range points.
+        :param series_range: The number of points of a series downsampled together.
+        :param pool: The reporter_pool.Reporter_Pool to share the exporter, the environment settings and the
+        registered measures with, e.g. Reporter_Pool.shared(). Its export settings replace the export_* arguments, and
+        its retry and circuit settings those of the AppInsights exports; the retry_* and circuit arguments of a pooled
+        reporter apply to its AML calls only.
+        By default, the reporter reads the environment and creates an exporter of its own.
+        :param retry_attempts: The maximum number of attempts of an AML logging call or an AppInsights export that
+        fails with a connection error, a timeout or a throttling or transient server response, 1 for no retries.
+        :param retry_max_delay: The maximum number of seconds to wait before a retry. A throttling response asking to
+        wait longer opens the circuit of the destination for that long instead.
+        :param failure_threshold: The number of failed calls in a row that open the circuit of a destination. While
+        it is open, the calls are kept in memory instead of made, and made in order once the destination is back.
+        :param reset_timeout: The number of seconds the circuit of a destination stays open.
         """
-        env = Env()
-        env.read_env()
+        self.pool = pool
+        if pool is not None:
+            export_interval = pool.export_interval
+        else:
+            env = Env()
+            env.read_env()
+            if export_interval is None:
+                export_interval = env.float("APP_INSIGHTS_EXPORT_INTERVAL", constants.DEFAULT_EXPORT_INTERVAL)
+            if export_batch_size is None:
+                export_batch_size = env.int("APP_INSIGHTS_MAX_BATCH_SIZE", constants.DEFAULT_EXPORT_BATCH_SIZE)
+            if export_retry_interval is None:
+                export_retry_interval = env.float("APP_INSIGHTS_RETRY_INTERVAL",
+                                                  constants.DEFAULT_EXPORT_RETRY_INTERVAL)
+            if export_local_storage is None:
+                export_local_storage = env.bool("APP_INSIGHTS_LOCAL_STORAGE", constants.DEFAULT_EXPORT_LOCAL_STORAGE)
 
-        self.run = Run.get_context(allow_offline=True)
+        self.run = run if run is not None else Run.get_context(allow_offline=True)
         self.run_id = self.get_run_id(self.run)
         self.offline_run = self.run.id.startswith(constants.OFFLINE_RUN_PREFIX)
+        # The ancestor runs are looked up once on first use, as run.parent can be a service call.
+        self.ancestor_depth = ancestor_depth
+        self.ancestor_runs = None
+
+        # The instrumented methods are wrapped on the instance before any of them is handed out as a callback.
+        self.instrumentation = None
+        if instrument:
+            self.instrumentation = reporter_stats.Reporter_Stats(
+                stats_window, self.emit_stats if emit_stats else None,
+                stats_interval if stats_interval is not None else export_interval)
+            self.instrumentation.instrument(self)
+
+        # AML and AppInsights fail independently: each has its own retries and circuit breaker.
+        self.aml_guard = metric_retry.Destination_Guard(
+            constants.COMPONENT_AML, retry_attempts, max_delay=retry_max_delay, failure_threshold=failure_threshold,
+            reset_timeout=reset_timeout)
+        # The properties attached to every envelope are computed once, and added by processors of whole batches.
+        self.common_properties = self.get_common_properties()
+        self.batch_processors = (self.add_common_properties,)
+        if pool is not None:
+            # The exporter of the pool processes its batches with the latest reporter. Its exports are not counted
+            # by instrument, as they are not the exports of this reporter only.
+            self.exporter = pool.acquire(self)
+            self.apply_telemetry_processors = pool.apply_telemetry_processors
+            self.app_insights_guard = pool.guard
+        else:
+            # The exporter sends the recorded metrics from its own background thread, once per export interval.
+            self.exporter = metrics_exporter.new_metrics_exporter(
+                enable_standard_metrics=False,
+                export_interval=export_interval,
+                max_batch_size=export_batch_size,
+                minimum_retry_interval=export_retry_interval,
+                enable_local_storage=export_local_storage,
+                connection_string=env("APP_INSIGHTS_CONNECTION_KEY"))
+            self.apply_telemetry_processors = self.exporter.apply_telemetry_processors
+            self.exporter.apply_telemetry_processors = self.process_batch
+            self.app_insights_guard = metric_retry.Destination_Guard(
+                constants.COMPONENT_APP_INSIGHTS, retry_attempts, max_delay=retry_max_delay,
+                failure_threshold=failure_threshold, reset_timeout=reset_timeout)
+            self.app_insights_guard.wrap_transmit(self.exporter)
+            stats_module.stats.view_manager.register_exporter(self.exporter)
+            if self.instrumentation is not None:
+                self.instrumentation.instrument_exporter(self.exporter)
 
-        self.exporter = metrics_exporter.new_metrics_exporter(
-            enable_standard_metrics=False,
-            export_interval=0,
-            connection_string=env("APP_INSIGHTS_CONNECTION_KEY"))
-        self.exporter.add_telemetry_processor(self.callback_function)
-        stats_module.stats.view_manager.register_exporter(self.exporter)
+        # Measures are registered once per name, with their first description, and reused afterwards, by all the
+        # reporters of a pool, as views are registered process-wide by name.
+        self.measures = pool.measures if pool is not None else {}
+        self.described_differently = set()
+        self.registration_lock = pool.registration_lock if pool is not None else threading.Lock()
+        # The dimensions of the metrics reported with tags, and their cached tag maps.
+        self.metric_dimensions = pool.metric_dimensions if pool is not None else {}
+        # Guards the summaries and the rate limiting state, which are updated by every reporting thread.
+        self.lock = threading.Lock()
+        # The reporters of a pool share the export batches, so each one tags its values with its run instead.
+        self.pinned_tags = {constants.RUN_TAG_KEY: self.run_id} if pool is not None else {}
+        self.empty_tag_map = tag_map_module.TagMap()
+        for key, value in self.pinned_tags.items():
+            self.empty_tag_map.insert(key, value)
+        # Metrics registered with a summary aggregation are aggregated in-process and recorded once per interval.
+        self.metric_summaries = {}
+        self.metric_descriptions = {}
+        self.summary_interval = summary_interval if summary_interval is not None else export_interval
+        self.summary_started = time.monotonic()
+        atexit.register(self.record_summaries)
 
-    def report_metric(self, name: str, value: float, description="", report_to_parent: bool = False):
+        self.dispatcher = dispatcher.Background_Dispatcher(queue_size, backpressure) if non_blocking else None
+        self.batcher = metric_batcher.Metric_Batcher(self.log_to_aml, batch_size, batch_interval) if batch_size else None
+        self.spool = metric_spool.Metric_Spool(spool_path) if spool_path else None
+        self.limiter = None
+        if rate_limit or sample_every or reservoir_size:
+            self.limiter = metric_limiter.Metric_Limiter(rate_limit, rate_burst, sample_every, reservoir_size,
+                                                         sampling_window)
+        self.background_images = background_images
+        self.image_format = image_format
+        self.image_quality = image_quality
+        self.image_max_pixels = image_max_pixels
+        self.image_pipeline = None
+        self.closed = False
+        self.change_filter = change_filter.Change_Filter(change_tolerance, heartbeat_interval) if changes_only else None
+        # Scalar values are fanned out to the sinks; the AML and AppInsights sinks are always the first two.
+        self.aml_sink = metric_sinks.Aml_Sink(self, aml_metrics)
+        self.app_insights_sink = metric_sinks.App_Insights_Sink(self, app_insights_metrics, export_interval)
+        self.local_sinks = list(sinks or [])
+        self.sinks = [self.aml_sink, self.app_insights_sink] + self.local_sinks
+        # report_metrics records the AppInsights values in a single measurement, and report_step and
+        # report_metric_with_run_tagging make their own AML calls, so they write to the other sinks only.
+        self.bulk_sinks = [self.aml_sink] + self.local_sinks
+        self.full_resolution_sinks = [self.app_insights_sink] + self.local_sinks
+        if series_strategy not in metric_series.STRATEGIES:
+            raise ValueError("Unknown series strategy '{}', expected one of {}.".format(
+                series_strategy, sorted(metric_series.STRATEGIES)))
+        self.series = {}
+        self.series_strategy = series_strategy
+        self.series_resolution = series_resolution
+        self.series_range = series_range
+        self.series_dispatcher = None
+        # The buffers take over the methods after instrument, so the statistics time the calls made by the flusher.
+        self.thread_buffers = None
+        if thread_buffering:
+            self.thread_buffers = thread_buffers.Thread_Buffers(thread_buffer_interval, queue_size, backpressure)
+            self.thread_buffers.install(self)
+        # The batches and the rate limiting windows are also ended on time while nothing is reported.
+        self.sweeper = None
+        if self.batcher is not None:
+            self.start_sweeper(batch_interval)
+        if self.limiter is not None:
+            self.start_sweeper(sampling_window)
+
+    def report_metric(self, name: str, value: float, description="", report_to_parent: bool = False,
+                      tags: Optional[Mapping[str, str]] = None):
         """Report a metric value to the AML run and to AppInsights.
-        e.g. Condensed_Binocular.report_metric(name, value)
+        e.g. Condensed_Binocular.report_metric(name, value, tags={"model_version": "3"})
         :param name: The name of the metric.
         :param value: The value to be reported.
         :type value: Float or integer.
         :param description: An optional description about the metric.
         :param report_to_parent: Mark True if you want to report to AML parent run.
+        :param tags: Optional dimensions of the value for AppInsights, see register_metric. A metric that was not
+        registered with tag_keys takes the keys of its first tags as dimensions. AML does not take dimensions.
         """
-        # Report to AML
-        self.run.log(name, value)
-        if report_to_parent and not self.offline_run:
-            self.run.parent.log(name, value)
+        if self.spool is not None:
+            if tags:
+                self.spool.append("report_metric", name=name, value=value, description=description,
+                                  report_to_parent=report_to_parent, tags=dict(tags))
+            else:
+                self.spool.append("report_metric", name=name, value=value, description=description,
+                                  report_to_parent=report_to_parent)
 
-        # Report to AppInsights
-        measurement_map = stats_module.stats.stats_recorder.new_measurement_map()
-        tag_map = tag_map_module.TagMap()
-        measure = measure_module.MeasureFloat(name, description)
-        self.set_view(name, description, measure)
-        measurement_map.measure_float_put(measure, value)
-        measurement_map.record(tag_map)
+        if self.limiter is not None:
+            now = time.monotonic()
+            with self.lock:
+                ended = self.limiter.end_window(now) if self.limiter.window_ended(now) else []
+                accepted = self.limiter.offer(name, value, now, (description, report_to_parent, tags))
+            self.send_limiter_window(ended)
+            if not accepted:
+                return
+        self.send_metric(name, value, description, report_to_parent, tags)
+
+    def send_metric(self, name: str, value: float, description="", report_to_parent: bool = False,
+                    tags: Optional[Mapping[str, str]] = None):
+        """Send a metric value to the AML run and to AppInsights, past the spool and the rate limiting.
+        :param name: The name of the metric.
+        :param value: The value to be reported.
+        :param description: An optional description about the metric.
+        :param report_to_parent: Mark True if you want to report to AML parent run.
+        :param tags: Optional dimensions of the value for AppInsights.
+        """
+        # Report to AML, AppInsights and the local sinks
+        self.dispatch_sinks(self.sinks, "write", name, value, description, report_to_parent, tags=tags)
+
+    @staticmethod
+    def dispatch_sinks(sinks: list, method: str, *args, **kwargs):
+        """Call a method of every sink, e.g. "write" with a metric value for the sinks that take the metric. The
+        exceptions of a sink are logged, so that a failing sink does not stop the others or reach the caller.
+        e.g. Condensed_Binocular.dispatch_sinks(self.local_sinks, "write", name, value, step=step)
+        :param sinks: The Metric_Sink objects to call.
+        :param method: The name of the Metric_Sink method.
+        :param args: The positional arguments of the method, starting with the name of the metric for "write".
+        :param kwargs: The keyword arguments of the method.
+        """
+        for sink in sinks:
+            if method == "write" and not sink.accepts(args[0]):
+                continue
+            try:
+                getattr(sink, method)(*args, **kwargs)
+            except Exception:
+                logger.exception("Calling %s of %s failed.", method, sink.__class__.__name__)
+
+    def report_limiter_window(self, now: float):
+        """End the rate limiting and sampling window: report the values kept by the reservoir, and the numbers of
+        values that were dropped or left out by sampling.
+        :param now: The current time.monotonic().
+        """
+        with self.lock:
+            ended = self.limiter.end_window(now)
+        self.send_limiter_window(ended)
+
+    def send_limiter_window(self, ended: list):
+        """Send the values kept by the reservoir, and the numbers of values that were dropped or left out by sampling.
+        :param ended: The windows ended by Metric_Limiter.end_window.
+        """
+        for name, (description, report_to_parent, tags), reservoir, dropped, sampled_out in ended:
+            for value in reservoir:
+                self.send_metric(name, value, description, report_to_parent, tags)
+            if dropped:
+                self.send_metric(constants.STATISTIC_NAME_FORMAT.format(name, constants.DROPPED_STATISTIC), dropped,
+                                 description, report_to_parent)
+            if sampled_out:
+                self.send_metric(constants.STATISTIC_NAME_FORMAT.format(name, constants.SAMPLED_OUT_STATISTIC),
+                                 sampled_out, description, report_to_parent)
+
+    def report_metrics(self, values: Mapping[str, Union[float, list, "numpy.ndarray"]], description="",
+                       step: Optional[int] = None, report_to_parent: bool = False,
+                       tags: Optional[Mapping[str, str]] = None):
+        """Report many metrics at once to the AML run and to AppInsights. Scalar values are reported like
+        report_metric, and recorded for AppInsights in a single measurement. Lists and NumPy arrays are reported
+        to AML with one log_list call each, and are aggregated as a whole for the metrics registered with a
+        summary aggregation, otherwise their last value is recorded for AppInsights.
+        e.g. Condensed_Binocular.report_metrics({"loss": 0.3, "class_accuracy": numpy.array([0.9, 0.7])}, step=10)
+        :param values: The values to be reported, a dictionary where keys are the names of the metrics.
+        :param description: An optional description about the metrics.
+        :param step: An optional step of the scalar values, e.g. the training step. Not supported for lists.
+        :param report_to_parent: Mark True if you want to report to AML parent run.
+        :param tags: Optional dimensions of the values for AppInsights, like report_metric.
+        """
+        if self.spool is not None:
+            python_values = {name: self.to_python_values(value) for name, value in values.items()}
+            if tags:
+                self.spool.append("report_metrics", values=python_values, description=description, step=step,
+                                  report_to_parent=report_to_parent, tags=dict(tags))
+            else:
+                self.spool.append("report_metrics", values=python_values, description=description, step=step,
+                                  report_to_parent=report_to_parent)
+
+        runs = self.get_report_runs(report_to_parent)
+        last_values = {}
+        for name, raw_value in values.items():
+            value = self.to_python_values(raw_value)
+            if isinstance(value, list):
+                # Report to AML
+                if self.aml_sink.accepts(name):
+                    for run in runs:
+                        self.log_to_aml(run.log_list, name, value)
+                # Report to AppInsights
+                if self.app_insights_sink.accepts(name):
+                    summary = self.metric_summaries.get(name)
+                    if summary is not None:
+                        with self.lock:
+                            summary.add_values(raw_value)
+                    elif value:
+                        last_values[name] = value[-1]
+            else:
+                # Report to AML and the local sinks
+                self.dispatch_sinks(self.bulk_sinks, "write", name, value, description, report_to_parent, step, tags)
+                # Report to AppInsights, recording the last values in a single measurement below
+                if self.app_insights_sink.accepts(name):
+                    summary = self.metric_summaries.get(name)
+                    if summary is not None:
+                        with self.lock:
+                            summary.add(value)
+                    else:
+                        last_values[name] = value
+
+        self.record_last_values(last_values, description, tags)
+        if time.monotonic() - self.summary_started >= self.summary_interval:
+            self.record_summaries()
+
+    @staticmethod
+    def to_python_values(value):
+        """Convert a NumPy array or scalar to plain Python values in one call, without a per-element loop.
+        :param value: A scalar, a list or tuple, or a NumPy array of any shape.
+        :return: The scalar, or a flat list of the values.
+        """
+        if hasattr(value, "tolist"):
+            if getattr(value, "ndim", 1) > 1:
+                value = value.ravel()
+            value = value.tolist()
+        elif isinstance(value, tuple):
+            value = list(value)
+        return value
+
+    def is_changed(self, run, kind: str, name: str, value):
+        """Check whether a value of a metric should be written to a run, in changes_only mode.
+        :param run: The AML run written to.
+        :param kind: What is written, constants.CHANGE_LOG or constants.CHANGE_TAG.
+        :param name: The name of the metric.
+        :param value: The value to be written.
+        :return: True if the value is written, always without changes_only.
+        """
+        if self.change_filter is None:
+            return True
+        return self.change_filter.changed((run, kind, name), value, time.monotonic())
 
     def report_metric_with_run_tagging(self, name: str, value: float, description=""):
         """Report a metric value to the AML run and to AppInsights, and tag the parent run with the metric.
-        Please note tags are mutable. By default, this method reports to AML parent run.
+        Please note tags are mutable. By default, this method reports to AML parent run, and to the further ancestor
+        runs up to ancestor_depth.
         e.g. Condensed_Binocular.report_metric(name, value)
         :param name: The name of the metric.
         :param value: The value to be reported.
@@ -66,20 +453,283 @@ class Condensed_Binocular:
         :param description: An optional description about the metric.
         :param report_to_parent: Mark True if you want to report to AML parent run.
         """
+        if self.spool is not None:
+            self.spool.append("report_metric_with_run_tagging", name=name, value=value, description=description)
+
         # Report to AML
-        self.run.log(name, value)
-        if not self.offline_run:
-            self.run.parent.log(name, value)
-            self.run.parent.tag(name, value)
+        for run in self.get_report_runs(report_to_parent=True):
+            if self.is_changed(run, constants.CHANGE_LOG, name, value):
+                self.log_to_aml(run.log, name, value)
+            if run is not self.run and self.is_changed(run, constants.CHANGE_TAG, name, value):
+                self.log_to_aml(run.tag, name, value)
+
+        # Report to AppInsights and the local sinks
+        self.dispatch_sinks(self.full_resolution_sinks, "write", name, value, description, True)
+
+    def register_metric(self, name: str, description="", aggregation: str = constants.AGGREGATION_LAST_VALUE,
+                        buckets: Optional[tuple] = None, tag_keys: Optional[tuple] = None,
+                        max_cardinality: Optional[int] = constants.DEFAULT_MAX_CARDINALITY):
+        """Choose how the values of a metric are aggregated for AppInsights. Metrics that are not registered
+        report their last value. The other aggregations are computed in-process and recorded once per
+        summary_interval, as metrics named after the metric and the statistic, e.g. "latency_p95":
+        - count: the number of values.
+        - sum: the sum of the values.
+        - summary: the count, min, max and mean of the values.
+        - distribution: the summary, and the p50, p95 and p99 estimated from a histogram of the values.
+        e.g. Condensed_Binocular.register_metric("latency", aggregation="distribution", buckets=(0.1, 0.5, 1.0))
+        :param name: The name of the metric.
+        :param description: An optional description about the metric.
+        :param aggregation: How to aggregate the values of the metric.
+        :type aggregation: One of constants.AGGREGATIONS.
+        :param buckets: The upper bounds of the histogram buckets of a distribution.
+        :param tag_keys: The dimensions of the last values of the metric in AppInsights, e.g. ("model_version",
+        "region"), declared on the view of the metric. They must be registered before the metric is first reported.
+        The summary statistics are aggregated over all the tag values.
+        :param max_cardinality: The maximum number of combinations of tag values of the metric, or None for no
+        limit. Further combinations are recorded with every tag set to "other".
+        """
+        if aggregation not in constants.AGGREGATIONS:
+            raise ValueError("Unknown aggregation '{}', expected one of {}.".format(aggregation, constants.AGGREGATIONS))
+        if tag_keys is not None:
+            self.register_dimensions(name, tag_keys, max_cardinality)
+
+        with self.lock:
+            if aggregation == constants.AGGREGATION_LAST_VALUE:
+                self.metric_summaries.pop(name, None)
+            else:
+                self.metric_summaries[name] = metric_summary.Metric_Summary(aggregation, buckets)
+                self.metric_descriptions[name] = description
+        if aggregation != constants.AGGREGATION_LAST_VALUE:
+            self.start_sweeper(self.summary_interval)
+
+    def register_dimensions(self, name: str, tag_keys: tuple,
+                            max_cardinality: Optional[int] = constants.DEFAULT_MAX_CARDINALITY):
+        """Declare the tag keys of a metric, before its view is registered.
+        :param name: The name of the metric.
+        :param tag_keys: The names of the dimensions.
+        :param max_cardinality: The maximum number of combinations of tag values, or None for no limit.
+        :return: The Metric_Dimensions of the metric.
+        """
+        tag_keys = tuple(key for key in tag_keys if key not in self.pinned_tags)
+        with self.registration_lock:
+            if name in self.measures:
+                raise ValueError("The view of metric '{}' is already registered, register its tag keys before "
+                                 "reporting it.".format(name))
+            dimensions = self.metric_dimensions[name] = metric_dimensions.Metric_Dimensions(
+                tag_keys, max_cardinality, tuple(self.pinned_tags))
+        return dimensions
+
+    def get_tag_map(self, name: str, tags: Optional[Mapping[str, str]]):
+        """Get the cached tag map of the tag values of a metric, declaring the tag keys on first use.
+        :param name: The name of the metric.
+        :param tags: The tag values, or None.
+        :return: TagMap
+        """
+        if not tags:
+            return self.empty_tag_map
+        dimensions = self.metric_dimensions.get(name)
+        if dimensions is None:
+            try:
+                dimensions = self.register_dimensions(name, tuple(sorted(tags)))
+            except ValueError:
+                logger.warning("Metric '%s' was first reported without tags, its tags are ignored.", name)
+                dimensions = self.metric_dimensions[name] = metric_dimensions.Metric_Dimensions(
+                    (), None, tuple(self.pinned_tags))
+        if self.pinned_tags:
+            tags = dict(tags, **self.pinned_tags)
+        return dimensions.get_tag_map(tags)
+
+    def record_app_insights(self, name: str, value: float, description="", tags: Optional[Mapping[str, str]] = None):
+        """Record a metric value for the AppInsights exporter, or add it to the summary of the metric.
+        :param name: The name of the metric.
+        :param value: The value to be recorded.
+        :param description: An optional description about the metric.
+        :param tags: Optional dimensions of the value.
+        """
+        summary = self.metric_summaries.get(name)
+        if summary is None:
+            self.record_last_value(name, value, description, tags)
+        else:
+            with self.lock:
+                summary.add(value)
+            if time.monotonic() - self.summary_started >= self.summary_interval:
+                self.record_summaries()
 
-        # Report to AppInsights
+    def record_summaries(self):
+        """Record the summary values of the current interval for AppInsights, and start a new interval.
+        """
+        with self.lock:
+            self.summary_started = time.monotonic()
+            results = []
+            for name, summary in self.metric_summaries.items():
+                results.append((name, summary.results(), self.metric_descriptions[name]))
+                summary.reset()
+        for name, statistics, description in results:
+            for statistic, value in statistics.items():
+                self.record_last_value(constants.STATISTIC_NAME_FORMAT.format(name, statistic), value, description)
+
+    def record_last_value(self, name: str, value: float, description="", tags: Optional[Mapping[str, str]] = None):
+        """Record a metric value for the AppInsights exporter, using the cached measure of the metric.
+        :param name: The name of the metric.
+        :param value: The value to be recorded.
+        :param description: An optional description about the metric.
+        :param tags: Optional dimensions of the value.
+        """
+        tag_map = self.get_tag_map(name, tags) if tags else self.empty_tag_map
+        measure = self.get_measure(name, description)
         measurement_map = stats_module.stats.stats_recorder.new_measurement_map()
-        tag_map = tag_map_module.TagMap()
-        measure = measure_module.MeasureFloat(name, description)
-        self.set_view(name, description, measure)
         measurement_map.measure_float_put(measure, value)
         measurement_map.record(tag_map)
 
+    def record_last_values(self, values: dict, description="", tags: Optional[Mapping[str, str]] = None):
+        """Record many metric values for the AppInsights exporter in a single measurement, or in one measurement
+        per tag map when the metrics have dimensions. Negative values are recorded in a measurement of their own, as
+        opencensus drops a whole measurement that holds a negative value.
+        :param values: The values to be recorded, a dictionary where keys are the names of the metrics.
+        :param description: An optional description about the metrics.
+        :param tags: Optional dimensions of the values.
+        """
+        if not values:
+            return
+
+        # The metrics share a measurement as long as they share tag values, e.g. until one reaches its cardinality.
+        measurement_maps = {}
+        for name, value in values.items():
+            tag_map = self.get_tag_map(name, tags) if tags else self.empty_tag_map
+            measure = self.get_measure(name, description)
+            tags_key = (tuple(tag_map) if tags else (), value < 0)
+            entry = measurement_maps.get(tags_key)
+            if entry is None:
+                entry = measurement_maps[tags_key] = (tag_map, stats_module.stats.stats_recorder.new_measurement_map())
+            entry[1].measure_float_put(measure, value)
+        for tag_map, measurement_map in measurement_maps.values():
+            measurement_map.record(tag_map)
+
+    def get_measure(self, name: str, description=""):
+        """Get the measure of a metric, creating it and registering its view on first use only. The view of a
+        metric is registered by name, so the metric keeps its first description.
+        :param name: The name of the metric.
+        :param description: An optional description about the metric.
+        :return: measure
+        """
+        entry = self.measures.get(name)
+        if entry is None:
+            with self.registration_lock:
+                # Another thread may have registered the measure while this one waited for the lock.
+                entry = self.measures.get(name)
+                if entry is None:
+                    measure = measure_module.MeasureFloat(name, description)
+                    dimensions = self.metric_dimensions.get(name)
+                    if dimensions is not None:
+                        self.set_view(name, description, measure, dimensions.tag_keys)
+                    elif self.pinned_tags:
+                        self.set_view(name, description, measure, tuple(self.pinned_tags))
+                    else:
+                        self.set_view(name, description, measure)
+                    entry = self.measures[name] = (measure, description)
+        measure, first_description = entry
+        if description != first_description and name not in self.described_differently:
+            self.described_differently.add(name)
+            logger.warning("Metric '%s' is reported with the description '%s', but keeps its first description '%s'.",
+                           name, description, first_description)
+        return measure
+
+    def report_step(self, name: str, value: float, step: int, description="", report_to_parent: bool = False,
+                    tags: Optional[Mapping[str, str]] = None):
+        """Report a value of a step-indexed series, e.g. the loss of every training step. The series is kept at full
+        resolution in the local sinks, and AppInsights records every value, while AML gets
+        series_resolution points per series_range points, downsampled with series_strategy. The last point before
+        end_epoch, flush or close is always uploaded exactly.
+        e.g. Condensed_Binocular.report_step("loss", loss, step=global_step)
+        :param name: The name of the metric.
+        :param value: The value to be reported.
+        :param step: The step of the value, e.g. the training step.
+        :param description: An optional description about the metric.
+        :param report_to_parent: Mark True if you want to report to AML parent run.
+        :param tags: Optional dimensions of the value for AppInsights.
+        """
+        if self.spool is not None:
+            if tags:
+                self.spool.append("report_step", name=name, value=value, step=step, description=description,
+                                  report_to_parent=report_to_parent, tags=dict(tags))
+            else:
+                self.spool.append("report_step", name=name, value=value, step=step, description=description,
+                                  report_to_parent=report_to_parent)
+
+        # Report to AML, one downsampled range at a time
+        points = self.get_series(name).add(step, value, (description, report_to_parent))
+        if points:
+            self.upload_series(name, points, description, report_to_parent)
+
+        # Report to AppInsights and the local sinks at full resolution
+        self.dispatch_sinks(self.full_resolution_sinks, "write", name, value, description, report_to_parent, step,
+                            tags)
+
+    def get_series(self, name: str):
+        """Get the step-indexed series of a metric, creating it on first use.
+        :param name: The name of the metric.
+        :return: The Metric_Series of the metric.
+        """
+        series = self.series.get(name)
+        if series is None:
+            with self.lock:
+                series = self.series.get(name)
+                if series is None:
+                    series = self.series[name] = metric_series.Metric_Series(
+                        name, self.series_strategy, self.series_resolution, self.series_range)
+        return series
+
+    def upload_series(self, name: str, points: list, description="", report_to_parent: bool = False):
+        """Queue downsampled points of a series to be uploaded to AML on a background thread, as AML only takes the
+        step of a value one run.log call at a time.
+        :param name: The name of the metric.
+        :param points: The (step, value) points to upload.
+        :param description: An optional description about the metric.
+        :param report_to_parent: Mark True if you want to report to AML parent run.
+        """
+        if not self.aml_sink.accepts(name):
+            return
+        self.get_series_dispatcher().submit(self.log_series, self.get_report_runs(report_to_parent), name, points)
+
+    def get_series_dispatcher(self):
+        """Get the background thread that uploads the series: the dispatcher of non-blocking mode, so the series
+        keep their order with the other AML calls, or a dispatcher of the series created on first use.
+        :return: The Background_Dispatcher.
+        """
+        if self.dispatcher is not None:
+            return self.dispatcher
+        if self.series_dispatcher is None:
+            with self.lock:
+                if self.series_dispatcher is None:
+                    self.series_dispatcher = dispatcher.Background_Dispatcher()
+        return self.series_dispatcher
+
+    def log_series(self, runs: list, name: str, points: list):
+        """Log the points of a series to AML runs through the AML guard, on the thread of the series dispatcher.
+        :param runs: The AML runs to log to.
+        :param name: The name of the metric.
+        :param points: The (step, value) points to log.
+        """
+        for run in runs:
+            for step, value in points:
+                self.aml_guard.call(run.log, name, value, step=step)
+
+    def end_epoch(self):
+        """Upload the points of every series not uploaded yet, so each epoch ends on its exact last values.
+        e.g. Condensed_Binocular.end_epoch()
+        """
+        if self.spool is not None:
+            self.spool.append("end_epoch")
+        self.finalize_series()
+
+    def finalize_series(self):
+        """Upload the downsampled points of every series not uploaded yet, ending on their exact last points.
+        """
+        for name, series in list(self.series.items()):
+            points = series.finalize()
+            if points:
+                self.upload_series(name, points, *series.context)
+
     def report_list(self, name: str, value: list, report_to_parent: bool = False):
         """Report a list of metric values to the AML run. Note: this does not report to AppInsights.
         e.g. Condensed_Binocular.report_list("accuracies", [0.6, 0.7, 0.87])
@@ -89,9 +739,13 @@ class Condensed_Binocular:
         :type value: builtin.list
         :param report_to_parent: Mark True if you want to report to AML parent run.
         """
-        self.run.log_list(name, value)
-        if report_to_parent and not self.offline_run:
-            self.run.parent.log_list(name, value)
+        if self.spool is not None:
+            self.spool.append("report_list", name=name, value=list(value), report_to_parent=report_to_parent)
+        if self.dispatcher is not None:
+            # The caller may change the list once this method returns.
+            value = list(value)
+        for run in self.get_report_runs(report_to_parent):
+            self.log_to_aml(run.log_list, name, value)
 
     def report_row(self, name: str, report_to_parent: bool = False, **kwargs: dict):
         """Report a row metric to the AML run. Note: this does not report to AppInsights.
@@ -100,9 +754,15 @@ class Condensed_Binocular:
         :param report_to_parent: Mark True if you want to report to AML parent run.
         :param kwargs: A dictionary of additional parameters. In this case, the columns of the metric.
         """
-        self.run.log_row(name, **kwargs)
-        if report_to_parent and not self.offline_run:
-            self.run.parent.log_row(name, description="", **kwargs)
+        if self.spool is not None:
+            self.spool.append("report_row", name=name, report_to_parent=report_to_parent, **kwargs)
+        for run in self.get_report_runs(report_to_parent):
+            if self.batcher is not None:
+                self.batcher.add_row(run, name, kwargs)
+            elif run is self.run:
+                self.log_to_aml(run.log_row, name, **kwargs)
+            else:
+                self.log_to_aml(run.log_row, name, description="", **kwargs)
 
     def report_table(self, name: str, value: dict, report_to_parent: bool = False):
         """Report a table metric to the AML run. Note: this does not report to AppInsights.
@@ -111,18 +771,236 @@ class Condensed_Binocular:
         :param value: The table value of the metric, a dictionary where keys are columns to be reported.
         :param report_to_parent: Mark True if you want to report to AML parent run.
         """
-        self.run.log_table(name, value)
-        if report_to_parent and not self.offline_run:
-            self.run.parent.log_table(name, value)
+        if self.spool is not None:
+            self.spool.append("report_table", name=name, value=value, report_to_parent=report_to_parent)
+        if self.dispatcher is not None:
+            # The caller may change the table once this method returns.
+            value = {column: list(values) for column, values in value.items()}
+        for run in self.get_report_runs(report_to_parent):
+            self.log_to_aml(run.log_table, name, value)
 
-    def report_image(self, name: str, path: Optional[str] = None, plot: Optional[pyplot.plot] = None):
+    def open_table_stream(self, name: str, chunk_rows: int = constants.DEFAULT_TABLE_CHUNK_ROWS,
+                          report_to_parent: bool = False, progress: Optional[Callable[[int, float], None]] = None):
+        """Open a stream to report a large table metric to the AML run in chunks, with a bounded memory footprint.
+        e.g.
+            with Condensed_Binocular.open_table_stream("predictions") as table:
+                table.write_columns({"label": labels, "score": scores})
+        :param name: The name of the metric.
+        :param chunk_rows: The number of rows per report_table call.
+        :param report_to_parent: Mark True if you want to report to AML parent run.
+        :param progress: An optional function called after each chunk with the number of rows written so far and
+        the throughput in rows per second.
+        :return: A Table_Stream_Writer, to close when done.
+        """
+        return table_stream.Table_Stream_Writer(self, name, chunk_rows, report_to_parent, progress)
+
+    def report_image(self, name: str, path: Optional[str] = None, plot: Optional["pyplot.plot"] = None,
+                     image: Optional[Union["numpy.ndarray", bytes]] = None):
         """Report an image metric to the AML run. Note: this does not report to AppInsights.
         e.g. Condensed_Binocular.report_image("ROC", plot=plt)
         :param name: The name of the metric.
         :param path: The path or stream of the image.
-        :param plot: The plot to report as an image.
+        :param plot: The plot to report as an image. Without background_images, a plot is reported right away
+        through the AML guard because it may change once this method returns; with background_images, a snapshot of it is rendered and
+        uploaded in the background. Only image paths are kept in the spool, not plots or streams.
+        :param image: A NumPy array of shape (height, width) or (height, width, channels), or encoded image bytes.
+        Arrays are rendered with image_format, and an image identical to the previous one of the same name is skipped.
+        """
+        if self.spool is not None and isinstance(path, str):
+            self.spool.append("report_image", name=name, path=path)
+        if image is not None or (plot is not None and self.background_images):
+            self.get_image_pipeline().submit(name, plot=plot, image=image)
+        elif plot is None:
+            self.log_to_aml(self.run.log_image, name, path=path, plot=plot)
+        else:
+            self.aml_guard.call(self.run.log_image, name, path=path, plot=plot)
+
+    def get_image_pipeline(self):
+        """Get the pipeline that renders and uploads the images of report_image, creating it on first use.
+        :return: The Image_Pipeline of this reporter.
+        """
+        if self.image_pipeline is None:
+            self.image_pipeline = image_pipeline.Image_Pipeline(
+                self.upload_image, self.background_images, self.image_format, self.image_quality,
+                max_pixels=self.image_max_pixels)
+        return self.image_pipeline
+
+    def upload_image(self, name: str, path: str):
+        """Upload an image file rendered by the image pipeline to the AML run, through the AML guard.
+        :param name: The name of the metric.
+        :param path: The path of the image file.
+        :return: True if the image was uploaded, False if it was kept for later, None if it failed for good.
         """
-        self.run.log_image(name, path=path, plot=plot)
+        return self.aml_guard.call(self.run.log_image, name, path=path)
+
+    def get_report_runs(self, report_to_parent: bool = False):
+        """Get the AML runs to report to: the run itself and, for an online run, its cached ancestor runs.
+        :param report_to_parent: Mark True if you want to report to AML parent run.
+        :return: A list of runs, starting with the run itself.
+        """
+        if report_to_parent and not self.offline_run:
+            return [self.run] + self.get_ancestor_runs()
+        return [self.run]
+
+    def get_ancestor_runs(self):
+        """Get the parent run and further ancestors up to ancestor_depth, looking them up on first use only.
+        :return: A list of runs, starting with the parent run.
+        """
+        if self.ancestor_runs is None:
+            ancestor_runs = []
+            run = self.run
+            while len(ancestor_runs) < self.ancestor_depth:
+                run = run.parent
+                if run is None:
+                    break
+                ancestor_runs.append(run)
+            self.ancestor_runs = ancestor_runs
+        return self.ancestor_runs
+
+    def refresh_ancestor_runs(self):
+        """Look up the parent run and further ancestors again on next use, e.g. after the run was resubmitted.
+        """
+        self.ancestor_runs = None
+
+    def log_to_aml(self, log_method, *args, **kwargs):
+        """Call an AML logging method, or queue it for the background thread in non-blocking mode. The call goes
+        through the AML guard: it is retried on transient failures, kept for later while the circuit is open, and
+        its exceptions are logged instead of raised, so AppInsights and the local sinks are still reported to.
+        e.g. Condensed_Binocular.log_to_aml(self.run.log, name, value)
+        :param log_method: The logging method of the run, e.g. run.log or run.parent.log_list.
+        :param args: The positional arguments of the logging method.
+        :param kwargs: The keyword arguments of the logging method.
+        """
+        if self.dispatcher is None:
+            self.aml_guard.call(log_method, *args, **kwargs)
+        else:
+            self.dispatcher.submit(self.aml_guard.call, log_method, *args, **kwargs)
+
+    def stats(self):
+        """Get the statistics of the reporter itself: the depth of its queues and, with instrument, its call counts,
+        latency percentiles in milliseconds split into AML, AppInsights and local time, and its exports.
+        e.g. Condensed_Binocular.stats()["latency_ms"]["report_metric"]["aml"]["p95"]
+        :return: A dictionary with the keys "queue_depth", "dropped" and "folded_tags", the number of values per
+        metric recorded under the "other" tags past max_cardinality, "unchanged", the number of AML writes skipped by
+        changes_only, "circuits", the circuit state, retries and calls kept for later per destination, and with
+        instrument, "calls", "latency_ms", "exports" and "export_errors".
+        """
+        queue_depth = {}
+        if self.dispatcher is not None:
+            queue_depth["dispatcher"] = self.dispatcher.queue.qsize()
+        if self.series_dispatcher is not None:
+            queue_depth["series"] = self.series_dispatcher.queue.qsize()
+        if self.batcher is not None:
+            queue_depth["batcher"] = self.batcher.pending()
+        if self.thread_buffers is not None:
+            queue_depth["thread_buffers"] = self.thread_buffers.pending()
+        if self.image_pipeline is not None and self.image_pipeline.dispatcher is not None:
+            queue_depth["image_pipeline"] = self.image_pipeline.dispatcher.queue.qsize()
+        dropped = self.dispatcher.dropped if self.dispatcher is not None else 0
+        if self.thread_buffers is not None:
+            dropped += self.thread_buffers.dropped
+        results = {"queue_depth": queue_depth, "dropped": dropped,
+                   "circuits": {constants.COMPONENT_AML: self.aml_guard.stats(),
+                                constants.COMPONENT_APP_INSIGHTS: self.app_insights_guard.stats()},
+                   "folded_tags": {name: dimensions.folded for name, dimensions in self.metric_dimensions.items()
+                                   if dimensions.folded},
+                   "unchanged": self.change_filter.suppressed if self.change_filter is not None else 0}
+        if self.instrumentation is not None:
+            results.update(self.instrumentation.results())
+        return results
+
+    def emit_stats(self):
+        """Record the statistics of the reporter as AppInsights metrics, in a single measurement.
+        """
+        self.record_last_values(reporter_stats.Reporter_Stats.to_metrics(self.stats()))
+
+    def start_sweeper(self, interval: float):
+        """Start the background thread that checks the state kept between reports, or make it check at least once
+        per interval if it runs already.
+        :param interval: The number of seconds after which the state is due, e.g. batch_interval.
+        """
+        interval = min(interval, constants.DEFAULT_SWEEP_INTERVAL)
+        if self.sweeper is None:
+            self.sweeper = sweeper.Sweeper(self.sweep, interval)
+        else:
+            self.sweeper.interval = min(self.sweeper.interval, interval)
+
+    def sweep(self):
+        """Act on the state that is due although nothing was reported: end the rate limiting window once
+        sampling_window has passed, upload the batches older than batch_interval, and record the summaries once
+        summary_interval has passed.
+        """
+        now = time.monotonic()
+        if self.limiter is not None:
+            with self.lock:
+                ended = self.limiter.end_window(now) if self.limiter.window_ended(now) else []
+            self.send_limiter_window(ended)
+        if self.batcher is not None:
+            self.batcher.sweep(now)
+        if self.metric_summaries and now - self.summary_started >= self.summary_interval:
+            self.record_summaries()
+
+    def flush(self):
+        """Record the summaries of the current interval, upload the batched values, wait until all the pending
+        AML logging calls have been sent and export the recorded metrics to AppInsights right away.
+        """
+        if self.thread_buffers is not None:
+            self.thread_buffers.flush()
+        if self.limiter is not None:
+            self.report_limiter_window(time.monotonic())
+        self.finalize_series()
+        self.record_summaries()
+        if self.batcher is not None:
+            self.batcher.flush()
+        if self.dispatcher is not None:
+            self.dispatcher.flush()
+        if self.series_dispatcher is not None:
+            self.series_dispatcher.flush()
+        if self.image_pipeline is not None:
+            self.image_pipeline.flush()
+        if self.aml_guard.shed:
+            self.aml_guard.replay()
+        if self.spool is not None:
+            self.spool.flush()
+        self.dispatch_sinks(self.local_sinks, "flush")
+        self.exporter.export_metrics(stats_module.stats.get_metrics())
+
+    def close(self):
+        """Record the summaries, send the batched values and pending AML logging calls, and stop the background thread.
+        The exporter is unregistered and shut down, or released to the pool. Call this when done reporting.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        if self.sweeper is not None:
+            self.sweeper.close()
+        if self.thread_buffers is not None:
+            self.thread_buffers.close()
+        if self.limiter is not None:
+            self.report_limiter_window(time.monotonic())
+        self.finalize_series()
+        self.record_summaries()
+        atexit.unregister(self.record_summaries)
+        if self.batcher is not None:
+            self.batcher.close()
+        if self.dispatcher is not None:
+            self.dispatcher.close()
+        if self.series_dispatcher is not None:
+            self.series_dispatcher.close()
+        # The images kept for later by the AML guard stay on disk until it has replayed them.
+        if self.image_pipeline is not None:
+            self.image_pipeline.flush()
+        self.aml_guard.close()
+        if self.spool is not None:
+            self.spool.close()
+        if self.image_pipeline is not None:
+            self.image_pipeline.close()
+        self.dispatch_sinks(self.local_sinks, "close")
+        if self.pool is not None:
+            self.pool.release(self)
+        else:
+            self.shutdown_exporter(self.exporter)
+            self.app_insights_guard.close()
 
     def get_run_id(self, run):
         """Get the correlation ID in the following order:
@@ -134,19 +1012,86 @@ class Condensed_Binocular:
         return run.id if not run.id.startswith(constants.OFFLINE_RUN_PREFIX) else str(uuid.uuid1())
 
     @staticmethod
-    def set_view(metric, description, measure):
+    def shutdown_exporter(exporter):
+        """Unregister an exporter and shut it down, which exports the metrics recorded since its last export. The
+        exit handler of the exporter is removed too, as it would keep the exporter and its reporter in memory.
+        :param exporter: The exporter of opencensus.
+        """
+        stats_module.stats.view_manager.unregister_exporter(exporter)
+        atexit.unregister(exporter.shutdown)
+        exporter.shutdown()
+
+    @staticmethod
+    def set_view(metric, description, measure, columns: tuple = ()):
         """ Set the view for the custom metric.
         :param metric:
         :param description:
         :param measure:
+        :param columns: The tag keys of the dimensions of the metric.
         """
-        prompt_view = view_module.View(metric, description, [], measure, aggregation_module.LastValueAggregation())
+        prompt_view = view_module.View(metric, description, list(columns), measure,
+                                       aggregation_module.LastValueAggregation())
         stats_module.stats.view_manager.register_view(prompt_view)
 
+    def get_common_properties(self):
+        """Get the custom dimensions attached to every exported metric: the correlation id, and the AML run id,
+        experiment name, node rank and git commit when they are known. The export batches of a pool hold the values
+        of many runs, so only the node rank and the git commit of the environment are attached to them, and the
+        correlation id of a pooled reporter is the RUN_TAG_KEY dimension of its values.
+        :return: A dictionary of property names and string values.
+        """
+        properties = {}
+        run_properties = None
+        if self.pool is None:
+            properties["Correlation_id"] = self.run_id
+            if not self.offline_run:
+                properties["Run_id"] = self.run.id
+                properties["Experiment"] = self.run.experiment.name
+            run_properties = getattr(self.run, "properties", None)
+        node_rank = next((os.environ[name] for name in constants.NODE_RANK_VARIABLES if name in os.environ), None)
+        if node_rank is not None:
+            properties["Node_rank"] = node_rank
+        git_sha = run_properties.get(constants.GIT_SHA_RUN_PROPERTY) if isinstance(run_properties, Mapping) else None
+        if git_sha is None:
+            git_sha = next((os.environ[name] for name in constants.GIT_SHA_VARIABLES if name in os.environ), None)
+        if git_sha is not None:
+            properties["Git_sha"] = git_sha
+        return {name: str(value) for name, value in properties.items()}
+
+    def add_batch_processor(self, processor: Callable[[list], list]):
+        """Add a processor of the envelopes of each export batch to AppInsights, run after the previous ones.
+        e.g. Condensed_Binocular.add_batch_processor(lambda envelopes: [e for e in envelopes if e.data.baseData.metrics])
+        :param processor: A function taking the list of envelopes of a batch and returning the envelopes to export.
+        """
+        self.batch_processors = self.batch_processors + (processor,)
+
+    def process_batch(self, envelopes: List):
+        """Run the batch processors over an export batch, and then the per-envelope telemetry processors of the
+        exporter. This replaces apply_telemetry_processors of the exporter.
+        :param envelopes: The envelopes of the batch.
+        :return: The envelopes to export.
+        """
+        for processor in self.batch_processors:
+            envelopes = processor(envelopes)
+            if not envelopes:
+                return []
+        return self.apply_telemetry_processors(envelopes)
+
+    def add_common_properties(self, envelopes: List):
+        """Add the common properties to the custom dimensions of every envelope of a batch.
+        :param envelopes: The envelopes of the batch.
+        :return: The envelopes.
+        """
+        common_properties = self.common_properties
+        for envelope in envelopes:
+            envelope.data.baseData.properties.update(common_properties)
+        return envelopes
+
     def callback_function(self, envelope):
-        """ Attach a correlation_id as a custom dimension to the exporter just before sending the metrics.
+        """ Attach the common properties as custom dimensions to a single envelope. The exporter does this for whole
+        batches with add_common_properties; this remains for telemetry processors registered by hand.
         :param envelope:
         :return: Always return True (if False, it does not export metrics)
         """
-        envelope.data.baseData.properties["Correlation_id"] = self.run_id
+        envelope.data.baseData.properties.update(self.common_properties)
         return True
@@ -1 +1,84 @@
-OFFLINE_RUN_PREFIX = "OfflineRun"
\ No newline at end of file
+OFFLINE_RUN_PREFIX = "OfflineRun"
+AGGREGATION_LAST_VALUE = "last_value"
+DEFAULT_QUEUE_SIZE = 10000
+BACKPRESSURE_BLOCK = "block"
+BACKPRESSURE_DROP_OLDEST = "drop_oldest"
+BACKPRESSURE_DROP_NEWEST = "drop_newest"
+BACKPRESSURE_POLICIES = (BACKPRESSURE_BLOCK, BACKPRESSURE_DROP_OLDEST, BACKPRESSURE_DROP_NEWEST)
+DEFAULT_BATCH_INTERVAL = 10.0
+AGGREGATION_COUNT = "count"
+AGGREGATION_SUM = "sum"
+AGGREGATION_SUMMARY = "summary"
+AGGREGATION_DISTRIBUTION = "distribution"
+AGGREGATIONS = (AGGREGATION_LAST_VALUE, AGGREGATION_COUNT, AGGREGATION_SUM, AGGREGATION_SUMMARY, AGGREGATION_DISTRIBUTION)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATISTIC_NAME_FORMAT = "{}_{}"
+DEFAULT_EXPORT_INTERVAL = 15.0
+DEFAULT_EXPORT_BATCH_SIZE = 100
+DEFAULT_EXPORT_RETRY_INTERVAL = 60.0
+# Failed exports are kept on local storage and retried, as opencensus does by default.
+DEFAULT_EXPORT_LOCAL_STORAGE = True
+DEFAULT_SAMPLING_WINDOW = 60.0
+DROPPED_STATISTIC = "dropped"
+SAMPLED_OUT_STATISTIC = "sampled_out"
+DEFAULT_ASYNC_WORKERS = 1
+REDUCTION_MEAN = "mean"
+REDUCTION_SUM = "sum"
+REDUCTION_MAX = "max"
+REDUCTION_MIN = "min"
+REDUCTIONS = (REDUCTION_MEAN, REDUCTION_SUM, REDUCTION_MAX, REDUCTION_MIN)
+DEFAULT_AGGREGATOR_INTERVAL = 5.0
+DEFAULT_TABLE_CHUNK_ROWS = 250
+DEFAULT_IMAGE_FORMAT = "png"
+DEFAULT_IMAGE_QUALITY = 85
+DEFAULT_IMAGE_DPI = 100
+DEFAULT_IMAGE_QUEUE_SIZE = 16
+# The leading bytes of the encoded image formats, and the file extension they are uploaded with.
+IMAGE_SIGNATURES = ((b"\x89PNG\r\n\x1a\n", "png"), (b"\xff\xd8\xff", "jpg"), (b"GIF87a", "gif"), (b"GIF89a", "gif"),
+                    (b"BM", "bmp"), (b"II*\x00", "tif"), (b"MM\x00*", "tif"))
+DEFAULT_STATS_WINDOW = 1024
+STATS_PERCENTILES = (50, 95, 99)
+STATS_METRIC_PREFIX = "condensed_binocular"
+COMPONENT_TOTAL = "total"
+COMPONENT_AML = "aml"
+COMPONENT_APP_INSIGHTS = "app_insights"
+COMPONENT_LOCAL = "local"
+DEFAULT_THREAD_BUFFER_INTERVAL = 0.1
+# The longest time between two checks of the batches, summaries and rate limiting windows while nothing is reported.
+DEFAULT_SWEEP_INTERVAL = 1.0
+DEFAULT_MAX_CARDINALITY = 100
+OTHER_TAG_VALUE = "other"
+MAX_TAG_VALUE_LENGTH = 255
+NODE_RANK_VARIABLES = ("NODE_RANK", "AZUREML_CR_NODE_RANK", "OMPI_COMM_WORLD_RANK", "RANK")
+GIT_SHA_VARIABLES = ("GIT_SHA", "GIT_COMMIT", "GITHUB_SHA", "BUILD_SOURCEVERSION")
+GIT_SHA_RUN_PROPERTY = "azureml.git.commit"
+# The dimension that tells apart the runs of the reporters sharing a Reporter_Pool.
+RUN_TAG_KEY = "Correlation_id"
+DEFAULT_HEARTBEAT_INTERVAL = 300.0
+CHANGE_LOG = "log"
+CHANGE_TAG = "tag"
+DEFAULT_SINK_BATCH_SIZE = 10000
+DEFAULT_SINK_FLUSH_INTERVAL = 30.0
+DEFAULT_RING_BUFFER_CAPACITY = 100000
+DEFAULT_PROMETHEUS_PORT = 9464
+SERIES_LTTB = "lttb"
+SERIES_MIN_MAX = "min_max"
+SERIES_STRATEGIES = (SERIES_LTTB, SERIES_MIN_MAX)
+DEFAULT_SERIES_RESOLUTION = 200
+DEFAULT_SERIES_RANGE = 2000
+DEFAULT_SERIES_MAX_POINTS = 100000
+# Stands in for a missing step in the step columns of the point buffers.
+NO_STEP = -2 ** 63
+DEFAULT_RETRY_ATTEMPTS = 3
+DEFAULT_RETRY_BASE_DELAY = 0.5
+DEFAULT_RETRY_MAX_DELAY = 10.0
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 60.0
+DEFAULT_SHED_CAPACITY = 10000
+RETRYABLE_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+# The transmission results of the AppInsights exporter of opencensus, TransportStatusCode.
+TRANSMIT_SUCCESS = 0
+TRANSMIT_RETRY = 1
@@ -0,0 +1,90 @@
+import atexit
+import logging
+import queue
+import threading
+import constants
+
+logger = logging.getLogger(__name__)
+
+
+class Background_Dispatcher:
+    """ This class runs logging calls in order on a single background thread, so the caller does not wait for them.
+    """
+
+    def __init__(self, queue_size: int = constants.DEFAULT_QUEUE_SIZE, backpressure: str = constants.BACKPRESSURE_BLOCK):
+        """Initializes the dispatcher and starts its worker thread.
+        :param queue_size: The maximum number of pending calls.
+        :param backpressure: What to do when the queue is full: block the caller, drop the oldest or drop the newest call.
+        :type backpressure: One of constants.BACKPRESSURE_POLICIES.
+        """
+        if backpressure not in constants.BACKPRESSURE_POLICIES:
+            raise ValueError("Unknown backpressure policy '{}', expected one of {}.".format(
+                backpressure, constants.BACKPRESSURE_POLICIES))
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.backpressure = backpressure
+        self.dropped = 0
+        self.closed = False
+        self.worker = threading.Thread(target=self.work, name="condensed-binocular-dispatcher", daemon=True)
+        self.worker.start()
+        atexit.register(self.close)
+
+    def submit(self, function, *args, **kwargs):
+        """Queue a call to be run on the worker thread.
+        e.g. dispatcher.submit(run.log, "accuracy", 0.9)
+        :param function: The function to call.
+        :param args: The positional arguments of the call.
+        :param kwargs: The keyword arguments of the call.
+        :return: False if the call was dropped because the queue is full, True otherwise.
+        """
+        if self.closed:
+            raise RuntimeError("The dispatcher is closed.")
+
+        item = (function, args, kwargs)
+        if self.backpressure == constants.BACKPRESSURE_BLOCK:
+            self.queue.put(item)
+            return True
+
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return True
+            except queue.Full:
+                self.dropped += 1
+                if self.backpressure == constants.BACKPRESSURE_DROP_NEWEST:
+                    return False
+            try:
+                self.queue.get_nowait()
+                self.queue.task_done()
+            except queue.Empty:
+                pass
+
+    def work(self):
+        """Run the queued calls in order until the dispatcher is closed.
+        """
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                function, args, kwargs = item
+                function(*args, **kwargs)
+            except Exception:
+                logger.exception("Background logging call failed.")
+            finally:
+                self.queue.task_done()
+
+    def flush(self):
+        """Wait until all the queued calls have been run.
+        """
+        self.queue.join()
+
+    def close(self):
+        """Run the remaining queued calls and stop the worker thread.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.worker.join()
+        atexit.unregister(self.close)
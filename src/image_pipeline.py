@@ -0,0 +1,172 @@
+import hashlib
+import io
+import math
+import os
+import pickle
+import shutil
+import tempfile
+import uuid
+import constants
+import dispatcher
+from typing import Optional
+
+
+def image_extension(data: bytes, default: str):
+    """Detect the format of encoded image bytes from their leading bytes.
+    :param data: The encoded image.
+    :param default: The extension of an image of unknown format.
+    :return: The file extension of the format, e.g. "jpg".
+    """
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    for signature, extension in constants.IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return extension
+    return default
+
+
+class Figure_Pickler(pickle.Pickler):
+    """ A pickler that snapshots matplotlib figures without their link to pyplot, so the copy can be rendered on
+    another thread without opening a window or changing the current pyplot figure.
+    """
+
+    def reducer_override(self, obj):
+        from matplotlib.figure import Figure
+        if isinstance(obj, Figure):
+            state = obj.__getstate__()
+            state.pop("_restore_to_pylab", None)
+            return Figure.__new__, (type(obj),), state
+        return NotImplemented
+
+
+class Image_Pipeline:
+    """ This class takes image snapshots on the calling thread, and renders, compresses, downsizes and uploads them
+    on a background thread. Images identical to the previous upload of the same name are skipped.
+    """
+
+    def __init__(self, upload, background: bool = True, image_format: str = constants.DEFAULT_IMAGE_FORMAT,
+                 quality: int = constants.DEFAULT_IMAGE_QUALITY, dpi: int = constants.DEFAULT_IMAGE_DPI,
+                 max_pixels: Optional[int] = None, queue_size: int = constants.DEFAULT_IMAGE_QUEUE_SIZE):
+        """Initializes the pipeline.
+        :param upload: The function that uploads an image file, called as upload(name, path). It returns True when
+        the image was uploaded, False when the upload is kept for later, and the file is then kept until the pipeline
+        is closed, or None when the upload failed for good, and the same image may then be uploaded again.
+        :param background: Mark False to render and upload on the calling thread.
+        :param image_format: The format of the rendered images, e.g. "png" or "jpeg".
+        :param quality: The quality of lossy formats, from 1 to 95.
+        :param dpi: The resolution figures are rendered at.
+        :param max_pixels: If set, figures are rendered at a lower resolution and arrays are downsampled, so that the
+        images have at most this many pixels.
+        :param queue_size: The maximum number of snapshots waiting for the background thread.
+        """
+        self.upload = upload
+        self.image_format = image_format
+        self.quality = quality
+        self.dpi = dpi
+        self.max_pixels = max_pixels
+        self.hashes = {}
+        self.directory = tempfile.mkdtemp(prefix="condensed-binocular-")
+        self.dispatcher = dispatcher.Background_Dispatcher(queue_size) if background else None
+
+    def submit(self, name: str, plot=None, image=None):
+        """Snapshot an image and queue it to be rendered and uploaded.
+        e.g. Image_Pipeline.submit("ROC", plot=figure)
+        :param name: The name of the image metric.
+        :param plot: A matplotlib figure, or the pyplot module for its current figure.
+        :param image: A NumPy array of shape (height, width) or (height, width, channels), or encoded image bytes,
+        uploaded as they are with the extension of their format, e.g. PNG, JPEG, GIF or WebP.
+        """
+        if plot is not None:
+            figure = plot.gcf() if hasattr(plot, "gcf") else plot
+            snapshot = io.BytesIO()
+            Figure_Pickler(snapshot, pickle.HIGHEST_PROTOCOL).dump(figure)
+            args = (name, "figure", snapshot.getvalue())
+        elif isinstance(image, (bytes, bytearray)):
+            args = (name, "bytes", bytes(image))
+        else:
+            args = (name, "array", image.copy())
+
+        if self.dispatcher is None:
+            self.process(*args)
+        else:
+            self.dispatcher.submit(self.process, *args)
+
+    def process(self, name: str, kind: str, snapshot):
+        """Render a snapshot, and upload it unless it is unchanged since the previous upload of the same name.
+        :param name: The name of the image metric.
+        :param kind: The kind of snapshot: "figure", "array" or "bytes".
+        :param snapshot: The pickled figure, the array or the encoded bytes.
+        """
+        if kind == "figure":
+            data, extension = self.render_figure(pickle.loads(snapshot)), self.image_format
+        elif kind == "array":
+            data, extension = self.render_array(snapshot), self.image_format
+        else:
+            data, extension = snapshot, image_extension(snapshot, self.image_format)
+
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        if self.hashes.get(name) == digest:
+            return
+        self.hashes[name] = digest
+
+        path = os.path.join(self.directory, "{}.{}".format(uuid.uuid4().hex, extension))
+        with open(path, "wb") as file:
+            file.write(data)
+        uploaded = None
+        try:
+            uploaded = self.upload(name, path)
+        finally:
+            if uploaded is not False:
+                os.remove(path)
+            if uploaded is None:
+                self.hashes.pop(name, None)
+
+    def render_figure(self, figure):
+        """Rasterize and compress a figure, within the pixel budget.
+        :param figure: A matplotlib figure that is not managed by pyplot.
+        :return: The encoded image bytes.
+        """
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        FigureCanvasAgg(figure)
+        dpi = self.dpi
+        if self.max_pixels is not None:
+            width, height = figure.get_size_inches()
+            dpi = min(dpi, math.sqrt(self.max_pixels / (width * height)))
+        output = io.BytesIO()
+        figure.savefig(output, format=self.image_format, dpi=dpi, **self.save_options())
+        return output.getvalue()
+
+    def render_array(self, array):
+        """Compress an array as an image, downsampled within the pixel budget.
+        :param array: A NumPy array of shape (height, width) or (height, width, channels).
+        :return: The encoded image bytes.
+        """
+        from matplotlib import image as image_module
+        if self.max_pixels is not None:
+            stride = math.ceil(math.sqrt(array.shape[0] * array.shape[1] / self.max_pixels))
+            if stride > 1:
+                array = array[::stride, ::stride]
+        output = io.BytesIO()
+        image_module.imsave(output, array, format=self.image_format, **self.save_options())
+        return output.getvalue()
+
+    def save_options(self):
+        """Get the encoder options of the image format.
+        :return: The keyword arguments for savefig or imsave.
+        """
+        if self.image_format.lower() in ("jpg", "jpeg", "webp"):
+            return {"pil_kwargs": {"quality": self.quality}}
+        return {}
+
+    def flush(self):
+        """Wait until the queued images have been uploaded.
+        """
+        if self.dispatcher is not None:
+            self.dispatcher.flush()
+
+    def close(self):
+        """Upload the queued images, stop the background thread and remove the temporary directory.
+        """
+        if self.dispatcher is not None:
+            self.dispatcher.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
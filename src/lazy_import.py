@@ -0,0 +1,33 @@
+import importlib
+
+
+class Lazy_Import:
+    """ This class stands in for a module, or for an attribute of a module, and only imports it on first use.
+    e.g. Run = Lazy_Import("azureml.core", "Run")
+    """
+
+    def __init__(self, module_name: str, attribute: str = None):
+        """Initializes the stand-in without importing anything.
+        :param module_name: The full name of the module, e.g. "opencensus.stats.stats".
+        :param attribute: The name of the attribute of the module to stand in for, or None for the module itself.
+        """
+        self._module_name = module_name
+        self._attribute = attribute
+        self._target = None
+
+    def _load(self):
+        """Import the module on first use.
+        :return: The module, or its attribute.
+        """
+        if self._target is None:
+            target = importlib.import_module(self._module_name)
+            if self._attribute is not None:
+                target = getattr(target, self._attribute)
+            self._target = target
+        return self._target
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
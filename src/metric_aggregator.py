@@ -0,0 +1,254 @@
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+import constants
+from multiprocessing import connection
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Worker_Reporter:
+    """ This class is the lightweight reporter of a worker process, e.g. a DataLoader worker or a DDP rank. It only
+    sends the report_* calls to the Metric_Aggregator, which does the actual reporting to AML and AppInsights.
+    """
+
+    def __init__(self, channel, rank: int = 0):
+        """Initializes the worker reporter.
+        :param channel: The channel to the aggregator, with a put(message) method.
+        :param rank: The rank of the worker, to reduce the values of the same step across workers.
+        """
+        self.channel = channel
+        self.rank = rank
+        self.sequence = {}
+
+    @staticmethod
+    def connect(address: tuple, authkey: bytes, rank: int = 0):
+        """Connect to an aggregator listening on a local address, e.g. from a DDP rank started by torchrun.
+        :param address: The (host, port) the aggregator listens on.
+        :param authkey: The authentication key of the aggregator.
+        :param rank: The rank of the worker.
+        :return: A Worker_Reporter.
+        """
+        return Worker_Reporter(Connection_Channel(connection.Client(address, authkey=authkey)), rank)
+
+    def report_metric(self, name: str, value: float, description="", report_to_parent: bool = False,
+                      step: Optional[int] = None):
+        """Report a metric value through the aggregator. With a reduction, the values of the same step from all
+        the workers are reduced to one value. Without a step, the Nth value of each worker is reduced together.
+        :param name: The name of the metric.
+        :param value: The value to be reported.
+        :param description: An optional description about the metric.
+        :param report_to_parent: Mark True if you want to report to AML parent run.
+        :param step: An optional step of the value, e.g. the training step.
+        """
+        if step is None:
+            key = self.sequence.get(name, 0)
+            self.sequence[name] = key + 1
+        else:
+            key = ("step", step)
+        self.channel.put(("report_metric", self.rank, (name, key), (name, value, description, report_to_parent),
+                          {"step": step}))
+
+    def report_list(self, name: str, value: list, report_to_parent: bool = False):
+        """Report a list of metric values through the aggregator, see Condensed_Binocular.report_list.
+        """
+        self.channel.put(("report_list", self.rank, None, (name, list(value), report_to_parent), {}))
+
+    def report_row(self, name: str, report_to_parent: bool = False, **kwargs: dict):
+        """Report a row metric through the aggregator, see Condensed_Binocular.report_row.
+        """
+        self.channel.put(("report_row", self.rank, None, (name, report_to_parent), kwargs))
+
+    def report_table(self, name: str, value: dict, report_to_parent: bool = False):
+        """Report a table metric through the aggregator, see Condensed_Binocular.report_table.
+        """
+        self.channel.put(("report_table", self.rank, None, (name, value, report_to_parent), {}))
+
+
+class Connection_Channel:
+    """ A channel over a multiprocessing connection, safe to use from several threads.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.lock = threading.Lock()
+
+    def put(self, message):
+        with self.lock:
+            self.conn.send(message)
+
+
+class Metric_Aggregator:
+    """ This class runs a single reporting process for many worker processes, so only one Run context, one
+    AppInsights exporter and one set of views exist. Workers send their metrics over a multiprocessing queue, or
+    over a local connection for processes that were not started by this process, and the values of the same step
+    can be reduced across workers (mean, sum, max or min) before they are reported.
+    e.g.
+        aggregator = Metric_Aggregator(reduction="mean", world_size=4)
+        aggregator.start()
+        worker_reporter = aggregator.client(rank)  # pass to the worker processes
+        ...
+        aggregator.close()
+    """
+
+    def __init__(self, reduction: Optional[str] = None, world_size: int = 1,
+                 flush_interval: float = constants.DEFAULT_AGGREGATOR_INTERVAL, address: Optional[tuple] = None,
+                 authkey: Optional[bytes] = None, **kwargs):
+        """Initializes the aggregator, without starting its process.
+        :param reduction: How to reduce the values of the same step across workers, or None to report every value.
+        :type reduction: One of constants.REDUCTIONS.
+        :param world_size: The number of workers whose values are reduced together.
+        :param flush_interval: The number of seconds after which a step is reduced, even if not all workers reported.
+        :param address: An optional local (host, port) to also accept connections from Worker_Reporter.connect.
+        :param authkey: The authentication key of the connections.
+        :param kwargs: The keyword arguments of the Condensed_Binocular of the aggregator process.
+        """
+        if reduction is not None and reduction not in constants.REDUCTIONS:
+            raise ValueError("Unknown reduction '{}', expected one of {}.".format(reduction, constants.REDUCTIONS))
+
+        self.reduction = reduction
+        self.world_size = world_size
+        self.flush_interval = flush_interval
+        self.address = address
+        self.authkey = authkey
+        self.reporter_kwargs = kwargs
+        self.queue = multiprocessing.Queue()
+        self.process = None
+
+    def start(self):
+        """Start the aggregator process.
+        """
+        process = multiprocessing.Process(target=self.run, name="condensed-binocular-aggregator", daemon=True)
+        process.start()
+        # Only kept once started, as the aggregator itself is pickled for the new process on some platforms.
+        self.process = process
+
+    def client(self, rank: int = 0):
+        """Get a reporter for a worker process started by this process.
+        :param rank: The rank of the worker.
+        :return: A Worker_Reporter.
+        """
+        return Worker_Reporter(self.queue, rank)
+
+    def close(self):
+        """Report the remaining values, close the reporter of the aggregator process and wait for it to stop.
+        """
+        self.queue.put(None)
+        if self.process is not None:
+            self.process.join()
+
+    def run(self):
+        """Report the metrics of the workers until closed. Runs in the aggregator process.
+        """
+        from condensed_binocular import Condensed_Binocular
+        reporter = Condensed_Binocular(**self.reporter_kwargs)
+        if self.address is not None:
+            listener = connection.Listener(self.address, authkey=self.authkey)
+            threading.Thread(target=self.accept, args=(listener,), daemon=True).start()
+        self.serve(reporter)
+        reporter.close()
+
+    def accept(self, listener):
+        """Accept connections from workers, and forward their messages to the queue.
+        :param listener: The listener of the local address.
+        """
+        while True:
+            conn = listener.accept()
+            threading.Thread(target=self.receive, args=(conn,), daemon=True).start()
+
+    def receive(self, conn):
+        """Forward the messages of a connection to the queue until it closes.
+        :param conn: The connection of a worker.
+        """
+        try:
+            while True:
+                self.queue.put(conn.recv())
+        except EOFError:
+            conn.close()
+
+    def serve(self, reporter):
+        """Report the messages of the queue with a reporter, reducing metric values across workers if needed.
+        :param reporter: The Condensed_Binocular to report with.
+        """
+        groups = {}
+        last_sweep = time.monotonic()
+        while True:
+            try:
+                message = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                message = ()
+            if message is None:
+                break
+            if message:
+                self.handle(reporter, groups, message)
+            now = time.monotonic()
+            if now - last_sweep >= self.flush_interval:
+                last_sweep = now
+                self.reduce_groups(reporter, groups, now - self.flush_interval)
+        self.reduce_groups(reporter, groups, float("inf"))
+
+    def handle(self, reporter, groups: dict, message: tuple):
+        """Report a message, or add its value to the group of its step. A group is reduced once every rank of the
+        world has reported to it; more values from a rank that already reported are reduced with the others.
+        :param reporter: The Condensed_Binocular to report with.
+        :param groups: The groups of values waiting for the other workers, by metric and step.
+        :param message: The (method, rank, key, args, kwargs) message of a worker.
+        """
+        method, rank, key, args, kwargs = message
+        try:
+            if method != "report_metric":
+                getattr(reporter, method)(*args, **kwargs)
+            elif self.reduction is None:
+                self.report_value(reporter, args, kwargs["step"])
+            else:
+                group = groups.get(key)
+                if group is None:
+                    group = groups[key] = (time.monotonic(), args, kwargs["step"], [], set())
+                group[3].append(args[1])
+                group[4].add(rank)
+                if len(group[4]) >= self.world_size:
+                    del groups[key]
+                    self.report_group(reporter, group)
+        except Exception:
+            logger.exception("Reporting %s of worker %s failed.", method, rank)
+
+    def reduce_groups(self, reporter, groups: dict, started_before: float):
+        """Reduce and report the groups that started before a given time, even if not all workers reported.
+        :param reporter: The Condensed_Binocular to report with.
+        :param groups: The groups of values waiting for the other workers, by metric and step.
+        :param started_before: The time.monotonic() before which groups are reduced.
+        """
+        for key in [key for key, group in groups.items() if group[0] <= started_before]:
+            self.report_group(reporter, groups.pop(key))
+
+    def report_group(self, reporter, group: tuple):
+        """Reduce the values of a group to one value and report it.
+        :param reporter: The Condensed_Binocular to report with.
+        :param group: The (started, args, step, values, ranks) group.
+        """
+        _, (name, _, description, report_to_parent), step, values, _ = group
+        if self.reduction == constants.REDUCTION_MEAN:
+            value = sum(values) / len(values)
+        elif self.reduction == constants.REDUCTION_SUM:
+            value = sum(values)
+        elif self.reduction == constants.REDUCTION_MAX:
+            value = max(values)
+        else:
+            value = min(values)
+        self.report_value(reporter, (name, value, description, report_to_parent), step)
+
+    @staticmethod
+    def report_value(reporter, args: tuple, step: Optional[int]):
+        """Report a metric value, with its step if any.
+        :param reporter: The Condensed_Binocular to report with.
+        :param args: The (name, value, description, report_to_parent) of the metric.
+        :param step: The step of the value, or None.
+        """
+        name, value, description, report_to_parent = args
+        if step is None:
+            reporter.report_metric(name, value, description, report_to_parent)
+        else:
+            reporter.report_metrics({name: value}, description, step, report_to_parent)
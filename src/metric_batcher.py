@@ -0,0 +1,158 @@
+import atexit
+import sys
+import threading
+import time
+from array import array
+from typing import Optional
+
+
+class Batch:
+    """ The buffered values of one metric for one run, waiting to be uploaded together. The values of a scalar
+    metric are packed in an array of doubles, 8 bytes per value, as long as they are all floats, so integer and
+    other values are uploaded unchanged.
+    """
+    __slots__ = ("log_method", "name", "columns", "values", "started")
+
+    def __init__(self, log_method, name: str, columns: Optional[tuple], started: float):
+        self.log_method = log_method
+        self.name = sys.intern(name)
+        self.columns = columns
+        self.values = array("d") if columns is None else []
+        self.started = started
+
+    def append(self, value):
+        """Buffer a value.
+        :param value: A scalar value, or the tuple of values of a row.
+        """
+        if self.values.__class__ is array and value.__class__ is not float:
+            self.values = self.values.tolist()
+        self.values.append(value)
+
+
+class Metric_Batcher:
+    """ This class buffers scalar and row values per metric, and uploads each buffer as a single
+    run.log_list or run.log_table call once it is full or old enough. The batches are uploaded in the order they are
+    taken, whichever thread takes them, so the values of a metric keep their order.
+    """
+
+    def __init__(self, send, batch_size: int, batch_interval: float):
+        """Initializes the batcher.
+        :param send: The function that uploads a batch, called as send(log_method, name, value).
+        :param batch_size: The number of values after which a metric is uploaded.
+        :param batch_interval: The number of seconds after which a metric is uploaded, even if its batch is not full.
+        """
+        self.send = send
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.batches = {}
+        self.last_sweep = time.monotonic()
+        self.lock = threading.Lock()
+        self.upload_lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def add_value(self, run, name: str, value: float):
+        """Buffer a scalar value, uploaded later with run.log_list.
+        e.g. Metric_Batcher.add_value(run, "loss", 0.3)
+        :param run: The run to upload the value to.
+        :param name: The name of the metric.
+        :param value: The value to be buffered.
+        """
+        self.add((id(run), name, None), run.log_list, name, None, value)
+
+    def add_row(self, run, name: str, row: dict):
+        """Buffer a row value, uploaded later with run.log_table.
+        e.g. Metric_Batcher.add_row(run, "citrus", {"fruit": "lime", "size": 3})
+        :param run: The run to upload the row to.
+        :param name: The name of the metric.
+        :param row: The columns of the row.
+        """
+        columns = tuple(row)
+        self.add((id(run), name, columns), run.log_table, name, columns, tuple(row.values()))
+
+    def add(self, key: tuple, log_method, name: str, columns: Optional[tuple], value):
+        """Buffer a value, and upload the batches that are full or older than the batch interval.
+        :param key: The key of the batch, unique per run, metric and columns.
+        :param log_method: The logging method of the run that uploads the batch.
+        :param name: The name of the metric.
+        :param columns: The column names of a row metric, None for a scalar metric.
+        :param value: The value to be buffered.
+        """
+        now = time.monotonic()
+        ready = []
+        with self.lock:
+            batch = self.batches.get(key)
+            if batch is None:
+                batch = self.batches[key] = Batch(log_method, name, columns, now)
+            batch.append(value)
+            if len(batch.values) >= self.batch_size:
+                ready.append(self.batches.pop(key))
+            if now - self.last_sweep >= self.batch_interval:
+                ready.extend(self.take_old(now))
+            if not ready:
+                return
+            self.upload_lock.acquire()
+        self.upload_all(ready)
+
+    def sweep(self, now: Optional[float] = None):
+        """Upload the batches older than the batch interval, e.g. from a timer while no value is added.
+        :param now: The current time.monotonic(), read by default.
+        """
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            ready = self.take_old(now)
+            if not ready:
+                return
+            self.upload_lock.acquire()
+        self.upload_all(ready)
+
+    def take_old(self, now: float):
+        """Take out the batches older than the batch interval. Called with the lock held.
+        :param now: The current time.monotonic().
+        :return: The batches, oldest key first.
+        """
+        self.last_sweep = now
+        old_keys = [key for key, batch in self.batches.items() if now - batch.started >= self.batch_interval]
+        return [self.batches.pop(key) for key in old_keys]
+
+    def upload_all(self, ready: list):
+        """Upload batches taken out with the lock held, releasing the upload lock taken along with them.
+        :param ready: The batches to be uploaded.
+        """
+        try:
+            for batch in ready:
+                self.upload(batch)
+        finally:
+            self.upload_lock.release()
+
+    def upload(self, batch: Batch):
+        """Upload a batch with a single logging call.
+        :param batch: The batch to be uploaded.
+        """
+        if batch.columns is None:
+            self.send(batch.log_method, batch.name, list(batch.values))
+        else:
+            table = {column: [row[index] for row in batch.values] for index, column in enumerate(batch.columns)}
+            self.send(batch.log_method, batch.name, table)
+
+    def pending(self):
+        """Count the buffered values.
+        :return: The number of values waiting to be uploaded.
+        """
+        with self.lock:
+            return sum(len(batch.values) for batch in self.batches.values())
+
+    def flush(self):
+        """Upload all the buffered values.
+        """
+        with self.lock:
+            ready = list(self.batches.values())
+            self.batches.clear()
+            self.last_sweep = time.monotonic()
+            self.upload_lock.acquire()
+        self.upload_all(ready)
+
+    def close(self):
+        """Upload all the buffered values and stop flushing at interpreter exit.
+        """
+        self.flush()
+        atexit.unregister(self.flush)
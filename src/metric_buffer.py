@@ -0,0 +1,81 @@
+import sys
+import constants
+from array import array
+from typing import Mapping, Optional
+
+
+class Point_Buffer:
+    """ Buffered metric points in compact columns: the values, timestamps and steps are packed 8 bytes each in
+    arrays, the names are interned so every point of a metric shares one string, and the tags, which most points do
+    not have, are kept apart by position. A point costs about 32 bytes, instead of a tuple and float objects of
+    about 150 bytes. With a capacity, the oldest points are overwritten once the buffer is full.
+    """
+    __slots__ = ("capacity", "start", "names", "values", "timestamps", "steps", "tags")
+
+    def __init__(self, capacity: Optional[int] = None):
+        """Initializes an empty buffer.
+        :param capacity: The maximum number of points kept, or None for no limit.
+        """
+        self.capacity = capacity
+        self.clear()
+
+    def clear(self):
+        """Drop all the points.
+        """
+        # The position of the oldest point, which moves once a buffer with a capacity is full.
+        self.start = 0
+        self.names = []
+        self.values = array("d")
+        self.timestamps = array("d")
+        self.steps = array("q")
+        self.tags = {}
+
+    def append(self, name: str, value: float, timestamp: float, step: Optional[int] = None,
+               tags: Optional[Mapping[str, str]] = None):
+        """Add a point.
+        e.g. Point_Buffer.append("loss", 0.3, time.time(), step=10)
+        :param name: The name of the metric.
+        :param value: The value of the point.
+        :param timestamp: The time of the point, in seconds since the epoch.
+        :param step: An optional step of the point.
+        :param tags: Optional dimensions of the point.
+        """
+        name = sys.intern(name)
+        step = constants.NO_STEP if step is None else step
+        if self.capacity is None or len(self.names) < self.capacity:
+            index = len(self.names)
+            self.names.append(name)
+            self.values.append(value)
+            self.timestamps.append(timestamp)
+            self.steps.append(step)
+        else:
+            index = self.start
+            self.start = (index + 1) % self.capacity
+            self.names[index] = name
+            self.values[index] = value
+            self.timestamps[index] = timestamp
+            self.steps[index] = step
+            self.tags.pop(index, None)
+        if tags:
+            self.tags[index] = tags
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        """Iterate over the points, oldest first.
+        :return: An iterator of (timestamp, name, value, step, tags) tuples, with None for a missing step.
+        """
+        count = len(self.names)
+        for offset in range(count):
+            index = (self.start + offset) % count
+            step = self.steps[index]
+            yield (self.timestamps[index], self.names[index], self.values[index],
+                   None if step == constants.NO_STEP else step, self.tags.get(index))
+
+    def nbytes(self):
+        """Estimate the memory held by the buffer, without the interned names and the tags themselves.
+        :return: The number of bytes.
+        """
+        return (sys.getsizeof(self.names) + sys.getsizeof(self.tags) + sum(
+            column.buffer_info()[1] * column.itemsize for column in (self.values, self.timestamps, self.steps)))
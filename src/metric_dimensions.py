@@ -0,0 +1,85 @@
+import sys
+import threading
+import constants
+from typing import Mapping, Optional
+from lazy_import import Lazy_Import
+
+tag_map_module = Lazy_Import("opencensus.tags.tag_map")
+
+
+class Metric_Dimensions:
+    """ The tag keys of a metric, which are declared as the columns of its view, and the tag maps of the combinations
+    of tag values reported so far. Past max_cardinality combinations, the values are recorded under a single
+    combination where every tag is "other", so the number of time series of the metric stays bounded. Pinned keys,
+    e.g. the run of a pooled reporter, keep their value in the "other" combination and do not count as combinations.
+    """
+
+    def __init__(self, tag_keys: tuple, max_cardinality: Optional[int] = constants.DEFAULT_MAX_CARDINALITY,
+                 pinned_keys: tuple = ()):
+        """Initializes the dimensions of a metric.
+        :param tag_keys: The names of the dimensions, e.g. ("model_version", "region").
+        :param max_cardinality: The maximum number of combinations of tag values, or None for no limit.
+        :param pinned_keys: The names of the dimensions set by the reporter, which come first in tag_keys.
+        """
+        self.tag_keys = tuple(sys.intern(key) for key in tuple(pinned_keys) + tuple(tag_keys))
+        self.pinned = len(pinned_keys)
+        self.max_cardinality = max_cardinality
+        self.tag_maps = {}
+        self.combinations = set()
+        self.other_tag_maps = {}
+        self.folded = 0
+        self.lock = threading.Lock()
+
+    def get_tag_map(self, tags: Mapping[str, str]):
+        """Get the cached tag map of a combination of tag values, creating it on first use.
+        e.g. Metric_Dimensions.get_tag_map({"model_version": "3", "region": "westeurope"})
+        :param tags: The tag values, a dictionary where keys are tag keys. Keys that are not dimensions are ignored.
+        :return: The TagMap of the combination, or the "other" TagMap once max_cardinality is reached.
+        """
+        values = tuple(tags.get(key) for key in self.tag_keys)
+        tag_map = self.tag_maps.get(values)
+        if tag_map is not None:
+            return tag_map
+
+        with self.lock:
+            tag_map = self.tag_maps.get(values)
+            if tag_map is not None:
+                return tag_map
+            pinned, combination = values[:self.pinned], values[self.pinned:]
+            if (self.max_cardinality is not None and combination not in self.combinations
+                    and len(self.combinations) >= self.max_cardinality):
+                self.folded += 1
+                tag_map = self.other_tag_maps.get(pinned)
+                if tag_map is None:
+                    tag_map = self.other_tag_maps[pinned] = self.new_tag_map(
+                        pinned + (constants.OTHER_TAG_VALUE,) * len(combination))
+                return tag_map
+            self.combinations.add(combination)
+            tag_map = self.tag_maps[values] = self.new_tag_map(values)
+            return tag_map
+
+    def forget(self, pinned: tuple):
+        """Drop the cached tag maps of the values of the pinned keys, e.g. of the run of a closed reporter.
+        :param pinned: The values of the pinned keys.
+        """
+        with self.lock:
+            self.tag_maps = {values: tag_map for values, tag_map in self.tag_maps.items()
+                             if values[:self.pinned] != pinned}
+            self.other_tag_maps.pop(pinned, None)
+
+    def new_tag_map(self, values):
+        """Build the tag map of a combination of tag values, with the values interned.
+        :param values: The tag values in the order of tag_keys, None for a missing tag.
+        :return: TagMap
+        """
+        tag_map = tag_map_module.TagMap()
+        for key, value in zip(self.tag_keys, values):
+            if value is not None:
+                tag_map.insert(key, sys.intern(str(value)[:constants.MAX_TAG_VALUE_LENGTH]))
+        return tag_map
+
+    @property
+    def cardinality(self):
+        """The number of combinations of tag values recorded, without the pinned keys and the "other" combination.
+        """
+        return len(self.combinations)
@@ -0,0 +1,113 @@
+import random
+import constants
+from typing import Optional
+
+
+class Metric_State:
+    """ The rate limiting and sampling state of one metric during a window.
+    """
+    __slots__ = ("tokens", "updated", "seen", "dropped", "sampled_out", "reservoir", "context")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+        self.seen = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self.reservoir = []
+        self.context = None
+
+
+class Metric_Limiter:
+    """ This class decides per metric which values are reported: a token bucket drops the values above a
+    rate limit, and a sampler keeps either every Nth value, or a uniform random sample of the values per window.
+    It counts the values left out, so they can be reported as their own metrics at the end of each window.
+    """
+
+    def __init__(self, rate_limit: Optional[float] = None, burst: Optional[float] = None,
+                 sample_every: Optional[int] = None, reservoir_size: Optional[int] = None,
+                 window: float = constants.DEFAULT_SAMPLING_WINDOW):
+        """Initializes the limiter.
+        :param rate_limit: The maximum number of values per second per metric, or None for no limit.
+        :param burst: The number of values per metric that can exceed the rate limit at once, rate_limit by default.
+        :param sample_every: If set, only every Nth value of a metric is kept.
+        :param reservoir_size: If set, a uniform random sample of this many values per metric is kept per window.
+        The kept values are only returned at the end of the window.
+        :param window: The number of seconds of a window.
+        """
+        if sample_every and reservoir_size:
+            raise ValueError("Choose either sample_every or reservoir_size, not both.")
+
+        self.rate_limit = rate_limit
+        self.burst = burst if burst is not None else rate_limit
+        self.sample_every = sample_every
+        self.reservoir_size = reservoir_size
+        self.window = window
+        self.window_started = None
+        self.states = {}
+
+    def offer(self, name: str, value: float, now: float, context=None):
+        """Decide whether a value is reported right away.
+        e.g. if limiter.offer("loss", 0.3, time.monotonic()): report(...)
+        :param name: The name of the metric.
+        :param value: The value.
+        :param now: The current time.monotonic().
+        :param context: Any context to return with the metric at the end of the window, e.g. its description.
+        :return: True if the value should be reported now, False if it is dropped or held by the reservoir.
+        """
+        state = self.states.get(name)
+        if state is None:
+            state = self.states[name] = Metric_State(self.burst or 0.0, now)
+        state.context = context
+
+        if self.rate_limit is not None:
+            state.tokens = min(self.burst, state.tokens + (now - state.updated) * self.rate_limit)
+            state.updated = now
+            if state.tokens < 1:
+                state.dropped += 1
+                return False
+            state.tokens -= 1
+
+        if self.sample_every:
+            state.seen += 1
+            if (state.seen - 1) % self.sample_every:
+                state.sampled_out += 1
+                return False
+        elif self.reservoir_size:
+            state.seen += 1
+            if len(state.reservoir) < self.reservoir_size:
+                state.reservoir.append(value)
+            else:
+                index = random.randrange(state.seen)
+                if index < self.reservoir_size:
+                    state.reservoir[index] = value
+                state.sampled_out += 1
+            return False
+        return True
+
+    def window_ended(self, now: float):
+        """Check whether the current window is over.
+        :param now: The current time.monotonic().
+        :return: True if end_window should be called.
+        """
+        if self.window_started is None:
+            self.window_started = now
+        return now - self.window_started >= self.window
+
+    def end_window(self, now: float):
+        """End the current window and reset the counts.
+        :param now: The current time.monotonic().
+        :return: A list of (name, context, reservoir values, dropped count, sampled out count) tuples, for the
+        metrics that have values to report.
+        """
+        self.window_started = now
+        results = []
+        for name, state in self.states.items():
+            if state.reservoir or state.dropped or state.sampled_out:
+                results.append((name, state.context, state.reservoir, state.dropped, state.sampled_out))
+            state.dropped = 0
+            state.sampled_out = 0
+            if self.reservoir_size:
+                state.seen = 0
+                state.reservoir = []
+        return results
@@ -0,0 +1,315 @@
+import collections
+import functools
+import logging
+import random
+import threading
+import time
+import constants
+from typing import Optional
+from lazy_import import Lazy_Import
+
+# Only needed for a Retry-After header with a date, and slow to import.
+email_utils = Lazy_Import("email.utils")
+
+logger = logging.getLogger(__name__)
+
+
+def status_of(error: Exception):
+    """Get the HTTP status code of a failed call, from the exception or the response it carries.
+    :param error: The exception raised by the call.
+    :return: The status code, or None if the exception has none.
+    """
+    for source in (error, getattr(error, "response", None)):
+        for attribute in ("status_code", "status"):
+            status = getattr(source, attribute, None)
+            if isinstance(status, int):
+                return status
+    return None
+
+
+def retry_after_of(error: Exception):
+    """Get the number of seconds a throttling response asks to wait, from its Retry-After header.
+    :param error: The exception raised by the call.
+    :return: The number of seconds, or None if the response has no Retry-After header.
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    value = headers.get("Retry-After") if headers is not None else None
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email_utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: Exception):
+    """Check whether a failed call may succeed when retried: a connection error, a timeout, or a throttling or
+    transient server response. Other errors, e.g. invalid arguments, fail again and are not retried.
+    :param error: The exception raised by the call.
+    :return: True if the call should be retried.
+    """
+    status = status_of(error)
+    if status is not None:
+        return status in constants.RETRYABLE_STATUS_CODES
+    return isinstance(error, (OSError, TimeoutError))
+
+
+class Circuit_Breaker:
+    """ This class stops the calls to a destination that keeps failing. After failure_threshold failures in a row the
+    circuit opens, and calls are refused until reset_timeout has passed. The circuit is then half open: one call is
+    let through, and closes the circuit when it succeeds or opens it again when it fails.
+    """
+
+    def __init__(self, failure_threshold: int = constants.DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = constants.DEFAULT_RESET_TIMEOUT, clock=time.monotonic):
+        """Initializes a closed circuit.
+        :param failure_threshold: The number of failures in a row that open the circuit.
+        :param reset_timeout: The number of seconds the circuit stays open.
+        :param clock: The function giving the current time in seconds.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = constants.CIRCUIT_CLOSED
+        self.failures = 0
+        self.opened_until = 0.0
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """Check whether a call may be made now. Once the open circuit has timed out, only the first caller is let
+        through, as the trial call.
+        :return: True if the call may be made.
+        """
+        with self.lock:
+            if self.state == constants.CIRCUIT_CLOSED:
+                return True
+            if self.state == constants.CIRCUIT_OPEN and self.clock() >= self.opened_until:
+                self.state = constants.CIRCUIT_HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        """Close the circuit after a successful call.
+        """
+        with self.lock:
+            self.state = constants.CIRCUIT_CLOSED
+            self.failures = 0
+
+    def record_failure(self, open_for: Optional[float] = None):
+        """Count a failed call, opening the circuit past the failure threshold or after a failed trial call.
+        :param open_for: The number of seconds the destination asked to wait, which opens the circuit for at least
+        that long.
+        """
+        with self.lock:
+            self.failures += 1
+            if (self.state == constants.CIRCUIT_HALF_OPEN or self.failures >= self.failure_threshold
+                    or open_for is not None):
+                self.state = constants.CIRCUIT_OPEN
+                self.opened_until = self.clock() + max(self.reset_timeout, open_for or 0.0)
+
+
+class Destination_Guard:
+    """ This class isolates the calls to one destination, e.g. AML or AppInsights, so its failures do not reach the
+    caller or the other destinations. Failed calls are retried with exponential backoff and full jitter, waiting at
+    least as long as a throttling response asks. While the circuit breaker of the destination is open, calls are not
+    made but kept in a bounded local buffer, and they are replayed in order before the next call once it is back.
+    """
+
+    def __init__(self, name: str, attempts: int = constants.DEFAULT_RETRY_ATTEMPTS,
+                 base_delay: float = constants.DEFAULT_RETRY_BASE_DELAY,
+                 max_delay: float = constants.DEFAULT_RETRY_MAX_DELAY,
+                 failure_threshold: int = constants.DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = constants.DEFAULT_RESET_TIMEOUT,
+                 shed_capacity: int = constants.DEFAULT_SHED_CAPACITY, sleep=time.sleep, clock=time.monotonic):
+        """Initializes the guard.
+        :param name: The name of the destination, used in the log messages and statistics.
+        :param attempts: The maximum number of attempts per call, 1 for no retries.
+        :param base_delay: The number of seconds the backoff starts from, doubled after every attempt.
+        :param max_delay: The maximum number of seconds to wait before a retry. A throttling response asking for a
+        longer wait opens the circuit for that long instead.
+        :param failure_threshold: The number of failed calls in a row that open the circuit.
+        :param reset_timeout: The number of seconds the circuit stays open.
+        :param shed_capacity: The maximum number of calls kept while the circuit is open. The oldest are dropped.
+        :param sleep: The function waiting a number of seconds.
+        :param clock: The function giving the current time in seconds.
+        """
+        self.name = name
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = Circuit_Breaker(failure_threshold, reset_timeout, clock)
+        self.sleep = sleep
+        self.shed = collections.deque(maxlen=shed_capacity)
+        self.retries = 0
+        self.lost = 0
+        self.lock = threading.Lock()
+        self.replaying = False
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None):
+        """Get the number of seconds to wait before a retry.
+        :param attempt: The number of the failed attempt, from 0.
+        :param retry_after: The number of seconds the destination asked to wait, if any.
+        :return: A random number of seconds up to the exponential backoff, and at least retry_after.
+        """
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return backoff if retry_after is None else retry_after + backoff
+
+    def call(self, function, *args, **kwargs):
+        """Make a call to the destination, retrying it or keeping it for later if the destination is unhealthy.
+        Exceptions are logged, never raised.
+        e.g. Destination_Guard.call(run.log, "accuracy", 0.9)
+        :param function: The function to call.
+        :param args: The positional arguments of the call.
+        :param kwargs: The keyword arguments of the call.
+        :return: True if the call succeeded, False if it was kept for later, None if it failed for good.
+        """
+        if not self.breaker.allow():
+            self.keep((function, args, kwargs))
+            return False
+        if self.shed:
+            # The kept calls were made before this one, so they are replayed first and this one waits behind them.
+            self.keep((function, args, kwargs))
+            return self.replay(allowed=True)
+        succeeded = self.attempt(function, args, kwargs)
+        if succeeded is False:
+            self.keep((function, args, kwargs))
+        if not succeeded:
+            return succeeded
+        if self.shed:
+            self.replay()
+        return True
+
+    def attempt(self, function, args: tuple, kwargs: dict, attempts: Optional[int] = None):
+        """Make a call, retrying it while it fails with a retryable error, and update the circuit breaker.
+        :param function: The function to call.
+        :param args: The positional arguments of the call.
+        :param kwargs: The keyword arguments of the call.
+        :param attempts: The maximum number of attempts, the attempts of the guard by default.
+        :return: True if the call succeeded, False if the destination is unhealthy and the call may be made later,
+        None if the call failed for good.
+        """
+        attempts = attempts or self.attempts
+        for attempt in range(attempts):
+            try:
+                function(*args, **kwargs)
+                self.breaker.record_success()
+                return True
+            except Exception as error:
+                if not is_retryable(error):
+                    # The destination answered, so it counts as healthy.
+                    self.breaker.record_success()
+                    logger.warning("Call to %s failed and is not retried.", self.name, exc_info=True)
+                    return None
+                retry_after = retry_after_of(error)
+                if retry_after is not None and retry_after > self.max_delay:
+                    self.breaker.record_failure(open_for=retry_after)
+                elif attempt + 1 < attempts:
+                    with self.lock:
+                        self.retries += 1
+                    self.sleep(self.delay(attempt, retry_after))
+                    continue
+                else:
+                    self.breaker.record_failure()
+                logger.warning("Call to %s failed, the circuit is %s.", self.name, self.breaker.state, exc_info=True)
+                return False
+
+    def keep(self, item: tuple, front: bool = False):
+        """Keep a call for later, dropping the oldest kept call once the buffer is full.
+        :param item: The (function, args, kwargs) call.
+        :param front: Mark True to put back a replayed call before the other kept calls.
+        """
+        with self.lock:
+            if len(self.shed) == self.shed.maxlen:
+                self.lost += 1
+                if front:
+                    return
+            if front:
+                self.shed.appendleft(item)
+            else:
+                self.shed.append(item)
+
+    def replay(self, allowed: bool = False):
+        """Make the kept calls in order, once each, stopping at the first failure. Only one thread replays at a time.
+        e.g. Destination_Guard.replay()
+        :param allowed: Mark True if the circuit breaker already let the caller through, e.g. for its trial call.
+        :return: True if no kept call is left.
+        """
+        with self.lock:
+            if self.replaying:
+                return False
+            self.replaying = True
+        try:
+            while allowed or self.breaker.allow():
+                allowed = False
+                with self.lock:
+                    if not self.shed:
+                        return True
+                    function, args, kwargs = self.shed.popleft()
+                succeeded = self.attempt(function, args, kwargs, attempts=1)
+                if succeeded is False:
+                    self.keep((function, args, kwargs), front=True)
+                    return False
+            return not self.shed
+        finally:
+            with self.lock:
+                self.replaying = False
+
+    def close(self):
+        """Replay the kept calls, and log the number of calls that could not be made.
+        """
+        self.replay()
+        lost = self.lost + len(self.shed)
+        if lost:
+            logger.warning("%d calls to %s could not be made.", lost, self.name)
+
+    def wrap_transmit(self, exporter):
+        """Guard the transmission of an AppInsights exporter. Exports answered with RETRY are retried with backoff,
+        and while the circuit is open the batches are not sent, but stored by the local storage of the exporter if
+        it has one, or kept by the guard otherwise. Either way the export is answered with RETRY, so it counts as a
+        failed export. An exporter without a transmission, e.g. a stand-in of the benchmarks, is left as is.
+        :param exporter: The AzureExporter of opencensus.
+        """
+        transmit = getattr(exporter, "_transmit", None)
+        if transmit is None:
+            return
+
+        def checked_transmit(envelopes):
+            # opencensus reduces the response to a status, so a throttled export comes back as RETRY.
+            result = transmit(envelopes)
+            if result == constants.TRANSMIT_RETRY:
+                raise Transmit_Error(result)
+            return result
+
+        @functools.wraps(transmit)
+        def guarded_transmit(envelopes):
+            if getattr(exporter, "storage", None) is None:
+                if self.call(checked_transmit, envelopes):
+                    return constants.TRANSMIT_SUCCESS
+                return constants.TRANSMIT_RETRY
+            # The local storage of the exporter keeps the batches answered with RETRY, and sends them again later.
+            if self.breaker.allow() and self.attempt(checked_transmit, (envelopes,), {}) is not False:
+                return constants.TRANSMIT_SUCCESS
+            return constants.TRANSMIT_RETRY
+
+        exporter._transmit = guarded_transmit
+
+    def stats(self):
+        """Get the statistics of the guard.
+        :return: A dictionary with the circuit "state", and the numbers of "retries", of calls kept for later in
+        "shed", and of calls "lost" when the buffer was full.
+        """
+        with self.lock:
+            return {"state": self.breaker.state, "retries": self.retries, "shed": len(self.shed), "lost": self.lost}
+
+
+class Transmit_Error(ConnectionError):
+    """ An export to AppInsights that opencensus answered with RETRY, raised so the guard retries it.
+    """
+
+    def __init__(self, result):
+        super().__init__("AppInsights export failed with status {}.".format(result))
+        self.result = result
@@ -0,0 +1,154 @@
+import threading
+import constants
+from array import array
+
+
+def lttb(steps, values, threshold: int):
+    """Select the points of a series that keep its shape with the Largest-Triangle-Three-Buckets algorithm.
+    The first and last points are always kept.
+    :param steps: The steps of the points.
+    :param values: The values of the points.
+    :param threshold: The number of points to keep.
+    :return: The sorted indices of the kept points.
+    """
+    count = len(values)
+    if threshold >= count:
+        return list(range(count))
+    if threshold < 3:
+        return [0, count - 1]
+
+    selected = [0]
+    bucket_size = (count - 2) / (threshold - 2)
+    previous = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        # The average of the next bucket is the third point of the triangles.
+        next_start, next_end = end, min(int((bucket + 2) * bucket_size) + 1, count)
+        next_length = next_end - next_start
+        average_step = sum(steps[next_start:next_end]) / next_length
+        average_value = sum(values[next_start:next_end]) / next_length
+
+        previous_step, previous_value = steps[previous], values[previous]
+        largest, chosen = -1.0, start
+        for index in range(start, end):
+            area = abs((previous_step - average_step) * (values[index] - previous_value)
+                       - (previous_step - steps[index]) * (average_value - previous_value))
+            if area > largest:
+                largest, chosen = area, index
+        selected.append(chosen)
+        previous = chosen
+    selected.append(count - 1)
+    return selected
+
+
+def min_max(steps, values, threshold: int):
+    """Select the minimum and the maximum of each bucket of a series, so every spike is kept.
+    The first and last points are always kept.
+    :param steps: The steps of the points.
+    :param values: The values of the points.
+    :param threshold: The number of points to keep, two per bucket.
+    :return: The sorted indices of the kept points.
+    """
+    count = len(values)
+    if threshold >= count:
+        return list(range(count))
+
+    selected = {0, count - 1}
+    buckets = max(1, (threshold - 2) // 2)
+    bucket_size = count / buckets
+    for bucket in range(buckets):
+        start, end = int(bucket * bucket_size), int((bucket + 1) * bucket_size)
+        if start >= end:
+            continue
+        indices = range(start, end)
+        selected.add(min(indices, key=values.__getitem__))
+        selected.add(max(indices, key=values.__getitem__))
+    return sorted(selected)
+
+
+STRATEGIES = {constants.SERIES_LTTB: lttb, constants.SERIES_MIN_MAX: min_max}
+
+
+class Metric_Series:
+    """ A step-indexed series of a metric, held in compact arrays until its points are uploaded. The points are
+    handed out for upload one range at a time, downsampled to a fixed resolution per range, and then dropped from
+    memory. A range that reaches max_points before it is handed out is downsampled in place, so a long series that is
+    never finalized keeps a bounded footprint.
+    """
+
+    def __init__(self, name: str, strategy: str = constants.SERIES_LTTB,
+                 resolution: int = constants.DEFAULT_SERIES_RESOLUTION, range_size: int = constants.DEFAULT_SERIES_RANGE,
+                 max_points: int = constants.DEFAULT_SERIES_MAX_POINTS):
+        """Initializes the series.
+        :param name: The name of the metric.
+        :param strategy: How a range is downsampled.
+        :type strategy: One of constants.SERIES_STRATEGIES.
+        :param resolution: The number of points uploaded per range.
+        :param range_size: The number of points of a range.
+        :param max_points: The maximum number of points held in memory, at least twice the resolution. Past it, the
+        points are downsampled to half of it.
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError("Unknown series strategy '{}', expected one of {}.".format(strategy,
+                                                                                     constants.SERIES_STRATEGIES))
+        self.name = name
+        self.downsample = STRATEGIES[strategy]
+        self.resolution = resolution
+        self.range_size = range_size
+        self.max_points = max(max_points, 2 * resolution)
+        self.steps = array("q")
+        self.values = array("d")
+        # The number of points added to the current range, more than the points held once it was downsampled.
+        self.range_points = 0
+        # The reporting arguments of the latest point, kept for the upload at the end of an epoch.
+        self.context = None
+        self.lock = threading.Lock()
+
+    def add(self, step: int, value: float, context=None):
+        """Add a point to the series.
+        :param step: The step of the point, e.g. the training step.
+        :param value: The value of the point.
+        :param context: The reporting arguments of the point.
+        :return: The downsampled points of the range completed by this point, as (step, value) tuples, or an
+        empty list.
+        """
+        with self.lock:
+            self.context = context
+            self.steps.append(step)
+            self.values.append(value)
+            self.range_points += 1
+            if self.range_points >= self.range_size:
+                return self.take()
+            if len(self.values) >= self.max_points:
+                self.compact()
+            return []
+
+    def finalize(self):
+        """Take the points not uploaded yet, e.g. at the end of an epoch. The last point is exact.
+        :return: The downsampled points, as (step, value) tuples.
+        """
+        with self.lock:
+            return self.take()
+
+    def take(self):
+        """Downsample the points not uploaded yet and drop them from memory. Call with the lock held.
+        :return: The downsampled points, as (step, value) tuples.
+        """
+        if not self.values:
+            return []
+        steps, values = self.steps, self.values
+        self.steps, self.values = array("q"), array("d")
+        self.range_points = 0
+        return [(steps[index], values[index]) for index in self.downsample(steps, values, self.resolution)]
+
+    def compact(self):
+        """Downsample the points held to half of max_points, keeping the first and last points. Call with the lock
+        held.
+        """
+        indices = self.downsample(self.steps, self.values, self.max_points // 2)
+        self.steps = array("q", [self.steps[index] for index in indices])
+        self.values = array("d", [self.values[index] for index in indices])
+
+    def __len__(self):
+        return len(self.values)
@@ -0,0 +1,205 @@
+import json
+import threading
+import time
+import constants
+import metric_buffer
+from typing import Callable, Collection, Mapping, Optional, Union
+from lazy_import import Lazy_Import
+
+pyarrow = Lazy_Import("pyarrow")
+arrow_ipc = Lazy_Import("pyarrow.ipc")
+parquet = Lazy_Import("pyarrow.parquet")
+
+
+class Metric_Sink:
+    """ A destination of metric values. A sink declares how it batches: batch_size is the number of values it
+    buffers before writing them, and flush_interval the number of seconds after which it writes the buffered values
+    anyway; None for both means every value is written right away.
+    """
+    batch_size = None
+    flush_interval = None
+
+    def __init__(self, metrics: Optional[Union[Collection[str], Callable[[str], bool]]] = None):
+        """Initializes the sink.
+        :param metrics: The names of the metrics written to this sink, or a function of the name deciding it.
+        All the metrics by default.
+        """
+        self.metrics = metrics
+
+    def accepts(self, name: str):
+        """Check whether the values of a metric are written to this sink.
+        :param name: The name of the metric.
+        :return: True if the sink takes the metric.
+        """
+        if self.metrics is None:
+            return True
+        if callable(self.metrics):
+            return self.metrics(name)
+        return name in self.metrics
+
+    def write(self, name: str, value: float, description="", report_to_parent: bool = False,
+              step: Optional[int] = None, tags: Optional[Mapping[str, str]] = None):
+        """Write a metric value.
+        :param name: The name of the metric.
+        :param value: The value to be written.
+        :param description: An optional description about the metric.
+        :param report_to_parent: Mark True if the value is also reported to the AML parent run.
+        :param step: An optional step of the value, e.g. the training step.
+        :param tags: Optional dimensions of the value.
+        """
+        raise NotImplementedError
+
+    def flush(self):
+        """Write the buffered values.
+        """
+
+    def close(self):
+        """Write the buffered values and release the resources of the sink.
+        """
+        self.flush()
+
+
+class Aml_Sink(Metric_Sink):
+    """ The AML run of a reporter, and its ancestor runs for report_to_parent. It batches with the batch_size and
+    batch_interval of the reporter.
+    """
+
+    def __init__(self, reporter, metrics=None):
+        super().__init__(metrics)
+        self.reporter = reporter
+        self.batch_size = reporter.batcher.batch_size if reporter.batcher is not None else None
+        self.flush_interval = reporter.batcher.batch_interval if reporter.batcher is not None else None
+
+    def write(self, name, value, description="", report_to_parent=False, step=None, tags=None):
+        reporter = self.reporter
+        for run in reporter.get_report_runs(report_to_parent):
+            if step is None and not reporter.is_changed(run, constants.CHANGE_LOG, name, value):
+                continue
+            if reporter.batcher is not None and step is None:
+                reporter.batcher.add_value(run, name, value)
+            elif step is None:
+                reporter.log_to_aml(run.log, name, value)
+            else:
+                reporter.log_to_aml(run.log, name, value, step=step)
+
+
+class App_Insights_Sink(Metric_Sink):
+    """ The AppInsights exporter of a reporter. The last value, or the summary of a metric registered with a summary
+    aggregation, is exported once per export interval.
+    """
+
+    def __init__(self, reporter, metrics=None, flush_interval: Optional[float] = None):
+        super().__init__(metrics)
+        self.reporter = reporter
+        self.flush_interval = flush_interval
+
+    def write(self, name, value, description="", report_to_parent=False, step=None, tags=None):
+        self.reporter.record_app_insights(name, value, description, tags)
+
+
+class Arrow_Sink(Metric_Sink):
+    """ A columnar file of all the values written: a Parquet file, or an Arrow IPC file for a path ending with
+    .arrow or .feather. The values are buffered in columns and written as one row group per batch.
+    Requires pyarrow.
+    """
+
+    def __init__(self, path: str, metrics=None, batch_size: int = constants.DEFAULT_SINK_BATCH_SIZE,
+                 flush_interval: float = constants.DEFAULT_SINK_FLUSH_INTERVAL):
+        """Initializes the sink.
+        :param path: The path of the file, overwritten if it exists.
+        :param metrics: The metrics written to this sink, all by default.
+        :param batch_size: The number of values per row group.
+        :param flush_interval: The number of seconds after which the buffered values are written, checked on write.
+        """
+        super().__init__(metrics)
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.ipc = path.endswith((".arrow", ".feather"))
+        self.schema = pyarrow.schema([("name", pyarrow.string()), ("value", pyarrow.float64()),
+                                      ("step", pyarrow.int64()), ("timestamp", pyarrow.float64()),
+                                      ("tags", pyarrow.string())])
+        self.writer = None
+        self.points = metric_buffer.Point_Buffer()
+        self.flushed = time.monotonic()
+        self.lock = threading.Lock()
+
+    def write(self, name, value, description="", report_to_parent=False, step=None, tags=None):
+        with self.lock:
+            self.points.append(name, value, time.time(), step, tags)
+            full = len(self.points) >= self.batch_size
+        if full or time.monotonic() - self.flushed >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            self.flushed = time.monotonic()
+            if not len(self.points):
+                return
+            table = self.to_table(self.points)
+            self.points.clear()
+            if self.writer is None:
+                if self.ipc:
+                    self.writer = arrow_ipc.new_file(self.path, self.schema)
+                else:
+                    self.writer = parquet.ParquetWriter(self.path, self.schema)
+            self.writer.write_table(table)
+
+    def to_table(self, points):
+        """Convert buffered points to an Arrow table. The value and timestamp arrays are handed over without a copy.
+        :param points: The Point_Buffer, without a capacity.
+        :return: The pyarrow.Table.
+        """
+        count = len(points)
+        steps = points.steps
+        return pyarrow.Table.from_arrays([
+            pyarrow.array(points.names, pyarrow.string()),
+            pyarrow.Array.from_buffers(pyarrow.float64(), count, [None, pyarrow.py_buffer(points.values)]),
+            pyarrow.array([None if step == constants.NO_STEP else step for step in steps], pyarrow.int64()),
+            pyarrow.Array.from_buffers(pyarrow.float64(), count, [None, pyarrow.py_buffer(points.timestamps)]),
+            pyarrow.array([json.dumps(points.tags[index], sort_keys=True) if index in points.tags else None
+                           for index in range(count)], pyarrow.string()),
+        ], schema=self.schema)
+
+    def close(self):
+        self.flush()
+        with self.lock:
+            if self.writer is not None:
+                self.writer.close()
+                self.writer = None
+
+
+class Ring_Buffer_Sink(Metric_Sink):
+    """ The most recent values written, in memory, e.g. for a live view or a test. Values are written right away
+    to a compact Point_Buffer, and the oldest ones are overwritten past the capacity.
+    """
+
+    def __init__(self, metrics=None, capacity: int = constants.DEFAULT_RING_BUFFER_CAPACITY):
+        """Initializes the sink.
+        :param metrics: The metrics written to this sink, all by default.
+        :param capacity: The maximum number of values kept.
+        """
+        super().__init__(metrics)
+        self.points = metric_buffer.Point_Buffer(capacity)
+        self.lock = threading.Lock()
+
+    def write(self, name, value, description="", report_to_parent=False, step=None, tags=None):
+        with self.lock:
+            self.points.append(name, value, time.time(), step, tags)
+
+    @property
+    def records(self):
+        """Get the kept values.
+        :return: A list of (timestamp, name, value, step, tags) tuples, oldest first.
+        """
+        with self.lock:
+            return list(self.points)
+
+    def values(self, name: str):
+        """Get the kept values of a metric.
+        e.g. Ring_Buffer_Sink.values("loss")
+        :param name: The name of the metric.
+        :return: A list of (timestamp, value, step) tuples, oldest first.
+        """
+        return [(timestamp, value, step) for timestamp, record_name, value, step, _ in self.records
+                if record_name == name]
@@ -0,0 +1,118 @@
+# Replays a metric spool to an AML run.
+# Usage: python metric_spool.py <spool_path> [--experiment <name> --run-id <id>] [--batch-size 100] [--app-insights]
+# Without --run-id, the metrics are replayed to the run of the current context, e.g. of a new AML job.
+# AppInsights records a value at the time it is reported, so the replayed values are only sent to AppInsights, at
+# the time of the replay, with --app-insights.
+import argparse
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def to_json_value(value):
+    """Convert a value json does not serialize, e.g. a NumPy scalar or array, to plain Python values.
+    :param value: The value.
+    :return: The Python scalar, or the nested lists of an array.
+    """
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError("Object of type {} is not JSON serializable".format(type(value).__name__))
+
+
+class Metric_Spool:
+    """ This class appends every report_* call of Condensed_Binocular to a local file, one JSON record per line,
+    so the metrics of offline or network-degraded runs can be uploaded later with replay.
+    """
+
+    def __init__(self, path: str):
+        """Initializes the spool, appending to the file if it exists.
+        :param path: The path of the spool file.
+        """
+        self.path = path
+        self.file = open(path, "a", encoding="utf-8")
+        self.lock = threading.Lock()
+
+    def append(self, method: str, /, **kwargs):
+        """Append a report_* call to the spool. The write is buffered, see flush.
+        e.g. Metric_Spool.append("report_metric", name="loss", value=0.3)
+        :param method: The name of the Condensed_Binocular method, positional only so a row may have a "method" column.
+        :param kwargs: The keyword arguments of the call, JSON serializable or NumPy values.
+        """
+        record = json.dumps({"time": time.time(), "method": method, "kwargs": kwargs}, separators=(",", ":"),
+                            default=to_json_value)
+        with self.lock:
+            self.file.write(record + "\n")
+
+    def flush(self):
+        """Write the buffered records to the file.
+        """
+        with self.lock:
+            self.file.flush()
+
+    def close(self):
+        """Write the buffered records to the file and close it.
+        """
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+
+    @staticmethod
+    def read(path: str):
+        """Read the records of a spool file. A record cut short by a crash is skipped.
+        :param path: The path of the spool file.
+        :return: A generator of (method, kwargs) tuples, in the order they were appended.
+        """
+        with open(path, encoding="utf-8") as file:
+            for line_number, line in enumerate(file, 1):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    logger.warning("Skipping unreadable record on line %d of %s.", line_number, path)
+                    continue
+                yield record["method"], record["kwargs"]
+
+    @staticmethod
+    def replay(path: str, reporter):
+        """Report the records of a spool file again with a reporter, e.g. bound to the run they belong to. AML keeps
+        the order and steps of the values, but AppInsights records them at the time of the replay, so replay to AML
+        only with a reporter built with app_insights_metrics=().
+        :param path: The path of the spool file.
+        :param reporter: The Condensed_Binocular to report with.
+        :return: The number of replayed records.
+        """
+        count = 0
+        for method, kwargs in Metric_Spool.read(path):
+            getattr(reporter, method)(**kwargs)
+            count += 1
+        reporter.flush()
+        return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a metric spool to an AML run.")
+    parser.add_argument("spool_path", help="The path of the spool file.")
+    parser.add_argument("--experiment", help="The name of the experiment of the run to replay to.")
+    parser.add_argument("--run-id", help="The id of the run to replay to, the run of the current context by default.")
+    parser.add_argument("--batch-size", type=int, default=100, help="The number of values per AML upload.")
+    parser.add_argument("--app-insights", action="store_true",
+                        help="Also record the values for AppInsights, at the time of the replay.")
+    args = parser.parse_args()
+
+    from condensed_binocular import Condensed_Binocular
+    run = None
+    if args.run_id:
+        from azureml.core import Experiment, Run, Workspace
+        run = Run(Experiment(Workspace.from_config(), args.experiment), args.run_id)
+
+    reporter = Condensed_Binocular(run=run, batch_size=args.batch_size,
+                                   app_insights_metrics=None if args.app_insights else ())
+    count = Metric_Spool.replay(args.spool_path, reporter)
+    reporter.close()
+    print("Replayed {} records from {}.".format(count, args.spool_path))
+
+
+if __name__ == "__main__":
+    main()
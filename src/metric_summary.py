@@ -0,0 +1,107 @@
+import bisect
+import math
+import constants
+from typing import Optional
+
+
+class Metric_Summary:
+    """ This class aggregates the values of one metric in-process during an export interval, so AppInsights
+    receives a few summary values per interval instead of only the last value.
+    """
+
+    def __init__(self, aggregation: str, buckets: Optional[tuple] = None):
+        """Initializes an empty summary.
+        :param aggregation: How to aggregate the values.
+        :type aggregation: One of constants.AGGREGATION_COUNT, AGGREGATION_SUM, AGGREGATION_SUMMARY or
+        AGGREGATION_DISTRIBUTION.
+        :param buckets: The upper bounds of the histogram buckets of a distribution, constants.DEFAULT_BUCKETS by default.
+        """
+        if aggregation not in constants.AGGREGATIONS or aggregation == constants.AGGREGATION_LAST_VALUE:
+            raise ValueError("Unknown summary aggregation '{}'.".format(aggregation))
+
+        self.aggregation = aggregation
+        self.buckets = None
+        if aggregation == constants.AGGREGATION_DISTRIBUTION:
+            self.buckets = sorted(buckets or constants.DEFAULT_BUCKETS)
+        self.reset()
+
+    def reset(self):
+        """Start a new interval.
+        """
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.bucket_counts = [0] * (len(self.buckets) + 1) if self.buckets is not None else None
+
+    def add(self, value: float):
+        """Add a value to the current interval.
+        :param value: The value to be added.
+        """
+        self.count += 1
+        self.total += value
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+        if self.bucket_counts is not None:
+            self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+
+    def add_values(self, values):
+        """Add many values to the current interval. NumPy arrays are aggregated without a per-element loop.
+        :param values: A list or a NumPy array of values.
+        """
+        if not hasattr(values, "ravel"):
+            for value in values:
+                self.add(value)
+            return
+
+        import numpy
+        values = values.ravel()
+        if not values.size:
+            return
+        self.count += int(values.size)
+        self.total += float(values.sum())
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        if self.bucket_counts is not None:
+            counts = numpy.bincount(numpy.searchsorted(self.buckets, values, side="left"),
+                                    minlength=len(self.bucket_counts))
+            self.bucket_counts = [total + int(count) for total, count in zip(self.bucket_counts, counts)]
+
+    def percentile(self, fraction: float):
+        """Estimate a percentile from the histogram buckets, interpolating linearly inside the bucket.
+        e.g. Metric_Summary.percentile(0.95)
+        :param fraction: The percentile as a fraction between 0 and 1.
+        :return: The estimated value, or None if no values were added.
+        """
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.bucket_counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else self.minimum
+                upper = self.buckets[index] if index < len(self.buckets) else self.maximum
+                lower, upper = max(lower, self.minimum), min(upper, self.maximum)
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.maximum
+
+    def results(self):
+        """Get the summary values of the current interval, keyed by the suffix of their metric name. An interval
+        without values has a count and a sum of 0, so the last value exported is not the one of a previous interval,
+        but no min, max, mean or percentiles.
+        :return: A dict of summary values.
+        """
+        if self.aggregation == constants.AGGREGATION_COUNT:
+            return {"count": self.count}
+        if self.aggregation == constants.AGGREGATION_SUM:
+            return {"sum": self.total}
+        if not self.count:
+            return {"count": 0}
+
+        results = {"count": self.count, "min": self.minimum, "max": self.maximum, "mean": self.total / self.count}
+        if self.aggregation == constants.AGGREGATION_DISTRIBUTION:
+            results.update(p50=self.percentile(0.5), p95=self.percentile(0.95), p99=self.percentile(0.99))
+        return results
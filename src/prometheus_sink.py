@@ -0,0 +1,79 @@
+import re
+import threading
+import time
+import constants
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from metric_sinks import Metric_Sink
+
+
+class Prometheus_Handler(BaseHTTPRequestHandler):
+    """ Serves the last values of a Prometheus_Sink in the Prometheus text format on /metrics.
+    """
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.sink.exposition().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Prometheus_Sink(Metric_Sink):
+    """ A scrape endpoint serving the last value of each metric and combination of tags as a Prometheus gauge.
+    Values are written right away, and the endpoint only holds one value per series.
+    """
+    invalid_characters = re.compile(r"[^a-zA-Z0-9_:]")
+
+    def __init__(self, metrics=None, port: int = constants.DEFAULT_PROMETHEUS_PORT, address: str = "127.0.0.1"):
+        """Initializes the sink and starts serving http://address:port/metrics from a background thread.
+        :param metrics: The metrics written to this sink, all by default.
+        :param port: The port to listen on, 0 for any free port.
+        :param address: The address to listen on, the local host only by default. Use "0.0.0.0" to let a Prometheus
+        server on another host scrape the metrics.
+        """
+        super().__init__(metrics)
+        self.last_values = {}
+        self.server = ThreadingHTTPServer((address, port), Prometheus_Handler)
+        self.server.daemon_threads = True
+        self.server.sink = self
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name="condensed-binocular-prometheus",
+                                       daemon=True)
+        self.thread.start()
+
+    def write(self, name, value, description="", report_to_parent=False, step=None, tags=None):
+        labels = tuple(sorted(tags.items())) if tags else ()
+        self.last_values[(name, labels)] = (value, description, time.time())
+
+    def exposition(self):
+        """Format the last values in the Prometheus text format.
+        :return: The text of the scrape.
+        """
+        lines = []
+        typed = set()
+        for (name, labels), (value, description, timestamp) in sorted(self.last_values.copy().items()):
+            metric = self.invalid_characters.sub("_", name)
+            if not metric or metric[0].isdigit():
+                metric = "_" + metric
+            if metric not in typed:
+                typed.add(metric)
+                if description:
+                    lines.append("# HELP {} {}".format(metric, description.replace("\\", "\\\\").replace("\n", "\\n")))
+                lines.append("# TYPE {} gauge".format(metric))
+            label_text = ",".join('{}="{}"'.format(
+                self.invalid_characters.sub("_", key),
+                str(label).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for key, label in labels)
+            lines.append("{}{} {} {}".format(metric, "{" + label_text + "}" if label_text else "", float(value),
+                                             int(timestamp * 1000)))
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
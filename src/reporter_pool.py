@@ -0,0 +1,161 @@
+import threading
+import constants
+import condensed_binocular
+import metric_retry
+from typing import Optional
+from lazy_import import Lazy_Import
+
+Env = Lazy_Import("environs", "Env")
+metrics_exporter = Lazy_Import("opencensus.ext.azure.metrics_exporter")
+stats_module = Lazy_Import("opencensus.stats.stats")
+
+
+class Reporter_Pool:
+    """ The resources of a process that reporters of many runs can share: the settings read from the environment,
+    the AppInsights exporter with its export thread, and the registered measures and views. The exporter is created
+    for the first reporter and shut down when the last one is closed, so HyperDrive sweeps and notebooks that create
+    hundreds of reporters keep one export thread and one registered exporter at a time.
+    e.g. reporting = Reporter_Pool.shared().reporter(run)
+    """
+
+    # The pool of the process, created on first use by shared().
+    shared_pool = None
+    shared_lock = threading.Lock()
+
+    def __init__(self, export_interval: Optional[float] = None, export_batch_size: Optional[int] = None,
+                 export_retry_interval: Optional[float] = None, export_local_storage: Optional[bool] = None,
+                 retry_attempts: int = constants.DEFAULT_RETRY_ATTEMPTS,
+                 retry_max_delay: float = constants.DEFAULT_RETRY_MAX_DELAY,
+                 failure_threshold: int = constants.DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = constants.DEFAULT_RESET_TIMEOUT):
+        """Initializes the pool, reading the .env file once.
+        :param export_interval: The number of seconds between two exports to AppInsights, or the
+        APP_INSIGHTS_EXPORT_INTERVAL environment variable.
+        :param export_batch_size: The maximum number of metrics sent to AppInsights per request, or the
+        APP_INSIGHTS_MAX_BATCH_SIZE environment variable.
+        :param export_retry_interval: The minimum number of seconds before an export that failed is retried, or the
+        APP_INSIGHTS_RETRY_INTERVAL environment variable.
+        :param export_local_storage: Mark False to drop failed exports instead of keeping them on local storage
+        and retrying them, or the APP_INSIGHTS_LOCAL_STORAGE environment variable. True by default.
+        :param retry_attempts: The maximum number of attempts of an AppInsights export that fails with a connection
+        error, a timeout or a throttling or transient server response, 1 for no retries.
+        :param retry_max_delay: The maximum number of seconds to wait before retrying an export.
+        :param failure_threshold: The number of failed exports in a row that open the AppInsights circuit.
+        :param reset_timeout: The number of seconds the AppInsights circuit stays open.
+        """
+        env = Env()
+        env.read_env()
+        if export_interval is None:
+            export_interval = env.float("APP_INSIGHTS_EXPORT_INTERVAL", constants.DEFAULT_EXPORT_INTERVAL)
+        if export_batch_size is None:
+            export_batch_size = env.int("APP_INSIGHTS_MAX_BATCH_SIZE", constants.DEFAULT_EXPORT_BATCH_SIZE)
+        if export_retry_interval is None:
+            export_retry_interval = env.float("APP_INSIGHTS_RETRY_INTERVAL", constants.DEFAULT_EXPORT_RETRY_INTERVAL)
+        if export_local_storage is None:
+            export_local_storage = env.bool("APP_INSIGHTS_LOCAL_STORAGE", constants.DEFAULT_EXPORT_LOCAL_STORAGE)
+        self.export_interval = export_interval
+        self.export_batch_size = export_batch_size
+        self.export_retry_interval = export_retry_interval
+        self.export_local_storage = export_local_storage
+        self.connection_string = env("APP_INSIGHTS_CONNECTION_KEY")
+
+        # Views are registered process-wide, so the measures and dimensions are shared by the reporters as well.
+        self.measures = {}
+        self.metric_dimensions = {}
+        self.registration_lock = threading.Lock()
+
+        self.lock = threading.Lock()
+        self.exporter = None
+        # The exports of the pool are retried and kept for later by the AppInsights guard of the pool.
+        self.guard = metric_retry.Destination_Guard(
+            constants.COMPONENT_APP_INSIGHTS, retry_attempts, max_delay=retry_max_delay,
+            failure_threshold=failure_threshold, reset_timeout=reset_timeout)
+        self.apply_telemetry_processors = None
+        # The open reporters, in the order they were created. The latest one processes the export batches.
+        self.reporters = []
+
+    @classmethod
+    def shared(cls):
+        """Get the pool of the process, creating it on first use.
+        :return: The Reporter_Pool.
+        """
+        if cls.shared_pool is None:
+            with cls.shared_lock:
+                if cls.shared_pool is None:
+                    cls.shared_pool = cls()
+        return cls.shared_pool
+
+    def reporter(self, run=None, **options):
+        """Create a reporter bound to the pool.
+        e.g. Reporter_Pool.shared().reporter(run, batch_size=100)
+        :param run: The AML run to report to, the run of the current context by default.
+        :param options: The other arguments of Condensed_Binocular, except the export settings of the pool. Its retry
+        and circuit arguments apply to the AML calls of the reporter, the pool guards the AppInsights exports.
+        :return: The Condensed_Binocular. Close it when done reporting, to release the exporter.
+        """
+        return condensed_binocular.Condensed_Binocular(run=run, pool=self, **options)
+
+    def acquire(self, reporter):
+        """Take a reference to the exporter for a reporter, creating and registering it for the first one. The
+        export batches are processed by the latest reporter, and the values are told apart by their run dimension.
+        :param reporter: The Condensed_Binocular.
+        :return: The exporter.
+        """
+        with self.lock:
+            if self.exporter is None:
+                self.exporter = metrics_exporter.new_metrics_exporter(
+                    enable_standard_metrics=False,
+                    export_interval=self.export_interval,
+                    max_batch_size=self.export_batch_size,
+                    minimum_retry_interval=self.export_retry_interval,
+                    enable_local_storage=self.export_local_storage,
+                    connection_string=self.connection_string)
+                self.apply_telemetry_processors = self.exporter.apply_telemetry_processors
+                self.guard.wrap_transmit(self.exporter)
+                stats_module.stats.view_manager.register_exporter(self.exporter)
+            self.reporters.append(reporter)
+            self.exporter.apply_telemetry_processors = reporter.process_batch
+            return self.exporter
+
+    def release(self, reporter):
+        """Drop the reference of a closed reporter. The exporter of the last one is unregistered and shut down,
+        which exports the metrics recorded since the last export.
+        :param reporter: The Condensed_Binocular.
+        """
+        with self.lock:
+            if reporter not in self.reporters:
+                return
+            self.reporters.remove(reporter)
+            for dimensions in self.metric_dimensions.values():
+                dimensions.forget((reporter.run_id,))
+            self.forget_series(reporter.run_id)
+            if self.reporters:
+                self.exporter.apply_telemetry_processors = self.reporters[-1].process_batch
+                return
+            exporter, self.exporter = self.exporter, None
+            self.apply_telemetry_processors = None
+        condensed_binocular.Condensed_Binocular.shutdown_exporter(exporter)
+        self.guard.close()
+
+    @staticmethod
+    def forget_series(run_id: str):
+        """Drop the time series of a run from the view data, so the last values of a closed run are not exported
+        again on every interval and the view data of the process does not grow with the number of runs.
+        :param run_id: The RUN_TAG_KEY value of the run.
+        """
+        # opencensus has no public API to remove the tag values of a view, and get_view returns a copy.
+        view_data_lists = stats_module.stats.view_manager.measure_to_view_map._measure_to_view_data_list_map
+        for view_data_list in list(view_data_lists.values()):
+            for view_data in view_data_list:
+                columns = view_data.view.columns
+                if constants.RUN_TAG_KEY not in columns:
+                    continue
+                index = columns.index(constants.RUN_TAG_KEY)
+                aggregation_data_map = view_data.tag_value_aggregation_data_map
+                for tag_values in list(aggregation_data_map):
+                    if tag_values[index] == run_id:
+                        aggregation_data_map.pop(tag_values, None)
+
+    def __len__(self):
+        return len(self.reporters)
+
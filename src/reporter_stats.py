@@ -0,0 +1,203 @@
+import collections
+import constants
+import functools
+import threading
+import time
+from typing import Callable, Optional
+
+# The methods timed per call, and the methods whose time is attributed to a component of the calls.
+INSTRUMENTED_METHODS = ("report_metric", "report_metrics", "report_metric_with_run_tagging", "report_step",
+                        "report_list", "report_row", "report_table", "report_image", "process_batch")
+COMPONENT_METHODS = {"log_to_aml": constants.COMPONENT_AML, "upload_image": constants.COMPONENT_AML,
+                     "record_app_insights": constants.COMPONENT_APP_INSIGHTS,
+                     "record_last_value": constants.COMPONENT_APP_INSIGHTS,
+                     "record_last_values": constants.COMPONENT_APP_INSIGHTS,
+                     "record_summaries": constants.COMPONENT_APP_INSIGHTS}
+
+
+def percentile(values: list, rank: float):
+    """Get a percentile of sorted values with the nearest-rank method.
+    :param values: The values, sorted.
+    :param rank: The percentile, from 0 to 100.
+    :return: The value at the percentile.
+    """
+    index = max(0, -(-len(values) * rank // 100) - 1)
+    return values[int(index)]
+
+
+class Reporter_Stats:
+    """ This class measures the time a reporter spends in its report_* methods and its AppInsights batch processing,
+    split into the time spent in AML logging calls, in AppInsights recording, and locally. It wraps the methods of
+    the reporter instance, so a reporter without instrumentation runs its methods unchanged.
+    """
+
+    def __init__(self, window: int = constants.DEFAULT_STATS_WINDOW, emit: Optional[Callable] = None,
+                 emit_interval: Optional[float] = None):
+        """Initializes the statistics.
+        :param window: The number of most recent calls per method that the latency percentiles are computed over.
+        :param emit: If set, the function called without arguments once per emit_interval to emit the statistics.
+        :param emit_interval: The number of seconds between two calls of emit.
+        """
+        self.window = window
+        self.emit = emit
+        self.emit_interval = emit_interval
+        self.emitted = time.monotonic()
+        self.calls = collections.Counter()
+        self.latencies = {}
+        self.exports = 0
+        self.export_errors = 0
+        self.lock = threading.Lock()
+        # The time spent per component during the current call of each thread.
+        self.local = threading.local()
+
+    def instrument(self, reporter):
+        """Wrap the instrumented methods of a reporter instance.
+        :param reporter: The Condensed_Binocular to instrument.
+        """
+        for name in INSTRUMENTED_METHODS:
+            setattr(reporter, name, self.timed(name, getattr(reporter, name), name != "process_batch"))
+        for name, component in COMPONENT_METHODS.items():
+            setattr(reporter, name, self.attributed(component, getattr(reporter, name)))
+
+    def instrument_exporter(self, exporter):
+        """Wrap the transmission of an AppInsights exporter, to count the exports and the failed exports.
+        :param exporter: The AzureExporter of opencensus.
+        """
+        transmit = exporter._transmit
+
+        @functools.wraps(transmit)
+        def counted_transmit(envelopes):
+            result = None
+            try:
+                result = transmit(envelopes)
+                return result
+            finally:
+                with self.lock:
+                    self.exports += 1
+                    # opencensus returns TransportStatusCode.SUCCESS, which is 0, for a successful export.
+                    if result != 0:
+                        self.export_errors += 1
+
+        exporter._transmit = counted_transmit
+
+    def timed(self, name: str, function, emits: bool = True):
+        """Wrap a method to record its latency and the latency of the components it calls.
+        :param name: The name of the method.
+        :param function: The bound method.
+        :param emits: Mark False for methods called from threads that should not emit the statistics.
+        :return: The wrapped method.
+        """
+        @functools.wraps(function)
+        def timed_function(*args, **kwargs):
+            local = self.local
+            if getattr(local, "components", None) is not None:
+                # Nested calls, e.g. report_metrics calling record_last_values, belong to the outer call.
+                return function(*args, **kwargs)
+            local.components = components = {}
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                local.components = None
+                self.record(name, elapsed, components)
+                if emits and self.emit is not None:
+                    self.emit_if_due()
+
+        return timed_function
+
+    def attributed(self, component: str, function):
+        """Wrap a method to attribute its time to a component of the current call.
+        :param component: The component, e.g. constants.COMPONENT_AML.
+        :param function: The bound method.
+        :return: The wrapped method.
+        """
+        @functools.wraps(function)
+        def attributed_function(*args, **kwargs):
+            local = self.local
+            components = getattr(local, "components", None)
+            if components is None or getattr(local, "component", None) is not None:
+                return function(*args, **kwargs)
+            local.component = component
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                local.component = None
+                components[component] = components.get(component, 0.0) + time.perf_counter() - started
+
+        return attributed_function
+
+    def record(self, name: str, elapsed: float, components: dict):
+        """Record the latency of a call.
+        :param name: The name of the method.
+        :param elapsed: The number of seconds the call took.
+        :param components: The number of seconds spent per component during the call.
+        """
+        aml = components.get(constants.COMPONENT_AML, 0.0)
+        app_insights = components.get(constants.COMPONENT_APP_INSIGHTS, 0.0)
+        with self.lock:
+            self.calls[name] += 1
+            latencies = self.latencies.get(name)
+            if latencies is None:
+                latencies = self.latencies[name] = {
+                    component: collections.deque(maxlen=self.window)
+                    for component in (constants.COMPONENT_TOTAL, constants.COMPONENT_AML,
+                                      constants.COMPONENT_APP_INSIGHTS, constants.COMPONENT_LOCAL)}
+            latencies[constants.COMPONENT_TOTAL].append(elapsed)
+            latencies[constants.COMPONENT_AML].append(aml)
+            latencies[constants.COMPONENT_APP_INSIGHTS].append(app_insights)
+            latencies[constants.COMPONENT_LOCAL].append(max(0.0, elapsed - aml - app_insights))
+
+    def emit_if_due(self):
+        """Call emit if emit_interval has passed since the last call.
+        """
+        now = time.monotonic()
+        if now - self.emitted < self.emit_interval:
+            return
+        self.emitted = now
+        self.emit()
+
+    def results(self):
+        """Get the call counts, latency percentiles in milliseconds and export counts.
+        e.g. Reporter_Stats.results()["latency_ms"]["report_metric"]["aml"]["p95"]
+        :return: A dictionary with the keys "calls", "latency_ms", "exports" and "export_errors".
+        """
+        with self.lock:
+            calls = dict(self.calls)
+            samples = {name: {component: sorted(values) for component, values in latencies.items()}
+                       for name, latencies in self.latencies.items()}
+            exports, export_errors = self.exports, self.export_errors
+
+        latency_ms = {
+            name: {component: {"p{}".format(rank): percentile(values, rank) * 1000
+                               for rank in constants.STATS_PERCENTILES}
+                   for component, values in components.items()}
+            for name, components in samples.items()}
+        return {"calls": calls, "latency_ms": latency_ms, "exports": exports, "export_errors": export_errors}
+
+    @staticmethod
+    def to_metrics(stats: dict):
+        """Flatten the statistics into metric values, named after the method, component and percentile.
+        e.g. {"condensed_binocular_report_metric_aml_p95_ms": 0.02, "condensed_binocular_report_metric_calls": 10}
+        :param stats: The statistics, as returned by Condensed_Binocular.stats.
+        :return: A dictionary where keys are the names of the metrics.
+        """
+        prefix = constants.STATS_METRIC_PREFIX
+        metrics = {}
+        for name, count in stats.get("calls", {}).items():
+            metrics["{}_{}_calls".format(prefix, name)] = count
+        for name, components in stats.get("latency_ms", {}).items():
+            for component, percentiles in components.items():
+                for rank, value in percentiles.items():
+                    metrics["{}_{}_{}_{}_ms".format(prefix, name, component, rank)] = value
+        for name, depth in stats.get("queue_depth", {}).items():
+            metrics["{}_{}_queue_depth".format(prefix, name)] = depth
+        for destination, circuit in stats.get("circuits", {}).items():
+            metrics["{}_{}_circuit_open".format(prefix, destination)] = int(circuit["state"] != constants.CIRCUIT_CLOSED)
+            for key in ("retries", "shed", "lost"):
+                metrics["{}_{}_{}".format(prefix, destination, key)] = circuit[key]
+        for key in ("exports", "export_errors", "dropped", "unchanged"):
+            if key in stats:
+                metrics["{}_{}".format(prefix, key)] = stats[key]
+        return metrics
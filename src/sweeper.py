@@ -0,0 +1,38 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class Sweeper:
+    """ This class calls a function once per interval on a background thread, so the state that is otherwise only
+    checked when a value is reported, e.g. the age of a batch, is also acted on while nothing is reported.
+    """
+
+    def __init__(self, function, interval: float, name: str = "condensed-binocular-sweeper"):
+        """Initializes the sweeper and starts its thread.
+        :param function: The function called without arguments once per interval.
+        :param interval: The number of seconds between two calls. It may be lowered while the sweeper runs.
+        :param name: The name of the thread.
+        """
+        self.function = function
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.work, name=name, daemon=True)
+        self.thread.start()
+
+    def work(self):
+        """Call the function once per interval until the sweeper is closed.
+        """
+        while not self.stopped.wait(min(self.interval, threading.TIMEOUT_MAX)):
+            try:
+                self.function()
+            except Exception:
+                logger.exception("Periodic call failed.")
+
+    def close(self):
+        """Stop the thread, without calling the function again.
+        """
+        self.stopped.set()
+        if self.thread is not threading.current_thread():
+            self.thread.join()
@@ -0,0 +1,136 @@
+import time
+import constants
+from typing import Callable, Iterable, Mapping, Optional
+
+
+class Table_Stream_Writer:
+    """ This class streams a large table to AML in chunks of at most chunk_rows rows, so the memory used never
+    exceeds one chunk, whatever the size of the table. Rows can be written one by one, from an iterator, or as
+    columnar chunks of lists, NumPy arrays or Arrow-like arrays and tables.
+    e.g.
+        with reporting.open_table_stream("predictions") as table:
+            table.write_rows({"label": label, "score": score} for label, score in predictions)
+    """
+
+    def __init__(self, reporter, name: str, chunk_rows: int = constants.DEFAULT_TABLE_CHUNK_ROWS,
+                 report_to_parent: bool = False, progress: Optional[Callable[[int, float], None]] = None):
+        """Initializes an empty table stream.
+        :param reporter: The Condensed_Binocular to report the chunks with.
+        :param name: The name of the table metric.
+        :param chunk_rows: The number of rows per report_table call.
+        :param report_to_parent: Mark True if you want to report to AML parent run.
+        :param progress: An optional function called after each chunk with the number of rows written so far and
+        the throughput in rows per second.
+        """
+        self.reporter = reporter
+        self.name = name
+        self.chunk_rows = chunk_rows
+        self.report_to_parent = report_to_parent
+        self.progress = progress
+        self.columns = None
+        self.buffer = None
+        self.buffered_rows = 0
+        self.rows_written = 0
+        self.chunks_written = 0
+        self.started = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write_row(self, **row):
+        """Write a single row.
+        e.g. Table_Stream_Writer.write_row(label="cat", score=0.9)
+        :param row: The columns of the row.
+        """
+        self.set_columns(row)
+        for column, values in self.buffer.items():
+            values.append(row[column])
+        self.buffered_rows += 1
+        if self.buffered_rows >= self.chunk_rows:
+            self.flush()
+
+    def write_rows(self, rows: Iterable[Mapping]):
+        """Write rows from an iterable, consuming it lazily.
+        :param rows: An iterable of dictionaries, where keys are the columns of the row.
+        """
+        for row in rows:
+            self.write_row(**row)
+
+    def write_columns(self, chunk):
+        """Write a columnar chunk of rows. Only one chunk_rows slice of the chunk is converted at a time.
+        :param chunk: A mapping of column names to lists, NumPy arrays or Arrow-like arrays of equal length, or an
+        Arrow-like table or record batch with to_pydict() and slice().
+        """
+        if hasattr(chunk, "to_pydict"):
+            for offset in range(0, chunk.num_rows, self.chunk_rows):
+                self.write_columns(chunk.slice(offset, self.chunk_rows).to_pydict())
+            return
+
+        if not chunk:
+            return
+        self.set_columns(chunk)
+        lengths = {column: len(values) for column, values in chunk.items()}
+        if len(set(lengths.values())) > 1:
+            raise ValueError("Expected columns of equal length for table '{}', got {}.".format(self.name, lengths))
+        length = lengths[self.columns[0]]
+        offset = 0
+        while offset < length:
+            count = min(self.chunk_rows - self.buffered_rows, length - offset)
+            for column, values in self.buffer.items():
+                values.extend(self.to_list(chunk[column], offset, count))
+            self.buffered_rows += count
+            offset += count
+            if self.buffered_rows >= self.chunk_rows:
+                self.flush()
+
+    @staticmethod
+    def to_list(values, offset: int, count: int):
+        """Convert a slice of a column to a list.
+        :param values: A list, a NumPy array or an Arrow-like array.
+        :param offset: The index of the first value of the slice.
+        :param count: The number of values of the slice.
+        :return: list
+        """
+        if hasattr(values, "to_pylist"):
+            return values.slice(offset, count).to_pylist()
+        values = values[offset:offset + count]
+        return values.tolist() if hasattr(values, "tolist") else list(values)
+
+    def set_columns(self, row: Mapping):
+        """Take the columns of the table from the first row or chunk, and check them for the next ones.
+        :param row: A row or a columnar chunk.
+        """
+        if self.columns is None:
+            self.columns = tuple(row)
+            self.buffer = {column: [] for column in self.columns}
+        elif len(row) != len(self.columns) or any(column not in row for column in self.columns):
+            raise ValueError("Expected the columns {} for table '{}', got {}.".format(
+                self.columns, self.name, tuple(row)))
+
+    def flush(self):
+        """Report the buffered rows as one chunk.
+        """
+        if not self.buffered_rows:
+            return
+        table, self.buffer = self.buffer, {column: [] for column in self.columns}
+        self.reporter.report_table(self.name, table, report_to_parent=self.report_to_parent)
+        self.rows_written += self.buffered_rows
+        self.chunks_written += 1
+        self.buffered_rows = 0
+        if self.progress is not None:
+            self.progress(self.rows_written, self.rows_per_second())
+
+    def close(self):
+        """Report the remaining rows.
+        """
+        self.flush()
+
+    def rows_per_second(self):
+        """Get the throughput of the stream since it was opened.
+        :return: The number of rows written per second.
+        """
+        elapsed = time.monotonic() - self.started
+        return self.rows_written / elapsed if elapsed > 0 else 0.0
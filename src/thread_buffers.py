@@ -0,0 +1,142 @@
+import atexit
+import collections
+import functools
+import logging
+import threading
+import constants
+from typing import Mapping
+
+logger = logging.getLogger(__name__)
+
+# The report_* methods taken over by the buffers. Their arguments are scalars, or mappings such as tags that are
+# copied when buffered, so they can be reported later; lists, tables and plots can still change after the call, and
+# are reported right away.
+BUFFERED_METHODS = ("report_metric", "report_metric_with_run_tagging", "report_row")
+
+
+class Thread_Buffers:
+    """ This class gives each reporting thread a buffer of its own, so threads report without waiting on each other,
+    and a single flusher thread takes the calls out of all the buffers and runs them. The calls of one thread run in
+    order, and only one thread at a time runs the calls, so they do not race on the state they share.
+    """
+
+    def __init__(self, interval: float = constants.DEFAULT_THREAD_BUFFER_INTERVAL,
+                 capacity: int = constants.DEFAULT_QUEUE_SIZE, backpressure: str = constants.BACKPRESSURE_BLOCK):
+        """Initializes the buffers and starts the flusher thread.
+        :param interval: The number of seconds between two flushes of the buffers.
+        :param capacity: The maximum number of calls in the buffer of a thread.
+        :param backpressure: What to do when the buffer of a thread is full: flush the buffers on the calling thread,
+        drop the oldest or drop the newest call.
+        :type backpressure: One of constants.BACKPRESSURE_POLICIES.
+        """
+        if backpressure not in constants.BACKPRESSURE_POLICIES:
+            raise ValueError("Unknown backpressure policy '{}', expected one of {}.".format(
+                backpressure, constants.BACKPRESSURE_POLICIES))
+        self.interval = interval
+        self.capacity = capacity
+        self.backpressure = backpressure
+        self.dropped = 0
+        self.local = threading.local()
+        # The buffers are only added and removed under the lock, the calls are appended and taken without it.
+        self.buffers = []
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.closed = False
+        self.flusher = threading.Thread(target=self.work, name="condensed-binocular-flusher", daemon=True)
+        self.flusher.start()
+        atexit.register(self.close)
+
+    def install(self, reporter, methods: tuple = BUFFERED_METHODS):
+        """Replace methods of a reporter instance with methods that buffer their calls.
+        :param reporter: The Condensed_Binocular whose calls are buffered.
+        :param methods: The names of the methods to buffer.
+        """
+        for name in methods:
+            setattr(reporter, name, self.buffered(getattr(reporter, name)))
+
+    def buffered(self, function):
+        """Wrap a method so its calls are appended to the buffer of the calling thread.
+        :param function: The bound method.
+        :return: The wrapped method.
+        """
+        @functools.wraps(function)
+        def buffered_function(*args, **kwargs):
+            if self.closed:
+                return function(*args, **kwargs)
+            args = tuple(dict(arg) if isinstance(arg, Mapping) else arg for arg in args)
+            for key, value in kwargs.items():
+                if isinstance(value, Mapping):
+                    kwargs[key] = dict(value)
+            buffer = self.get_buffer()
+            if len(buffer) >= self.capacity and not self.make_room():
+                return
+            buffer.append((function, args, kwargs))
+
+        return buffered_function
+
+    def make_room(self):
+        """Apply the backpressure policy to the full buffer of the calling thread.
+        :return: False if the new call is dropped, True if it can be appended.
+        """
+        if self.backpressure == constants.BACKPRESSURE_BLOCK:
+            # The calling thread waits until the buffers are flushed, by flushing them itself.
+            self.flush()
+            return True
+        with self.lock:
+            self.dropped += 1
+        # A buffer that drops the oldest call has a maximum length, which drops it as the new call is appended.
+        return self.backpressure == constants.BACKPRESSURE_DROP_OLDEST
+
+    def get_buffer(self):
+        """Get the buffer of the calling thread, creating it on its first call.
+        :return: A deque of (function, args, kwargs) calls.
+        """
+        buffer = getattr(self.local, "buffer", None)
+        if buffer is None:
+            maxlen = self.capacity if self.backpressure == constants.BACKPRESSURE_DROP_OLDEST else None
+            buffer = self.local.buffer = collections.deque(maxlen=maxlen)
+            with self.lock:
+                self.buffers.append((threading.current_thread(), buffer))
+        return buffer
+
+    def pending(self):
+        """Count the buffered calls.
+        :return: The number of calls waiting for the flusher.
+        """
+        with self.lock:
+            return sum(len(buffer) for _, buffer in self.buffers)
+
+    def work(self):
+        """Flush the buffers once per interval until the buffers are closed.
+        """
+        while not self.stopped.wait(self.interval):
+            self.flush()
+
+    def flush(self):
+        """Run the buffered calls, taking them out of one buffer after another. Calls appended while flushing wait
+        for the next flush, so a busy thread cannot hold up the others.
+        """
+        with self.flush_lock:
+            with self.lock:
+                buffers = list(self.buffers)
+                # The buffers of finished threads are dropped once they are taken out below.
+                self.buffers = [(thread, buffer) for thread, buffer in buffers if thread.is_alive()]
+            for _, buffer in buffers:
+                for _ in range(len(buffer)):
+                    function, args, kwargs = buffer.popleft()
+                    try:
+                        function(*args, **kwargs)
+                    except Exception:
+                        logger.exception("Buffered reporting call failed.")
+
+    def close(self):
+        """Stop the flusher thread and run the remaining buffered calls.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.stopped.set()
+        self.flusher.join()
+        self.flush()
+        atexit.unregister(self.close)
@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import pytest
+from mock import MagicMock
+from src.async_condensed_binocular import Async_Condensed_Binocular
+
+
+# Tests report methods
+def test_report_metric_calls_reporter_and_waits():
+    # arrange
+    reporter = MagicMock()
+
+    async def act():
+        async with Async_Condensed_Binocular(reporter) as reporting:
+            await reporting.report_metric("FOO", 1, report_to_parent=True)
+            return reporter.report_metric.call_count
+
+    # act
+    call_count = asyncio.run(act())
+
+    # assert
+    assert call_count == 1
+    reporter.report_metric.assert_called_once_with("FOO", 1, "", True)
+
+
+def test_report_metric_nowait_sends_calls_of_one_tick_as_single_batch():
+    # arrange
+    reporter = MagicMock()
+    reporting = Async_Condensed_Binocular(reporter)
+    reporting.run_calls = MagicMock(wraps=reporting.run_calls)
+
+    async def act():
+        for value in range(10):
+            reporting.report_metric_nowait("FOO", value)
+        reporting.report_row_nowait("BAR", x=1)
+        await reporting.close()
+
+    # act
+    asyncio.run(act())
+
+    # assert
+    assert reporting.run_calls.call_count == 1
+    assert reporter.report_metric.call_count == 10
+    reporter.report_row.assert_called_once_with("BAR", False, x=1)
+    assert reporter.close.call_count == 1
+
+
+def test_report_nowait_methods_forward_all_arguments_and_copy_mutable_inputs():
+    # arrange
+    reporter = MagicMock()
+    reporting = Async_Condensed_Binocular(reporter)
+    values = {"FOO": 1, "BAR": [1, 2]}
+    table = {"x": [1, 2]}
+    image = bytearray(b"1")
+    tags = {"region": "westeurope"}
+
+    async def act():
+        reporting.report_metrics_nowait(values, step=3, tags=tags)
+        reporting.report_table_nowait("BAZ", table)
+        reporting.report_step_nowait("QUX", 0.5, 7, tags=tags)
+        reporting.report_image_nowait("IMG", image=image)
+        values["BAR"].append(3)
+        table["x"].append(3)
+        image[0:1] = b"2"
+        tags["region"] = "eastus"
+        await reporting.close()
+
+    # act
+    asyncio.run(act())
+
+    # assert
+    reporter.report_metrics.assert_called_once_with({"FOO": 1, "BAR": [1, 2]}, "", 3, False,
+                                                    tags={"region": "westeurope"})
+    reporter.report_table.assert_called_once_with("BAZ", {"x": [1, 2]}, False)
+    reporter.report_step.assert_called_once_with("QUX", 0.5, 7, "", False, tags={"region": "westeurope"})
+    reporter.report_image.assert_called_once_with("IMG", None, None, b"1")
+
+
+def test_report_metric_raises_exception_of_reporter():
+    # arrange
+    reporter = MagicMock()
+    reporter.report_metric.side_effect = ValueError("FOO")
+
+    async def act():
+        async with Async_Condensed_Binocular(reporter) as reporting:
+            await reporting.report_metric("FOO", 1)
+
+    # act & assert
+    with pytest.raises(ValueError):
+        asyncio.run(act())
+
+
+def test_report_metric_does_not_block_event_loop():
+    # arrange
+    loop_ran = threading.Event()
+    waits = []
+    reporter = MagicMock()
+    reporter.report_metric.side_effect = lambda *args: waits.append(loop_ran.wait(timeout=1))
+
+    async def run_loop():
+        await asyncio.sleep(0)
+        loop_ran.set()
+
+    async def act():
+        async with Async_Condensed_Binocular(reporter) as reporting:
+            await asyncio.gather(reporting.report_metric("FOO", 1), run_loop())
+
+    # act
+    asyncio.run(act())
+
+    # assert
+    assert waits == [True]
+
+
+# Tests flush method
+def test_flush_waits_for_queued_calls_and_flushes_reporter():
+    # arrange
+    reporter = MagicMock()
+
+    async def act():
+        reporting = Async_Condensed_Binocular(reporter)
+        reporting.report_list_nowait("FOO", [1, 2])
+        await reporting.flush()
+        return reporter.report_list.call_count, reporter.flush.call_count
+
+    # act
+    counts = asyncio.run(act())
+
+    # assert
+    assert counts == (1, 1)
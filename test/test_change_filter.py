@@ -0,0 +1,49 @@
+from src.change_filter import Change_Filter
+
+
+# Tests changed method
+def test_changed_suppresses_repeated_values():
+    # arrange
+    change_filter = Change_Filter()
+
+    # act
+    changed = [change_filter.changed("FOO", value, now=0) for value in (1, 1, 2, 2, 1)]
+
+    # assert
+    assert changed == [True, False, True, False, True]
+    assert change_filter.suppressed == 2
+
+
+def test_changed_suppresses_values_within_tolerance_of_the_last_written_value():
+    # arrange
+    change_filter = Change_Filter(tolerance=0.1)
+
+    # act
+    changed = [change_filter.changed("FOO", value, now=0) for value in (1.0, 1.05, 1.08, 1.15)]
+
+    # assert
+    assert changed == [True, False, False, True]
+
+
+def test_changed_lets_unchanged_values_through_after_heartbeat_interval():
+    # arrange
+    change_filter = Change_Filter(heartbeat_interval=10)
+
+    # act
+    changed = [change_filter.changed("FOO", 1, now=now) for now in (0, 5, 10, 15)]
+
+    # assert
+    assert changed == [True, False, True, False]
+
+
+def test_changed_keeps_keys_apart_and_compares_other_values_by_equality():
+    # arrange
+    change_filter = Change_Filter(tolerance=1)
+
+    # act
+    changed = [change_filter.changed("FOO", 1, now=0), change_filter.changed("BAR", 1, now=0),
+               change_filter.changed("BAZ", "a", now=0), change_filter.changed("BAZ", "a", now=0),
+               change_filter.changed("BAZ", "b", now=0)]
+
+    # assert
+    assert changed == [True, True, True, False, True]
@@ -1,12 +1,16 @@
-from mock import patch
-from src.binocular_sample import Condensed_Binocular
+import os
+import pytest
+import threading
+from mock import MagicMock, PropertyMock, patch
+from src.condensed_binocular import Condensed_Binocular
+from src.metric_spool import Metric_Spool
 
 
 # Tests Reporting initialization
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
-@patch("src.Condensed_Binocular.stats_module")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.stats_module")
 def test_reporting_initialization(mock_stats, mock_exporter, mock_run, mock_env):
     # act
     reporting = Condensed_Binocular()
@@ -16,14 +20,14 @@ def test_reporting_initialization(mock_stats, mock_exporter, mock_run, mock_env)
     assert mock_run.get_context.call_count == 1
     assert reporting.run_id is not None
     assert mock_exporter.new_metrics_exporter.call_count == 1
-    assert reporting.exporter.add_telemetry_processor.call_count == 1
+    assert reporting.exporter.apply_telemetry_processors == reporting.process_batch
     mock_stats.stats.view_manager.register_exporter.assert_called_once_with(reporting.exporter)
 
 
 # Tests report_metric method
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
 def test_report_metric_calls_aml_logging_with_parameters(mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -37,9 +41,9 @@ def test_report_metric_calls_aml_logging_with_parameters(mock_exporter, mock_run
     reporting.run.log.assert_called_once_with(name, metric)
 
 
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
 def test_report_metric_calls_aml_parent_logging_with_parameters_if_parent_is_true_and_run_is_online(mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -55,9 +59,9 @@ def test_report_metric_calls_aml_parent_logging_with_parameters_if_parent_is_tru
     reporting.run.parent.log.assert_called_once_with(name, metric)
 
 
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
 def test_report_metric_doesnt_call_aml_parent_logging_if_parent_is_false_and_run_is_online(mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -73,9 +77,9 @@ def test_report_metric_doesnt_call_aml_parent_logging_if_parent_is_false_and_run
     assert reporting.run.parent.log.call_count == 0
 
 
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
 def test_report_metric_doesnt_call_aml_parent_logging_if_run_is_offline(mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -90,11 +94,11 @@ def test_report_metric_doesnt_call_aml_parent_logging_if_run_is_offline(mock_exp
     assert reporting.run.parent.log.call_count == 0
 
 
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
-@patch("src.Condensed_Binocular.measure_module")
-@patch("src.Condensed_Binocular.Reporting.set_view")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.measure_module")
+@patch("src.condensed_binocular.Condensed_Binocular.set_view")
 def test_report_metric_calls_set_view_with_parameters(mock_view, mock_measuremodule, mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -109,11 +113,11 @@ def test_report_metric_calls_set_view_with_parameters(mock_view, mock_measuremod
     mock_view.assert_called_once_with(name, description, mock_measuremodule.MeasureFloat(name, description))
 
 
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
-@patch("src.Condensed_Binocular.stats_module.stats.stats_recorder")
-@patch("src.Condensed_Binocular.tag_map_module")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.stats_module.stats.stats_recorder")
+@patch("src.condensed_binocular.tag_map_module")
 def test_report_metric_calls_measurementmap_record(mock_tagmap, mock_statsmodule, mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -125,10 +129,304 @@ def test_report_metric_calls_measurementmap_record(mock_tagmap, mock_statsmodule
     assert mock_statsmodule.new_measurement_map().record.call_count == 1
 
 
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.Condensed_Binocular.set_view")
+def test_report_metric_sets_view_only_once_per_metric(mock_view, mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular()
+
+    # act
+    reporting.report_metric("FOO", 1)
+    reporting.report_metric("FOO", 2)
+    reporting.report_metric("BAR", 3)
+
+    # assert
+    assert mock_view.call_count == 2
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.Condensed_Binocular.set_view")
+def test_report_metric_reuses_measure_for_same_name(mock_view, mock_exporter, mock_run, mock_env, caplog):
+    # arrange
+    reporting = Condensed_Binocular()
+
+    # act
+    measure = reporting.get_measure("FOO", "BAR")
+
+    # assert
+    assert reporting.get_measure("FOO", "BAR") is measure
+    assert not caplog.records
+    assert reporting.get_measure("FOO", "BAZ") is measure
+    assert reporting.get_measure("FOO", "QUX") is measure
+    assert mock_view.call_count == 1
+    assert len(caplog.records) == 1
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_report_metric_records_values_reported_with_another_description(mock_exporter, mock_run, mock_env):
+    # arrange
+    from src.condensed_binocular import stats_module
+    reporting = Condensed_Binocular(summary_interval=60)
+    reporting.report_metric("described_twice", 1.0, description="first")
+
+    # act
+    reporting.report_metric("described_twice", 2.0, description="second")
+
+    # assert
+    view_data = stats_module.stats.view_manager.get_view("described_twice")
+    assert view_data.view.description == "first"
+    assert [data.value for data in view_data.tag_value_aggregation_data_map.values()] == [2.0]
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.stats_module.stats.stats_recorder")
+def test_report_metric_records_with_the_same_empty_tag_map(mock_statsmodule, mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular()
+
+    # act
+    reporting.report_metric("FOO", 1)
+    reporting.report_metric("FOO", 2)
+
+    # assert
+    mock_statsmodule.new_measurement_map().record.assert_called_with(reporting.empty_tag_map)
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_report_metric_looks_up_parent_run_only_once(mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular()
+    reporting.offline_run = None
+    parent = MagicMock(parent=None)
+    parent_property = PropertyMock(return_value=parent)
+    type(reporting.run).parent = parent_property
+
+    # act
+    reporting.report_metric("FOO", 1, report_to_parent=True)
+    reporting.report_metric("FOO", 2, report_to_parent=True)
+
+    # assert
+    assert parent_property.call_count == 1
+    assert parent.log.call_count == 2
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_report_metric_calls_aml_ancestor_logging_up_to_ancestor_depth(mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular(ancestor_depth=2)
+    reporting.offline_run = None
+    name = "FOO"
+    metric = 1
+
+    # act
+    reporting.report_metric(name, metric, report_to_parent=True)
+
+    # assert
+    reporting.run.parent.log.assert_called_once_with(name, metric)
+    reporting.run.parent.parent.log.assert_called_once_with(name, metric)
+    assert reporting.run.parent.parent.parent.log.call_count == 0
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_refresh_ancestor_runs_looks_up_parent_run_again(mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular()
+    reporting.offline_run = None
+    reporting.report_metric("FOO", 1, report_to_parent=True)
+    new_parent = MagicMock(parent=None)
+    reporting.run.parent = new_parent
+
+    # act
+    reporting.refresh_ancestor_runs()
+    reporting.report_metric("FOO", 2, report_to_parent=True)
+
+    # assert
+    new_parent.log.assert_called_once_with("FOO", 2)
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.Condensed_Binocular.record_last_value")
+def test_report_metric_records_summary_of_registered_metric_on_flush(mock_record, mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular(summary_interval=60)
+    reporting.register_metric("FOO", "BAR", aggregation="summary")
+
+    # act
+    reporting.report_metric("FOO", 1)
+    reporting.report_metric("FOO", 3)
+    assert mock_record.call_count == 0
+    reporting.flush()
+
+    # assert
+    mock_record.assert_any_call("FOO_count", 2, "BAR")
+    mock_record.assert_any_call("FOO_min", 1, "BAR")
+    mock_record.assert_any_call("FOO_max", 3, "BAR")
+    mock_record.assert_any_call("FOO_mean", 2, "BAR")
+    reporting.close()
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.time")
+@patch("src.condensed_binocular.Condensed_Binocular.record_last_value")
+def test_report_metric_records_summary_once_summary_interval_passed(mock_record, mock_time, mock_exporter, mock_run, mock_env):
+    # arrange
+    mock_time.monotonic.return_value = 0
+    reporting = Condensed_Binocular(summary_interval=10)
+    reporting.register_metric("FOO", aggregation="count")
+    reporting.report_metric("FOO", 1)
+
+    # act
+    mock_time.monotonic.return_value = 11
+    reporting.report_metric("FOO", 1)
+
+    # assert
+    mock_record.assert_called_once_with("FOO_count", 2, "")
+    reporting.close()
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_register_metric_raises_for_unknown_aggregation(mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular()
+
+    # act & assert
+    with pytest.raises(ValueError):
+        reporting.register_metric("FOO", aggregation="BAR")
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.Condensed_Binocular.record_app_insights")
+def test_report_metric_reports_sampled_out_count_on_flush_if_sample_every_is_set(mock_record, mock_exporter, mock_run,
+                                                                                mock_env):
+    # arrange
+    reporting = Condensed_Binocular(sample_every=2, summary_interval=60)
+
+    # act
+    for value in range(5):
+        reporting.report_metric("FOO", value)
+    reporting.flush()
+
+    # assert
+    assert reporting.run.log.call_args_list == [(("FOO", 0),), (("FOO", 2),), (("FOO", 4),), (("FOO_sampled_out", 2),)]
+    mock_record.assert_called_with("FOO_sampled_out", 2, "", None)
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.time")
+def test_report_metric_reports_dropped_count_once_sampling_window_passed(mock_time, mock_exporter, mock_run, mock_env):
+    # arrange
+    mock_time.monotonic.return_value = 0
+    reporting = Condensed_Binocular(rate_limit=1, sampling_window=10, summary_interval=60)
+    for _ in range(3):
+        reporting.report_metric("FOO", 1)
+
+    # act
+    mock_time.monotonic.return_value = 11
+    reporting.report_metric("FOO", 1)
+
+    # assert
+    reporting.run.log.assert_any_call("FOO_dropped", 2)
+    assert reporting.run.log.call_count == 3
+
+
+# Tests report_metrics method
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.stats_module.stats.stats_recorder")
+def test_report_metrics_calls_aml_logging_and_records_once(mock_statsmodule, mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular(summary_interval=60)
+
+    # act
+    reporting.report_metrics({"FOO": 1, "BAR": 2})
+
+    # assert
+    reporting.run.log.assert_any_call("FOO", 1)
+    reporting.run.log.assert_any_call("BAR", 2)
+    assert mock_statsmodule.new_measurement_map().record.call_count == 1
+    assert mock_statsmodule.new_measurement_map().measure_float_put.call_count == 2
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_report_metrics_calls_aml_list_logging_for_arrays(mock_exporter, mock_run, mock_env):
+    # arrange
+    numpy = pytest.importorskip("numpy")
+    reporting = Condensed_Binocular(summary_interval=60)
+    reporting.offline_run = None
+
+    # act
+    reporting.report_metrics({"FOO": numpy.array([[1.0, 2.0], [3.0, 4.0]]), "BAR": numpy.float64(5.0)},
+                             report_to_parent=True)
+
+    # assert
+    reporting.run.log_list.assert_called_once_with("FOO", [1.0, 2.0, 3.0, 4.0])
+    reporting.run.parent.log_list.assert_called_once_with("FOO", [1.0, 2.0, 3.0, 4.0])
+    reporting.run.log.assert_called_once_with("BAR", 5.0)
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_report_metrics_calls_aml_logging_with_step(mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular(summary_interval=60)
+
+    # act
+    reporting.report_metrics({"FOO": 1}, step=10)
+
+    # assert
+    reporting.run.log.assert_called_once_with("FOO", 1, step=10)
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_report_metrics_records_values_next_to_negative_values(mock_exporter, mock_run, mock_env):
+    # arrange
+    from src.condensed_binocular import stats_module
+    reporting = Condensed_Binocular(summary_interval=60)
+    values = {"mixed_sign_accuracy": 0.9, "mixed_sign_reward": -1.0, "mixed_sign_loss": 0.3}
+
+    # act
+    reporting.report_metrics(values)
+
+    # assert
+    for name in ("mixed_sign_accuracy", "mixed_sign_loss"):
+        view_data = stats_module.stats.view_manager.get_view(name)
+        assert [data.value for data in view_data.tag_value_aggregation_data_map.values()] == [values[name]]
+
+
 # Tests report_metric_with_run_tagging method
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
 def test_report_metric_with_run_tagging_calls_aml_logging_with_parameters(mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -142,9 +440,9 @@ def test_report_metric_with_run_tagging_calls_aml_logging_with_parameters(mock_e
     reporting.run.log.assert_called_once_with(name, metric)
 
 
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
 def test_report_metric_with_run_tagging_calls_aml_parent_logging_with_parameters_if_run_is_online(mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -159,9 +457,9 @@ def test_report_metric_with_run_tagging_calls_aml_parent_logging_with_parameters
     reporting.run.parent.log.assert_called_once_with(name, metric)
 
 
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
 def test_report_metric_with_run_tagging_doesnt_call_aml_parent_logging_if_run_is_offline(mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -175,9 +473,9 @@ def test_report_metric_with_run_tagging_doesnt_call_aml_parent_logging_if_run_is
     assert reporting.run.parent.log.call_count == 0
 
 
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
 def test_report_metric_with_run_tagging_calls_aml_parent_tagging_with_parameters_if_run_is_online(mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -192,9 +490,9 @@ def test_report_metric_with_run_tagging_calls_aml_parent_tagging_with_parameters
     reporting.run.parent.tag.assert_called_once_with(name, metric)
 
 
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
 def test_report_metric_with_run_tagging_doesnt_call_aml_parent_tagging_if_run_is_offline(mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -208,11 +506,11 @@ def test_report_metric_with_run_tagging_doesnt_call_aml_parent_tagging_if_run_is
     assert reporting.run.parent.tag.call_count == 0
 
 
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
-@patch("src.Condensed_Binocular.measure_module")
-@patch("src.Condensed_Binocular.Reporting.set_view")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.measure_module")
+@patch("src.condensed_binocular.Condensed_Binocular.set_view")
 def test_report_metric_with_run_tagging_calls_set_view_with_parameters(mock_view, mock_measuremodule, mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -227,11 +525,11 @@ def test_report_metric_with_run_tagging_calls_set_view_with_parameters(mock_view
     mock_view.assert_called_once_with(name, description, mock_measuremodule.MeasureFloat(name, description))
 
 
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
-@patch("src.Condensed_Binocular.stats_module.stats.stats_recorder")
-@patch("src.Condensed_Binocular.tag_map_module")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.stats_module.stats.stats_recorder")
+@patch("src.condensed_binocular.tag_map_module")
 def test_report_metric_with_run_tagging_calls_measurementmap_record(mock_tagmap, mock_statsmodule, mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -244,9 +542,9 @@ def test_report_metric_with_run_tagging_calls_measurementmap_record(mock_tagmap,
 
 
 # Tests report_list method
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
 def test_report_list_calls_aml_logging_with_parameters(mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -260,9 +558,9 @@ def test_report_list_calls_aml_logging_with_parameters(mock_exporter, mock_run,
     reporting.run.log_list.assert_called_once_with(name, metric_list)
 
 
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
 def test_report_list_calls_aml_parent_logging_with_parameters_if_parent_is_true_and_run_is_online(mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -278,9 +576,9 @@ def test_report_list_calls_aml_parent_logging_with_parameters_if_parent_is_true_
     reporting.run.parent.log_list.assert_called_once_with(name, metric_list)
 
 
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
 def test_report_list_doesnt_call_aml_parent_logging_if_parent_is_false_and_run_is_online(mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -296,9 +594,9 @@ def test_report_list_doesnt_call_aml_parent_logging_if_parent_is_false_and_run_i
     assert reporting.run.parent.log_list.call_count == 0
 
 
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
 def test_report_list_doesnt_call_aml_parent_logging_if_run_is_offline(mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -314,9 +612,9 @@ def test_report_list_doesnt_call_aml_parent_logging_if_run_is_offline(mock_expor
 
 
 # Tests report_row method
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
 def test_report_row_calls_aml_logging_with_parameters(mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -331,9 +629,9 @@ def test_report_row_calls_aml_logging_with_parameters(mock_exporter, mock_run, m
     reporting.run.log_row.assert_called_once_with(name, x=x_axis, y=y_axis)
 
 
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
 def test_report_row_calls_aml_parent_logging_with_parameters_if_parent_is_true_and_run_is_online(mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -350,9 +648,9 @@ def test_report_row_calls_aml_parent_logging_with_parameters_if_parent_is_true_a
     reporting.run.parent.log_row.assert_called_once_with(name, description="", x=x_axis, y=y_axis)
 
 
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
 def test_report_row_doesnt_call_aml_parent_logging_if_parent_is_false_and_run_is_online(mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -369,9 +667,9 @@ def test_report_row_doesnt_call_aml_parent_logging_if_parent_is_false_and_run_is
     assert reporting.run.parent.log_row.call_count == 0
 
 
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
 def test_report_row_doesnt_call_aml_parent_logging_if_run_is_offline(mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -388,9 +686,9 @@ def test_report_row_doesnt_call_aml_parent_logging_if_run_is_offline(mock_export
 
 
 # Tests report_table method
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
 def test_report_table_calls_aml_logging_with_parameters(mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -404,9 +702,9 @@ def test_report_table_calls_aml_logging_with_parameters(mock_exporter, mock_run,
     reporting.run.log_table.assert_called_once_with(name, table)
 
 
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
 def test_report_table_calls_aml_parent_logging_with_parameters_if_parent_is_true_and_run_is_online(mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -422,9 +720,9 @@ def test_report_table_calls_aml_parent_logging_with_parameters_if_parent_is_true
     reporting.run.parent.log_table.assert_called_once_with(name, table)
 
 
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
 def test_report_table_doesnt_call_aml_parent_logging_if_parent_is_false_and_run_is_online(mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -440,9 +738,9 @@ def test_report_table_doesnt_call_aml_parent_logging_if_parent_is_false_and_run_
     assert reporting.run.parent.log_table.call_count == 0
 
 
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
 def test_report_table_doesnt_call_aml_parent_logging_if_run_is_offline(mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -457,10 +755,28 @@ def test_report_table_doesnt_call_aml_parent_logging_if_run_is_offline(mock_expo
     assert reporting.run.parent.report_table.call_count == 0
 
 
+# Tests open_table_stream method
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_open_table_stream_calls_aml_table_logging_per_chunk(mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular()
+    reporting.offline_run = None
+
+    # act
+    with reporting.open_table_stream("FOO", chunk_rows=2, report_to_parent=True) as table:
+        table.write_rows({"x": x} for x in range(3))
+
+    # assert
+    assert reporting.run.log_table.call_count == 2
+    reporting.run.parent.log_table.assert_called_with("FOO", {"x": [2]})
+
+
 # Tests report_image method
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
 def test_report_image_calls_aml_logging_with_parameters(mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -474,11 +790,993 @@ def test_report_image_calls_aml_logging_with_parameters(mock_exporter, mock_run,
     reporting.run.log_image.assert_called_once_with(name, path=path, plot=None)
 
 
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_report_image_with_image_uploads_rendered_file_once_per_content(mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular()
+
+    # act
+    reporting.report_image("FOO", image=b"1")
+    reporting.report_image("FOO", image=b"1")
+
+    # assert
+    assert reporting.run.log_image.call_count == 1
+    assert reporting.run.log_image.call_args[0] == ("FOO",)
+    assert reporting.run.log_image.call_args[1]["path"].endswith(".png")
+    reporting.close()
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_report_image_with_plot_uses_image_pipeline_if_background_images(mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular(background_images=True)
+    reporting.get_image_pipeline().submit = MagicMock()
+    plot = MagicMock()
+
+    # act
+    reporting.report_image("FOO", plot=plot)
+
+    # assert
+    reporting.image_pipeline.submit.assert_called_once_with("FOO", plot=plot, image=None)
+    assert reporting.run.log_image.call_count == 0
+    reporting.close()
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_report_image_keeps_image_for_later_and_uploads_it_on_close_if_aml_fails(mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular(retry_attempts=1, failure_threshold=1)
+    uploads = []
+
+    def log_image(name, path=None, plot=None):
+        if not uploads:
+            uploads.append(None)
+            raise ConnectionError("FOO")
+        with open(path, "rb") as file:
+            uploads.append(file.read())
+    reporting.run.log_image.side_effect = log_image
+
+    # act
+    reporting.report_image("FOO", image=b"1")
+    reporting.aml_guard.breaker.opened_until = 0.0
+    reporting.close()
+
+    # assert
+    assert uploads == [None, b"1"]
+    assert not os.path.exists(reporting.image_pipeline.directory)
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_report_image_with_plot_does_not_raise_if_aml_fails(mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular(retry_attempts=1, failure_threshold=1)
+    reporting.run.log_image.side_effect = ConnectionError("FOO")
+
+    # act
+    reporting.report_image("FOO", plot=MagicMock())
+
+    # assert
+    assert reporting.stats()["circuits"]["aml"]["shed"] == 1
+
+
+# Tests stats method
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_stats_reports_calls_and_latency_if_instrument(mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular(instrument=True, batch_size=10)
+    reporting.offline_run = None
+    reporting.record_app_insights = MagicMock()
+
+    # act
+    reporting.report_metric("FOO", 1)
+    reporting.report_metric("FOO", 2)
+    stats = reporting.stats()
+
+    # assert
+    assert stats["calls"] == {"report_metric": 2}
+    assert set(stats["latency_ms"]["report_metric"]) == {"total", "aml", "app_insights", "local"}
+    assert stats["queue_depth"] == {"batcher": 2}
+    reporting.close()
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_stats_reports_report_step_calls_if_instrument(mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular(instrument=True, series_resolution=3, series_range=10, summary_interval=60)
+    reporting.offline_run = None
+    reporting.record_app_insights = MagicMock()
+
+    # act
+    for step in range(3):
+        reporting.report_step("loss", float(step), step)
+    stats = reporting.stats()
+
+    # assert
+    assert stats["calls"] == {"report_step": 3}
+    assert set(stats["latency_ms"]["report_step"]) == {"total", "aml", "app_insights", "local"}
+    reporting.close()
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_report_metric_is_not_wrapped_without_instrument(mock_exporter, mock_run, mock_env):
+    # arrange & act
+    reporting = Condensed_Binocular()
+
+    # assert
+    assert "report_metric" not in vars(reporting)
+    assert "calls" not in reporting.stats()
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_emit_stats_records_statistics_for_app_insights(mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular(instrument=True, emit_stats=True, stats_interval=0)
+    reporting.offline_run = None
+    reporting.get_measure = MagicMock()
+
+    # act
+    with patch("src.condensed_binocular.stats_module"):
+        reporting.report_metric("FOO", 1)
+
+    # assert
+    names = [call[0][0] for call in reporting.get_measure.call_args_list]
+    assert "condensed_binocular_report_metric_calls" in names
+    assert "condensed_binocular_report_metric_aml_p95_ms" in names
+
+
+# Tests thread safety
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_get_measure_registers_each_view_once_across_threads(mock_exporter, mock_run, mock_env):
+    # arrange
+    import threading
+    import time
+    reporting = Condensed_Binocular()
+    barrier = threading.Barrier(8)
+
+    def slow_set_view(metric, description, measure):
+        time.sleep(0.01)
+
+    def work():
+        barrier.wait()
+        reporting.get_measure("FOO")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+
+    # act
+    with patch("src.condensed_binocular.Condensed_Binocular.set_view", side_effect=slow_set_view) as mock_set_view:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    # assert
+    assert mock_set_view.call_count == 1
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_report_metric_is_reported_by_flush_if_thread_buffering(mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular(thread_buffering=True, thread_buffer_interval=60)
+    reporting.offline_run = None
+    reporting.record_app_insights = MagicMock()
+
+    # act
+    reporting.report_metric("FOO", 1)
+    logged_before_flush = reporting.run.log.call_count
+    reporting.flush()
+
+    # assert
+    assert logged_before_flush == 0
+    reporting.run.log.assert_called_once_with("FOO", 1)
+    reporting.record_app_insights.assert_called_once_with("FOO", 1, "", None)
+    reporting.close()
+
+
+# Tests tags
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.stats_module")
+@patch("src.condensed_binocular.measure_module")
+@patch("src.condensed_binocular.Condensed_Binocular.set_view")
+def test_report_metric_declares_tag_keys_on_the_view_and_records_tags(mock_view, mock_measuremodule, mock_stats,
+                                                                       mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular()
+    reporting.offline_run = None
+    reporting.register_metric("FOO", tag_keys=("model_version", "region"), max_cardinality=1)
+    measurement_map = mock_stats.stats.stats_recorder.new_measurement_map.return_value
+
+    # act
+    reporting.report_metric("FOO", 1, tags={"model_version": "3", "region": "westeurope"})
+    reporting.report_metric("FOO", 2, tags={"model_version": "4", "region": "westeurope"})
+
+    # assert
+    mock_view.assert_called_once_with("FOO", "", mock_measuremodule.MeasureFloat("FOO", ""), ("model_version", "region"))
+    recorded = [dict(call[0][0]) for call in measurement_map.record.call_args_list]
+    assert recorded == [{"model_version": "3", "region": "westeurope"}, {"model_version": "other", "region": "other"}]
+    reporting.run.log.assert_called_with("FOO", 2)
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.Condensed_Binocular.set_view")
+def test_register_metric_raises_for_tag_keys_of_a_reported_metric(mock_view, mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular()
+    reporting.get_measure("FOO")
+
+    # act & assert
+    with pytest.raises(ValueError):
+        reporting.register_metric("FOO", tag_keys=("region",))
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.stats_module")
+@patch("src.condensed_binocular.Condensed_Binocular.set_view")
+def test_report_metrics_records_one_measurement_per_tag_map(mock_view, mock_stats, mock_exporter, mock_run,
+                                                            mock_env):
+    # arrange
+    reporting = Condensed_Binocular(summary_interval=60)
+    reporting.offline_run = None
+    reporting.register_metric("FOO", tag_keys=("shard",), max_cardinality=0)
+    recorder = mock_stats.stats.stats_recorder
+
+    # act
+    reporting.report_metrics({"FOO": 1, "BAR": 2, "BAZ": 3}, tags={"shard": "1"})
+
+    # assert
+    recorded = [dict(call[0][0]) for call in recorder.new_measurement_map.return_value.record.call_args_list]
+    assert sorted(recorded, key=str) == [{"shard": "1"}, {"shard": "other"}]
+
+
+# Tests batch processing
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_get_common_properties_includes_run_experiment_node_rank_and_git_sha(mock_exporter, mock_run, mock_env):
+    # arrange
+    run = MagicMock()
+    run.id = "FOO_RUN"
+    run.experiment.name = "FOO_EXPERIMENT"
+    run.properties = {"azureml.git.commit": "abc123"}
+
+    # act
+    with patch.dict("os.environ", {"NODE_RANK": "2"}):
+        reporting = Condensed_Binocular(run=run)
+
+    # assert
+    assert reporting.common_properties == {"Correlation_id": "FOO_RUN", "Run_id": "FOO_RUN",
+                                           "Experiment": "FOO_EXPERIMENT", "Node_rank": "2", "Git_sha": "abc123"}
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_process_batch_adds_common_properties_and_runs_batch_processors(mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular()
+    reporting.common_properties = {"Correlation_id": "FOO"}
+    original = reporting.apply_telemetry_processors
+    original.side_effect = lambda envelopes: envelopes
+    envelopes = [MagicMock() for _ in range(3)]
+    for envelope in envelopes:
+        envelope.data.baseData.properties = {"region": "westeurope"}
+    reporting.add_batch_processor(lambda batch: batch[:2])
+
+    # act
+    exported = reporting.exporter.apply_telemetry_processors(envelopes)
+
+    # assert
+    assert exported == envelopes[:2]
+    assert envelopes[0].data.baseData.properties == {"region": "westeurope", "Correlation_id": "FOO"}
+    original.assert_called_once_with(envelopes[:2])
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_process_batch_skips_telemetry_processors_if_batch_processors_drop_all(mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular()
+    reporting.add_batch_processor(lambda batch: [])
+
+    # act
+    exported = reporting.process_batch([MagicMock()])
+
+    # assert
+    assert exported == []
+    assert reporting.apply_telemetry_processors.call_count == 0
+
+
+# Tests changes_only mode
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.Condensed_Binocular.record_app_insights")
+def test_report_metric_with_run_tagging_skips_unchanged_logs_and_tags_if_changes_only(mock_record, mock_exporter,
+                                                                                      mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular(changes_only=True)
+    reporting.offline_run = None
+    reporting.ancestor_runs = [reporting.run.parent]
+
+    # act
+    for value in (1, 1, 2):
+        reporting.report_metric_with_run_tagging("FOO", value)
+
+    # assert
+    assert reporting.run.parent.tag.call_args_list == [(("FOO", 1),), (("FOO", 2),)]
+    assert reporting.run.parent.log.call_count == 2
+    assert reporting.run.log.call_count == 2
+    assert mock_record.call_count == 3
+    assert reporting.stats()["unchanged"] == 3
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.Condensed_Binocular.record_app_insights")
+@patch("src.condensed_binocular.time")
+def test_report_metric_writes_unchanged_value_again_after_heartbeat_interval(mock_time, mock_record, mock_exporter,
+                                                                             mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular(changes_only=True, change_tolerance=0.01, heartbeat_interval=60,
+                                    summary_interval=60)
+    reporting.offline_run = None
+
+    # act
+    for now, value in ((0, 0.5), (10, 0.505), (70, 0.505)):
+        mock_time.monotonic.return_value = now
+        reporting.report_metric("FOO", value)
+
+    # assert
+    assert reporting.run.log.call_args_list == [(("FOO", 0.5),), (("FOO", 0.505),)]
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.Condensed_Binocular.record_last_values")
+def test_report_metrics_always_writes_values_with_a_step_if_changes_only(mock_record, mock_exporter, mock_run,
+                                                                         mock_env):
+    # arrange
+    reporting = Condensed_Binocular(changes_only=True, summary_interval=60)
+    reporting.offline_run = None
+
+    # act
+    reporting.report_metrics({"FOO": 1}, step=1)
+    reporting.report_metrics({"FOO": 1}, step=2)
+    reporting.report_metrics({"FOO": 1})
+    reporting.report_metrics({"FOO": 1})
+
+    # assert
+    assert reporting.run.log.call_count == 3
+
+
+# Tests sinks
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.Condensed_Binocular.record_app_insights")
+def test_report_metric_writes_to_local_sinks_and_filters_aml_metrics(mock_record, mock_exporter, mock_run, mock_env):
+    # arrange
+    from src.metric_sinks import Ring_Buffer_Sink
+    sink = Ring_Buffer_Sink()
+    reporting = Condensed_Binocular(sinks=[sink], aml_metrics=lambda name: not name.startswith("step_"))
+    reporting.offline_run = None
+
+    # act
+    reporting.report_metric("step_loss", 0.5)
+    reporting.report_metric("epoch_loss", 0.4)
+
+    # assert
+    reporting.run.log.assert_called_once_with("epoch_loss", 0.4)
+    assert mock_record.call_count == 2
+    assert [record[1:3] for record in sink.records] == [("step_loss", 0.5), ("epoch_loss", 0.4)]
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.Condensed_Binocular.record_last_values")
+def test_report_metrics_writes_scalars_with_step_to_local_sinks(mock_record, mock_exporter, mock_run, mock_env):
+    # arrange
+    sink = MagicMock()
+    reporting = Condensed_Binocular(sinks=[sink], app_insights_metrics={"loss"}, summary_interval=60)
+    reporting.offline_run = None
+
+    # act
+    reporting.report_metrics({"loss": 0.5, "lr": 0.1, "classes": [1, 2]}, step=3)
+    reporting.close()
+
+    # assert
+    assert [call[0][:5] for call in sink.write.call_args_list] == [("loss", 0.5, "", False, 3), ("lr", 0.1, "", False, 3)]
+    mock_record.assert_called_once_with({"loss": 0.5}, "", None)
+    sink.close.assert_called_once_with()
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.Condensed_Binocular.record_app_insights")
+@patch("src.condensed_binocular.Condensed_Binocular.record_last_values")
+def test_failing_local_sink_does_not_stop_other_sinks_or_reach_caller(mock_record_values, mock_record, mock_exporter,
+                                                                      mock_run, mock_env):
+    # arrange
+    failing_sink, sink = MagicMock(), MagicMock()
+    failing_sink.write.side_effect = OSError("FOO")
+    reporting = Condensed_Binocular(sinks=[failing_sink, sink], summary_interval=60)
+
+    # act
+    reporting.report_metrics({"loss": 0.5, "lr": 0.1})
+    reporting.report_metric_with_run_tagging("accuracy", 0.9)
+    reporting.report_step("loss", 0.4, 1)
+
+    # assert
+    assert [call[0][0] for call in sink.write.call_args_list] == ["loss", "lr", "accuracy", "loss"]
+    mock_record_values.assert_called_once_with({"loss": 0.5, "lr": 0.1}, "", None)
+    assert mock_record.call_count == 2
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.Condensed_Binocular.shutdown_exporter")
+def test_failing_local_sink_does_not_stop_flush_or_close(mock_shutdown, mock_exporter, mock_run, mock_env):
+    # arrange
+    failing_sink, sink = MagicMock(), MagicMock()
+    failing_sink.flush.side_effect = OSError("FOO")
+    failing_sink.close.side_effect = OSError("FOO")
+    reporting = Condensed_Binocular(sinks=[failing_sink, sink], summary_interval=60)
+
+    # act
+    reporting.flush()
+    reporting.close()
+
+    # assert
+    sink.flush.assert_called_once_with()
+    sink.close.assert_called_once_with()
+    mock_shutdown.assert_called_once_with(reporting.exporter)
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.Condensed_Binocular.record_app_insights")
+def test_report_step_uploads_downsampled_ranges_to_aml_and_all_points_to_local_sinks(mock_record, mock_exporter,
+                                                                                     mock_run, mock_env):
+    # arrange
+    sink = MagicMock()
+    reporting = Condensed_Binocular(sinks=[sink], series_resolution=3, series_range=10, summary_interval=60)
+    reporting.offline_run = None
+
+    # act
+    for step in range(10):
+        reporting.report_step("loss", float(step), step)
+    reporting.series_dispatcher.flush()
+
+    # assert
+    assert reporting.run.log.call_count == 3
+    reporting.run.log.assert_called_with("loss", 9.0, step=9)
+    assert mock_record.call_count == 10
+    assert sink.write.call_count == 10
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.Condensed_Binocular.record_app_insights")
+def test_end_epoch_uploads_exact_last_point_of_each_series(mock_record, mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular(series_resolution=3, series_range=100, summary_interval=60)
+    reporting.offline_run = None
+    for step in range(5):
+        reporting.report_step("loss", float(step), step, report_to_parent=True)
+    reporting.run.log.assert_not_called()
+
+    # act
+    reporting.end_epoch()
+    reporting.series_dispatcher.flush()
+
+    # assert
+    reporting.run.log.assert_called_with("loss", 4.0, step=4)
+    reporting.run.parent.log.assert_called_with("loss", 4.0, step=4)
+    assert reporting.run.log.call_count == 3
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.Condensed_Binocular.record_app_insights")
+def test_report_step_uploads_ranges_to_aml_on_a_background_thread(mock_record, mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular(series_resolution=3, series_range=10, summary_interval=60)
+    reporting.offline_run = None
+    threads = []
+    reporting.run.log.side_effect = lambda *args, **kwargs: threads.append(threading.current_thread())
+
+    # act
+    for step in range(10):
+        reporting.report_step("loss", float(step), step)
+    reporting.flush()
+
+    # assert
+    assert len(threads) == 3
+    assert threading.current_thread() not in threads
+    reporting.close()
+    assert reporting.stats()["queue_depth"]["series"] == 0
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_reporting_initialization_raises_for_unknown_series_strategy(mock_exporter, mock_run, mock_env):
+    # act / assert
+    with pytest.raises(ValueError):
+        Condensed_Binocular(series_strategy="FOO")
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.stats_module")
+def test_close_unregisters_and_shuts_down_exporter_once(mock_stats, mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular(summary_interval=60)
+
+    # act
+    reporting.close()
+    reporting.close()
+
+    # assert
+    mock_stats.stats.view_manager.unregister_exporter.assert_called_once_with(reporting.exporter)
+    reporting.exporter.shutdown.assert_called_once_with()
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.view_module")
+def test_reporters_of_a_pool_share_exporter_and_measures(mock_view, mock_exporter, mock_run, mock_env):
+    # arrange
+    pool = MagicMock(measures={}, metric_dimensions={}, registration_lock=MagicMock())
+    first = Condensed_Binocular(pool=pool, summary_interval=60)
+    second = Condensed_Binocular(pool=pool, summary_interval=60)
+
+    # act
+    first.report_metric("FOO", 1)
+    second.report_metric("FOO", 2)
+    second.close()
+
+    # assert
+    assert first.exporter is second.exporter is pool.acquire.return_value
+    mock_exporter.new_metrics_exporter.assert_not_called()
+    mock_env.assert_not_called()
+    assert mock_view.View.call_count == 1
+    pool.release.assert_called_once_with(second)
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.stats_module")
+@patch("src.condensed_binocular.view_module")
+def test_reporters_of_a_pool_tag_their_values_with_their_run(mock_view, mock_stats, mock_exporter, mock_run, mock_env):
+    # arrange
+    pool = MagicMock(measures={}, metric_dimensions={}, registration_lock=MagicMock())
+    first = Condensed_Binocular(pool=pool, summary_interval=60)
+    second = Condensed_Binocular(pool=pool, summary_interval=60)
+    record = mock_stats.stats.stats_recorder.new_measurement_map.return_value.record
+
+    # act
+    first.report_metric("FOO", 1, tags={"region": "westeurope"})
+    second.report_metric("FOO", 2, tags={"region": "westeurope"})
+    second.report_metric("BAR", 3)
+
+    # assert
+    assert [dict(call[0][0]) for call in record.call_args_list] == [
+        {"Correlation_id": first.run_id, "region": "westeurope"},
+        {"Correlation_id": second.run_id, "region": "westeurope"},
+        {"Correlation_id": second.run_id}]
+    assert [call[0][2] for call in mock_view.View.call_args_list] == [["Correlation_id", "region"], ["Correlation_id"]]
+    assert "Correlation_id" not in first.common_properties
+    assert "Run_id" not in second.common_properties
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.Condensed_Binocular.record_app_insights")
+def test_report_metric_keeps_reporting_to_app_insights_and_sinks_if_aml_fails(mock_record, mock_exporter, mock_run,
+                                                                              mock_env):
+    # arrange
+    sink = MagicMock()
+    reporting = Condensed_Binocular(sinks=[sink], retry_attempts=1, failure_threshold=1, summary_interval=60)
+    reporting.offline_run = None
+    reporting.run.log.side_effect = ConnectionError("FOO")
+
+    # act
+    reporting.report_metric("FOO", 1)
+    reporting.report_metric("FOO", 2)
+
+    # assert
+    assert reporting.run.log.call_count == 1
+    assert mock_record.call_count == 2
+    assert sink.write.call_count == 2
+    assert reporting.stats()["circuits"]["aml"] == {"state": "open", "retries": 0, "shed": 2, "lost": 0}
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.Condensed_Binocular.record_app_insights")
+def test_report_metric_keeps_reporting_to_aml_if_app_insights_fails(mock_record, mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular(summary_interval=60)
+    reporting.offline_run = None
+    mock_record.side_effect = ValueError("FOO")
+
+    # act
+    reporting.report_metric("FOO", 1)
+
+    # assert
+    reporting.run.log.assert_called_once_with("FOO", 1)
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_report_metric_uploads_batch_after_batch_interval_without_further_reports(mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular(batch_size=100, batch_interval=0.05, summary_interval=60)
+    reporting.offline_run = None
+    uploaded = threading.Event()
+    reporting.run.log_list.side_effect = lambda *args: uploaded.set()
+
+    # act
+    reporting.report_metric("FOO", 1)
+    uploaded.wait(5)
+
+    # assert
+    reporting.run.log_list.assert_called_once_with("FOO", [1])
+    reporting.close()
+    assert not reporting.sweeper.thread.is_alive()
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.Condensed_Binocular.record_last_value")
+def test_register_metric_records_summary_after_summary_interval_without_further_reports(mock_record, mock_exporter,
+                                                                                        mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular(summary_interval=0.05)
+    reporting.register_metric("FOO", aggregation="count")
+    recorded = threading.Event()
+    mock_record.side_effect = lambda name, value, description: recorded.set()
+
+    # act
+    reporting.report_metric("FOO", 1)
+    recorded.wait(5)
+
+    # assert
+    mock_record.assert_any_call("FOO_count", 1, "")
+    reporting.close()
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.Condensed_Binocular.send_metric")
+def test_report_metric_sends_reservoir_at_end_of_window_without_further_reports(mock_send, mock_exporter, mock_run,
+                                                                                mock_env):
+    # arrange
+    reporting = Condensed_Binocular(reservoir_size=2, sampling_window=0.05, summary_interval=60)
+    sent = threading.Event()
+    mock_send.side_effect = lambda *args: sent.set()
+
+    # act
+    reporting.report_metric("FOO", 1)
+    sent.wait(5)
+
+    # assert
+    mock_send.assert_any_call("FOO", 1, "", False, None)
+    reporting.close()
+
+
+# Tests non-blocking mode
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_report_metric_calls_aml_logging_from_background_thread_if_non_blocking(mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular(non_blocking=True)
+    reporting.offline_run = None
+    name = "FOO"
+    metric = 1
+
+    # act
+    reporting.report_metric(name, metric, report_to_parent=True)
+    reporting.flush()
+
+    # assert
+    reporting.run.log.assert_called_once_with(name, metric)
+    reporting.run.parent.log.assert_called_once_with(name, metric)
+    reporting.close()
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_report_list_copies_list_if_non_blocking(mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular(non_blocking=True)
+    name = "FOO"
+    metric_list = [1, 2, 3]
+
+    # act
+    reporting.report_list(name, metric_list)
+    metric_list.append(4)
+    reporting.close()
+
+    # assert
+    reporting.run.log_list.assert_called_once_with(name, [1, 2, 3])
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_report_image_with_plot_calls_aml_logging_right_away_if_non_blocking(mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular(non_blocking=True)
+    reporting.dispatcher.submit = MagicMock()
+    plot = MagicMock()
+
+    # act
+    reporting.report_image("FOO", plot=plot)
+
+    # assert
+    reporting.run.log_image.assert_called_once_with("FOO", path=None, plot=plot)
+    assert reporting.dispatcher.submit.call_count == 0
+    reporting.close()
+
+
+# Tests batching
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_report_metric_uploads_batched_values_as_list_if_batch_size_is_set(mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular(batch_size=2)
+    reporting.offline_run = None
+
+    # act
+    reporting.report_metric("FOO", 1, report_to_parent=True)
+    reporting.report_metric("FOO", 2, report_to_parent=True)
+
+    # assert
+    assert reporting.run.log.call_count == 0
+    reporting.run.log_list.assert_called_once_with("FOO", [1, 2])
+    reporting.run.parent.log_list.assert_called_once_with("FOO", [1, 2])
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_flush_uploads_batched_rows_as_table(mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular(batch_size=100)
+    reporting.report_row("FOO", x=1, y=2)
+    reporting.report_row("FOO", x=3, y=4)
+
+    # act
+    reporting.flush()
+
+    # assert
+    assert reporting.run.log_row.call_count == 0
+    reporting.run.log_table.assert_called_once_with("FOO", {"x": [1, 3], "y": [2, 4]})
+
+
+# Tests export settings
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_reporting_initialization_passes_export_settings_to_exporter(mock_exporter, mock_run, mock_env):
+    # act
+    Condensed_Binocular(export_interval=30, export_batch_size=50, export_retry_interval=5, export_local_storage=True)
+
+    # assert
+    options = mock_exporter.new_metrics_exporter.call_args[1]
+    assert options["export_interval"] == 30
+    assert options["max_batch_size"] == 50
+    assert options["minimum_retry_interval"] == 5
+    assert options["enable_local_storage"] is True
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_reporting_initialization_keeps_failed_exports_on_local_storage_by_default(mock_exporter, mock_run, mock_env):
+    # arrange
+    mock_env.return_value.bool.side_effect = lambda name, default: default
+
+    # act
+    Condensed_Binocular()
+
+    # assert
+    assert mock_exporter.new_metrics_exporter.call_args[1]["enable_local_storage"] is True
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_reporting_initialization_reads_export_interval_from_environment(mock_exporter, mock_run, mock_env):
+    # arrange
+    mock_env().float.return_value = 42.0
+
+    # act
+    reporting = Condensed_Binocular()
+
+    # assert
+    mock_env().float.assert_any_call("APP_INSIGHTS_EXPORT_INTERVAL", 15.0)
+    assert mock_exporter.new_metrics_exporter.call_args[1]["export_interval"] == 42.0
+    assert reporting.summary_interval == 42.0
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.stats_module")
+def test_flush_exports_recorded_metrics(mock_stats, mock_exporter, mock_run, mock_env):
+    # arrange
+    reporting = Condensed_Binocular(export_interval=60)
+
+    # act
+    reporting.flush()
+
+    # assert
+    reporting.exporter.export_metrics.assert_called_once_with(mock_stats.stats.get_metrics())
+
+
+# Tests spool
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_report_metric_appends_to_spool_if_spool_path_is_set(mock_exporter, mock_run, mock_env, tmp_path):
+    # arrange
+    path = str(tmp_path / "spool.jsonl")
+    reporting = Condensed_Binocular(spool_path=path)
+
+    # act
+    reporting.report_metric("FOO", 1)
+    reporting.report_table("BAR", {"x": [1]})
+    reporting.close()
+
+    # assert
+    assert [method for method, kwargs in Metric_Spool.read(path)] == ["report_metric", "report_table"]
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.Condensed_Binocular.record_app_insights")
+def test_report_metric_keeps_reporting_to_app_insights_if_aml_fails_and_spool_is_set(mock_record, mock_exporter, mock_run,
+                                                                                     mock_env, tmp_path):
+    # arrange
+    reporting = Condensed_Binocular(spool_path=str(tmp_path / "spool.jsonl"), retry_attempts=1)
+    reporting.run.log.side_effect = ConnectionError("FOO")
+
+    # act
+    reporting.report_metric("FOO", 1)
+
+    # assert
+    mock_record.assert_called_once_with("FOO", 1, "", None)
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.Condensed_Binocular.record_app_insights")
+def test_spool_replay_reports_to_aml_only_if_app_insights_metrics_is_empty(mock_record, mock_exporter, mock_run,
+                                                                           mock_env, tmp_path):
+    # arrange
+    path = str(tmp_path / "spool.jsonl")
+    spool = Metric_Spool(path)
+    spool.append("report_metric", name="FOO", value=1, description="", report_to_parent=False, tags=None)
+    spool.append("report_metric_with_run_tagging", name="BAR", value=2, description="")
+    spool.close()
+    reporting = Condensed_Binocular(app_insights_metrics=(), summary_interval=60)
+    reporting.offline_run = None
+
+    # act
+    Metric_Spool.replay(path, reporting)
+
+    # assert
+    assert mock_record.call_count == 0
+    assert [call[0][:2] for call in reporting.run.log.call_args_list][:2] == [("FOO", 1), ("BAR", 2)]
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.Condensed_Binocular.record_app_insights")
+def test_report_step_spools_its_tags(mock_record, mock_exporter, mock_run, mock_env, tmp_path):
+    # arrange
+    path = str(tmp_path / "spool.jsonl")
+    reporting = Condensed_Binocular(spool_path=path, summary_interval=60)
+
+    # act
+    reporting.report_step("loss", 0.5, 3, tags={"shard": "1"})
+    reporting.close()
+
+    # assert
+    assert list(Metric_Spool.read(path))[0] == ("report_step", {"name": "loss", "value": 0.5, "step": 3,
+                                                                "description": "", "report_to_parent": False,
+                                                                "tags": {"shard": "1"}})
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_report_row_with_method_column_is_spooled_and_replayed(mock_exporter, mock_run, mock_env, tmp_path):
+    # arrange
+    path = str(tmp_path / "spool.jsonl")
+    reporting = Condensed_Binocular(spool_path=path)
+
+    # act
+    reporting.report_row("hp", method="sgd", lr=0.1)
+    reporting.close()
+    replaying = Condensed_Binocular(app_insights_metrics=(), summary_interval=60)
+    Metric_Spool.replay(path, replaying)
+
+    # assert
+    assert list(Metric_Spool.read(path)) == [
+        ("report_row", {"name": "hp", "report_to_parent": False, "method": "sgd", "lr": 0.1})]
+    replaying.run.log_row.assert_called_with("hp", method="sgd", lr=0.1)
+
+
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.metrics_exporter")
+def test_reporting_initialization_uses_given_run(mock_exporter, mock_env):
+    # arrange
+    run = MagicMock()
+
+    # act
+    reporting = Condensed_Binocular(run=run)
+
+    # assert
+    assert reporting.run is run
+
+
 # Tests get_run_id method
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.constants")
-@patch("src.Condensed_Binocular.metrics_exporter")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.constants")
+@patch("src.condensed_binocular.metrics_exporter")
 def test_get_run_id_returns_run_id_when_context_online(mock_exporter, mock_constants, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -492,10 +1790,10 @@ def test_get_run_id_returns_run_id_when_context_online(mock_exporter, mock_const
     assert response == "Online"
 
 
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.constants")
-@patch("src.Condensed_Binocular.metrics_exporter")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.constants")
+@patch("src.condensed_binocular.metrics_exporter")
 def test_get_run_id_returns_unique_id_when_context_offline(mock_exporter, mock_constants, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -509,11 +1807,11 @@ def test_get_run_id_returns_unique_id_when_context_offline(mock_exporter, mock_c
 
 
 # Tests set_view method
-@patch("src.Condensed_Binocular.Env")
-@patch("src.Condensed_Binocular.Run")
-@patch("src.Condensed_Binocular.metrics_exporter")
-@patch("src.Condensed_Binocular.measure_module")
-@patch("src.Condensed_Binocular.stats_module")
+@patch("src.condensed_binocular.Env")
+@patch("src.condensed_binocular.Run")
+@patch("src.condensed_binocular.metrics_exporter")
+@patch("src.condensed_binocular.measure_module")
+@patch("src.condensed_binocular.stats_module")
 def test_set_view_calls_register_view(mock_stats, mock_measuremodule, mock_exporter, mock_run, mock_env):
     # arrange
     reporting = Condensed_Binocular()
@@ -0,0 +1,114 @@
+import threading
+import pytest
+from mock import MagicMock
+from src.dispatcher import Background_Dispatcher
+
+
+# Tests submit method
+def test_submit_runs_calls_in_order():
+    # arrange
+    dispatcher = Background_Dispatcher()
+    calls = []
+
+    # act
+    for value in range(100):
+        dispatcher.submit(calls.append, value)
+    dispatcher.flush()
+
+    # assert
+    assert calls == list(range(100))
+    dispatcher.close()
+
+
+def test_submit_passes_keyword_arguments():
+    # arrange
+    dispatcher = Background_Dispatcher()
+    function = MagicMock()
+
+    # act
+    dispatcher.submit(function, "FOO", x=1)
+    dispatcher.flush()
+
+    # assert
+    function.assert_called_once_with("FOO", x=1)
+    dispatcher.close()
+
+
+def test_submit_drops_newest_call_if_queue_is_full():
+    # arrange
+    release = threading.Event()
+    dispatcher = Background_Dispatcher(queue_size=1, backpressure="drop_newest")
+    calls = []
+    dispatcher.submit(release.wait)
+
+    # act
+    while not dispatcher.queue.empty():
+        pass
+    dispatcher.submit(calls.append, 1)
+    accepted = dispatcher.submit(calls.append, 2)
+    release.set()
+    dispatcher.close()
+
+    # assert
+    assert accepted is False
+    assert calls == [1]
+    assert dispatcher.dropped == 1
+
+
+def test_submit_drops_oldest_call_if_queue_is_full():
+    # arrange
+    release = threading.Event()
+    dispatcher = Background_Dispatcher(queue_size=1, backpressure="drop_oldest")
+    calls = []
+    dispatcher.submit(release.wait)
+
+    # act
+    while not dispatcher.queue.empty():
+        pass
+    dispatcher.submit(calls.append, 1)
+    accepted = dispatcher.submit(calls.append, 2)
+    release.set()
+    dispatcher.close()
+
+    # assert
+    assert accepted is True
+    assert calls == [2]
+    assert dispatcher.dropped == 1
+
+
+def test_submit_logs_and_continues_when_call_fails():
+    # arrange
+    dispatcher = Background_Dispatcher()
+    function = MagicMock()
+
+    # act
+    dispatcher.submit(MagicMock(side_effect=ValueError("FOO")))
+    dispatcher.submit(function)
+    dispatcher.flush()
+
+    # assert
+    assert function.call_count == 1
+    dispatcher.close()
+
+
+def test_init_raises_for_unknown_backpressure():
+    # act & assert
+    with pytest.raises(ValueError):
+        Background_Dispatcher(backpressure="FOO")
+
+
+# Tests close method
+def test_close_runs_pending_calls_and_rejects_new_ones():
+    # arrange
+    dispatcher = Background_Dispatcher()
+    function = MagicMock()
+    dispatcher.submit(function)
+
+    # act
+    dispatcher.close()
+
+    # assert
+    assert function.call_count == 1
+    assert not dispatcher.worker.is_alive()
+    with pytest.raises(RuntimeError):
+        dispatcher.submit(function)
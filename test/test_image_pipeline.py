@@ -0,0 +1,189 @@
+import os
+import pytest
+from mock import MagicMock
+from src.image_pipeline import Image_Pipeline
+
+
+def record_upload(uploads):
+    def upload(name, path):
+        with open(path, "rb") as file:
+            uploads.append((name, file.read()))
+        return True
+    return upload
+
+
+# Tests submit method
+def test_submit_uploads_encoded_bytes_as_they_are():
+    # arrange
+    uploads = []
+    pipeline = Image_Pipeline(record_upload(uploads), background=False)
+
+    # act
+    pipeline.submit("FOO", image=b"\x89PNG")
+
+    # assert
+    assert uploads == [("FOO", b"\x89PNG")]
+    pipeline.close()
+
+
+def test_submit_uploads_encoded_bytes_with_the_extension_of_their_format():
+    # arrange
+    paths = []
+    pipeline = Image_Pipeline(lambda name, path: paths.append(path) or True, background=False)
+
+    # act
+    pipeline.submit("PNG", image=b"\x89PNG\r\n\x1a\n")
+    pipeline.submit("JPEG", image=b"\xff\xd8\xff\xe0")
+    pipeline.submit("WEBP", image=b"RIFF\x00\x00\x00\x00WEBPVP8 ")
+    pipeline.submit("OTHER", image=b"1")
+
+    # assert
+    assert [os.path.splitext(path)[1] for path in paths] == [".png", ".jpg", ".webp", ".png"]
+    pipeline.close()
+
+
+def test_submit_skips_unchanged_images_of_the_same_name():
+    # arrange
+    uploads = []
+    pipeline = Image_Pipeline(record_upload(uploads), background=False)
+
+    # act
+    pipeline.submit("FOO", image=b"1")
+    pipeline.submit("FOO", image=b"1")
+    pipeline.submit("BAR", image=b"1")
+    pipeline.submit("FOO", image=b"2")
+
+    # assert
+    assert [upload[0] for upload in uploads] == ["FOO", "BAR", "FOO"]
+    pipeline.close()
+
+
+def test_submit_removes_the_temporary_file_after_upload():
+    # arrange
+    paths = []
+    pipeline = Image_Pipeline(lambda name, path: paths.append(path) or True, background=False)
+
+    # act
+    pipeline.submit("FOO", image=b"1")
+
+    # assert
+    assert not os.path.exists(paths[0])
+    pipeline.close()
+    assert not os.path.exists(pipeline.directory)
+
+
+def test_submit_keeps_the_temporary_file_until_close_if_upload_is_kept_for_later():
+    # arrange
+    paths = []
+
+    def keep_upload(name, path):
+        paths.append(path)
+        return False
+    pipeline = Image_Pipeline(keep_upload, background=False)
+
+    # act
+    pipeline.submit("FOO", image=b"1")
+
+    # assert
+    assert os.path.exists(paths[0])
+    pipeline.close()
+    assert not os.path.exists(paths[0])
+
+
+def test_submit_removes_the_temporary_file_and_uploads_again_if_upload_failed_for_good():
+    # arrange
+    paths = []
+
+    def fail_upload(name, path):
+        paths.append(path)
+        return None
+    pipeline = Image_Pipeline(fail_upload, background=False)
+
+    # act
+    pipeline.submit("FOO", image=b"1")
+    pipeline.submit("FOO", image=b"1")
+
+    # assert
+    assert len(paths) == 2
+    assert not any(os.path.exists(path) for path in paths)
+    pipeline.close()
+
+
+def test_submit_downsamples_arrays_to_max_pixels():
+    # arrange
+    numpy = pytest.importorskip("numpy")
+    pytest.importorskip("matplotlib")
+    from matplotlib import image as image_module
+    uploads = []
+    pipeline = Image_Pipeline(record_upload(uploads), background=False, max_pixels=100)
+
+    # act
+    pipeline.submit("FOO", image=numpy.zeros((40, 40)))
+
+    # assert
+    import io
+    assert image_module.imread(io.BytesIO(uploads[0][1])).shape[:2] == (10, 10)
+    pipeline.close()
+
+
+def test_submit_copies_arrays_before_returning():
+    # arrange
+    numpy = pytest.importorskip("numpy")
+    pipeline = Image_Pipeline(MagicMock(), background=False)
+    pipeline.process = MagicMock()
+    array = numpy.zeros((2, 2))
+
+    # act
+    pipeline.submit("FOO", image=array)
+    array[0, 0] = 1
+
+    # assert
+    assert pipeline.process.call_args[0][2][0, 0] == 0
+    pipeline.close()
+
+
+def test_submit_renders_a_snapshot_of_the_figure_in_the_background():
+    # arrange
+    pytest.importorskip("matplotlib")
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib import pyplot
+    uploads = []
+    pipeline = Image_Pipeline(record_upload(uploads), max_pixels=10000)
+    figure = pyplot.figure(figsize=(4, 4))
+    figure.gca().plot([1, 2, 3])
+
+    # act
+    pipeline.submit("FOO", plot=figure)
+    figure.gca().plot([3, 2, 1])
+    pipeline.submit("FOO", plot=figure)
+    pipeline.flush()
+
+    # assert
+    from matplotlib import image as image_module
+    import io
+    assert len(uploads) == 2
+    assert image_module.imread(io.BytesIO(uploads[0][1])).shape[:2] == (100, 100)
+    assert pyplot.get_fignums() == [figure.number]
+    pipeline.close()
+    pyplot.close(figure)
+
+
+def test_submit_encodes_jpeg_with_quality():
+    # arrange
+    numpy = pytest.importorskip("numpy")
+    pytest.importorskip("PIL")
+    uploads = []
+    low = Image_Pipeline(record_upload(uploads), background=False, image_format="jpeg", quality=5)
+    high = Image_Pipeline(record_upload(uploads), background=False, image_format="jpeg", quality=95)
+    image = numpy.random.default_rng(0).random((64, 64, 3))
+
+    # act
+    low.submit("FOO", image=image)
+    high.submit("FOO", image=image)
+
+    # assert
+    assert uploads[0][1][:2] == b"\xff\xd8"
+    assert len(uploads[0][1]) < len(uploads[1][1])
+    low.close()
+    high.close()
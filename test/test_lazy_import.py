@@ -0,0 +1,28 @@
+import sys
+from src.lazy_import import Lazy_Import
+
+
+# Tests Lazy_Import
+def test_lazy_import_does_not_import_until_first_use():
+    # arrange
+    sys.modules.pop("colorsys", None)
+
+    # act
+    colorsys = Lazy_Import("colorsys")
+
+    # assert
+    assert "colorsys" not in sys.modules
+    assert colorsys.rgb_to_hsv(0, 0, 0) == (0, 0, 0)
+    assert "colorsys" in sys.modules
+
+
+def test_lazy_import_forwards_calls_to_attribute():
+    # arrange
+    ordered_dict = Lazy_Import("collections", "OrderedDict")
+
+    # act
+    response = ordered_dict(a=1)
+
+    # assert
+    assert response == {"a": 1}
+    assert ordered_dict.fromkeys(["b"]) == {"b": None}
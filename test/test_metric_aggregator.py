@@ -0,0 +1,106 @@
+import threading
+import pytest
+from mock import MagicMock, call
+from src.metric_aggregator import Metric_Aggregator, Worker_Reporter
+
+
+# Tests serve method
+def test_serve_reduces_values_of_same_step_across_workers():
+    # arrange
+    aggregator = Metric_Aggregator(reduction="mean", world_size=2)
+    reporter = MagicMock()
+    for rank, value in [(0, 1.0), (1, 3.0)]:
+        worker = aggregator.client(rank)
+        worker.report_metric("FOO", value)
+        worker.report_metric("FOO", value * 10, step=7)
+    aggregator.queue.put(None)
+
+    # act
+    aggregator.serve(reporter)
+
+    # assert
+    reporter.report_metric.assert_called_once_with("FOO", 2.0, "", False)
+    reporter.report_metrics.assert_called_once_with({"FOO": 20.0}, "", 7, False)
+
+
+def test_serve_waits_for_every_rank_before_reducing_a_step():
+    # arrange
+    aggregator = Metric_Aggregator(reduction="sum", world_size=2, flush_interval=60)
+    reporter = MagicMock()
+    first, second = aggregator.client(0), aggregator.client(1)
+    first.report_metric("FOO", 1.0, step=7)
+    first.report_metric("FOO", 2.0, step=7)
+    groups = {}
+
+    # act
+    for _ in range(2):
+        aggregator.handle(reporter, groups, aggregator.queue.get(timeout=5))
+    reporter_called_early = reporter.report_metrics.called
+    second.report_metric("FOO", 4.0, step=7)
+    aggregator.handle(reporter, groups, aggregator.queue.get(timeout=5))
+
+    # assert
+    assert not reporter_called_early
+    reporter.report_metrics.assert_called_once_with({"FOO": 7.0}, "", 7, False)
+
+
+def test_serve_reports_every_value_without_reduction():
+    # arrange
+    aggregator = Metric_Aggregator()
+    reporter = MagicMock()
+    aggregator.client(0).report_metric("FOO", 1)
+    aggregator.client(1).report_metric("FOO", 2)
+    aggregator.client(1).report_row("BAR", x=1)
+    aggregator.queue.put(None)
+
+    # act
+    aggregator.serve(reporter)
+
+    # assert
+    assert reporter.report_metric.call_args_list == [call("FOO", 1, "", False), call("FOO", 2, "", False)]
+    reporter.report_row.assert_called_once_with("BAR", False, x=1)
+
+
+def test_serve_reduces_incomplete_step_when_closed():
+    # arrange
+    aggregator = Metric_Aggregator(reduction="max", world_size=3)
+    reporter = MagicMock()
+    aggregator.client(0).report_metric("FOO", 1)
+    aggregator.client(1).report_metric("FOO", 5)
+    aggregator.queue.put(None)
+
+    # act
+    aggregator.serve(reporter)
+
+    # assert
+    reporter.report_metric.assert_called_once_with("FOO", 5, "", False)
+
+
+def test_serve_receives_metrics_from_connected_workers():
+    # arrange
+    address, authkey = ("localhost", 0), b"FOO"
+    from multiprocessing import connection
+    listener = connection.Listener(address, authkey=authkey)
+    aggregator = Metric_Aggregator(reduction="sum", world_size=2)
+    threading.Thread(target=aggregator.accept, args=(listener,), daemon=True).start()
+    reporter = MagicMock()
+
+    # act
+    workers = [Worker_Reporter.connect(listener.address, authkey, rank) for rank in range(2)]
+    for worker in workers:
+        worker.report_metric("FOO", 2)
+    serving = threading.Thread(target=aggregator.serve, args=(reporter,))
+    serving.start()
+    while reporter.report_metric.call_count == 0:
+        pass
+    aggregator.queue.put(None)
+    serving.join()
+
+    # assert
+    reporter.report_metric.assert_called_once_with("FOO", 4, "", False)
+
+
+def test_init_raises_for_unknown_reduction():
+    # act & assert
+    with pytest.raises(ValueError):
+        Metric_Aggregator(reduction="FOO")
@@ -0,0 +1,118 @@
+from mock import MagicMock, patch
+from src.metric_batcher import Metric_Batcher
+
+
+def send(log_method, name, value):
+    log_method(name, value)
+
+
+# Tests add_value method
+def test_add_value_uploads_list_when_batch_is_full():
+    # arrange
+    batcher = Metric_Batcher(send, batch_size=3, batch_interval=60)
+    run = MagicMock()
+
+    # act
+    for value in [1, 2, 3, 4]:
+        batcher.add_value(run, "FOO", value)
+
+    # assert
+    run.log_list.assert_called_once_with("FOO", [1, 2, 3])
+
+
+def test_add_value_keeps_separate_batches_per_run_and_name():
+    # arrange
+    batcher = Metric_Batcher(send, batch_size=2, batch_interval=60)
+    run = MagicMock()
+    parent = MagicMock()
+
+    # act
+    batcher.add_value(run, "FOO", 1)
+    batcher.add_value(parent, "FOO", 1)
+    batcher.add_value(run, "BAR", 2)
+    batcher.add_value(run, "FOO", 3)
+
+    # assert
+    run.log_list.assert_called_once_with("FOO", [1, 3])
+    assert parent.log_list.call_count == 0
+
+
+def test_add_value_packs_float_values_and_keeps_other_values_unchanged():
+    # arrange
+    batcher = Metric_Batcher(send, batch_size=3, batch_interval=60)
+    run = MagicMock()
+
+    # act
+    for value in [0.5, 0.25, 0.125, 0.5, 2, "NaN"]:
+        batcher.add_value(run, "FOO", value)
+
+    # assert
+    assert run.log_list.call_args_list[0][0] == ("FOO", [0.5, 0.25, 0.125])
+    assert run.log_list.call_args_list[1][0] == ("FOO", [0.5, 2, "NaN"])
+    assert type(run.log_list.call_args_list[1][0][1][1]) is int
+
+
+@patch("src.metric_batcher.time")
+def test_add_value_uploads_batches_older_than_batch_interval(mock_time):
+    # arrange
+    mock_time.monotonic.return_value = 0
+    batcher = Metric_Batcher(send, batch_size=100, batch_interval=10)
+    run = MagicMock()
+    batcher.add_value(run, "FOO", 1)
+
+    # act
+    mock_time.monotonic.return_value = 11
+    batcher.add_value(run, "BAR", 2)
+
+    # assert
+    run.log_list.assert_called_once_with("FOO", [1])
+
+
+# Tests sweep method
+@patch("src.metric_batcher.time")
+def test_sweep_uploads_only_batches_older_than_batch_interval(mock_time):
+    # arrange
+    mock_time.monotonic.return_value = 0
+    batcher = Metric_Batcher(send, batch_size=100, batch_interval=10)
+    run = MagicMock()
+    batcher.add_value(run, "FOO", 1)
+    mock_time.monotonic.return_value = 5
+    batcher.add_value(run, "BAR", 2)
+
+    # act
+    batcher.sweep(now=11)
+
+    # assert
+    run.log_list.assert_called_once_with("FOO", [1])
+    assert batcher.pending() == 1
+
+
+# Tests add_row method
+def test_add_row_uploads_columns_as_table():
+    # arrange
+    batcher = Metric_Batcher(send, batch_size=2, batch_interval=60)
+    run = MagicMock()
+
+    # act
+    batcher.add_row(run, "FOO", {"x": 1, "y": 0.5})
+    batcher.add_row(run, "FOO", {"x": 2, "y": 0.7})
+
+    # assert
+    run.log_table.assert_called_once_with("FOO", {"x": [1, 2], "y": [0.5, 0.7]})
+
+
+# Tests flush method
+def test_flush_uploads_all_buffered_values():
+    # arrange
+    batcher = Metric_Batcher(send, batch_size=100, batch_interval=60)
+    run = MagicMock()
+    batcher.add_value(run, "FOO", 1)
+    batcher.add_row(run, "BAR", {"x": 1})
+
+    # act
+    batcher.flush()
+    batcher.flush()
+
+    # assert
+    run.log_list.assert_called_once_with("FOO", [1])
+    run.log_table.assert_called_once_with("BAR", {"x": [1]})
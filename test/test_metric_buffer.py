@@ -0,0 +1,56 @@
+from src.metric_buffer import Point_Buffer
+
+
+# Tests Point_Buffer class
+def test_append_keeps_points_in_order_with_missing_steps_and_tags():
+    # arrange
+    points = Point_Buffer()
+
+    # act
+    points.append("loss", 0.5, 10.0, step=1)
+    points.append("accuracy", 0.9, 11.0, tags={"shard": "1"})
+
+    # assert
+    assert list(points) == [(10.0, "loss", 0.5, 1, None), (11.0, "accuracy", 0.9, None, {"shard": "1"})]
+    assert len(points) == 2
+
+
+def test_append_overwrites_oldest_points_past_capacity():
+    # arrange
+    points = Point_Buffer(capacity=3)
+
+    # act
+    for step in range(5):
+        points.append("loss", float(step), 0.0, step=step, tags={"step": str(step)} if step == 1 else None)
+
+    # assert
+    assert [(value, step, tags) for _, _, value, step, tags in points] == [(2.0, 2, None), (3.0, 3, None),
+                                                                          (4.0, 4, None)]
+    assert points.tags == {}
+
+
+def test_append_interns_the_names():
+    # arrange
+    points = Point_Buffer()
+    name = "".join(["lo", "ss"])
+
+    # act
+    points.append(name, 0.5, 0.0)
+    points.append("loss", 0.4, 0.0)
+
+    # assert
+    assert points.names[0] is points.names[1]
+
+
+def test_nbytes_stays_under_40_bytes_per_point():
+    # arrange
+    points = Point_Buffer()
+
+    # act
+    for index in range(10000):
+        points.append("loss", index * 0.5, 1.0, step=index)
+
+    # assert
+    assert points.nbytes() < 40 * 10000
+    points.clear()
+    assert len(points) == 0
@@ -0,0 +1,83 @@
+import pytest
+from src.metric_dimensions import Metric_Dimensions
+
+
+# Tests get_tag_map method
+def test_get_tag_map_caches_tag_maps_per_combination():
+    # arrange
+    pytest.importorskip("opencensus")
+    dimensions = Metric_Dimensions(("model_version", "region"))
+
+    # act
+    first = dimensions.get_tag_map({"model_version": "3", "region": "westeurope"})
+    second = dimensions.get_tag_map({"region": "westeurope", "model_version": "3", "ignored": "x"})
+    third = dimensions.get_tag_map({"model_version": "4"})
+
+    # assert
+    assert first is second
+    assert dict(first) == {"model_version": "3", "region": "westeurope"}
+    assert dict(third) == {"model_version": "4"}
+    assert dimensions.cardinality == 2
+
+
+def test_get_tag_map_folds_combinations_above_max_cardinality_into_other():
+    # arrange
+    pytest.importorskip("opencensus")
+    dimensions = Metric_Dimensions(("shard",), max_cardinality=2)
+
+    # act
+    tag_maps = [dimensions.get_tag_map({"shard": index}) for index in range(5)]
+
+    # assert
+    assert dict(tag_maps[1]) == {"shard": "1"}
+    assert dict(tag_maps[2]) == {"shard": "other"}
+    assert tag_maps[2] is tag_maps[4]
+    assert dimensions.cardinality == 2
+    assert dimensions.folded == 3
+    assert dimensions.get_tag_map({"shard": 0}) is tag_maps[0]
+
+
+def test_get_tag_map_keeps_pinned_values_when_folding_into_other():
+    # arrange
+    pytest.importorskip("opencensus")
+    dimensions = Metric_Dimensions(("shard",), max_cardinality=1, pinned_keys=("Correlation_id",))
+
+    # act
+    first = dimensions.get_tag_map({"Correlation_id": "A", "shard": 0})
+    second = dimensions.get_tag_map({"Correlation_id": "B", "shard": 0})
+    folded = dimensions.get_tag_map({"Correlation_id": "B", "shard": 1})
+
+    # assert
+    assert dimensions.tag_keys == ("Correlation_id", "shard")
+    assert dict(first) == {"Correlation_id": "A", "shard": "0"}
+    assert dict(second) == {"Correlation_id": "B", "shard": "0"}
+    assert dict(folded) == {"Correlation_id": "B", "shard": "other"}
+    assert dimensions.cardinality == 1
+
+
+def test_get_tag_map_truncates_long_values():
+    # arrange
+    pytest.importorskip("opencensus")
+    dimensions = Metric_Dimensions(("model_version",))
+
+    # act
+    tag_map = dimensions.get_tag_map({"model_version": "x" * 300})
+
+    # assert
+    assert len(dict(tag_map)["model_version"]) == 255
+
+
+# Tests forget method
+def test_forget_drops_tag_maps_of_pinned_values():
+    # arrange
+    pytest.importorskip("opencensus")
+    dimensions = Metric_Dimensions(("shard",), pinned_keys=("Correlation_id",))
+    first = dimensions.get_tag_map({"Correlation_id": "A", "shard": 0})
+    second = dimensions.get_tag_map({"Correlation_id": "B", "shard": 0})
+
+    # act
+    dimensions.forget(("A",))
+
+    # assert
+    assert dimensions.get_tag_map({"Correlation_id": "A", "shard": 0}) is not first
+    assert dimensions.get_tag_map({"Correlation_id": "B", "shard": 0}) is second
@@ -0,0 +1,64 @@
+import pytest
+from src.metric_limiter import Metric_Limiter
+
+
+# Tests offer method
+def test_offer_drops_values_above_rate_limit():
+    # arrange
+    limiter = Metric_Limiter(rate_limit=10, burst=2)
+
+    # act
+    accepted = [limiter.offer("FOO", value, now=0) for value in range(5)]
+    accepted_later = limiter.offer("FOO", 5, now=0.1)
+
+    # assert
+    assert accepted == [True, True, False, False, False]
+    assert accepted_later is True
+
+
+def test_offer_keeps_every_nth_value():
+    # arrange
+    limiter = Metric_Limiter(sample_every=3)
+
+    # act
+    accepted = [limiter.offer("FOO", value, now=0) for value in range(7)]
+
+    # assert
+    assert accepted == [True, False, False, True, False, False, True]
+
+
+def test_offer_holds_values_in_reservoir_until_end_of_window():
+    # arrange
+    limiter = Metric_Limiter(reservoir_size=3)
+
+    # act
+    accepted = [limiter.offer("FOO", value, now=0, context="BAR") for value in range(100)]
+    results = limiter.end_window(now=60)
+
+    # assert
+    assert not any(accepted)
+    name, context, reservoir, dropped, sampled_out = results[0]
+    assert (name, context, dropped, sampled_out) == ("FOO", "BAR", 0, 97)
+    assert len(reservoir) == 3 and set(reservoir) <= set(range(100))
+
+
+# Tests end_window method
+def test_end_window_returns_counts_and_resets_them():
+    # arrange
+    limiter = Metric_Limiter(rate_limit=1, sample_every=2)
+    for _ in range(4):
+        limiter.offer("FOO", 1, now=0)
+
+    # act
+    first = limiter.end_window(now=60)
+    second = limiter.end_window(now=120)
+
+    # assert
+    assert first == [("FOO", None, [], 3, 0)]
+    assert second == []
+
+
+def test_init_raises_for_both_sampling_modes():
+    # act & assert
+    with pytest.raises(ValueError):
+        Metric_Limiter(sample_every=2, reservoir_size=10)
@@ -0,0 +1,311 @@
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from mock import MagicMock
+from src.reporter_stats import Reporter_Stats
+from src.metric_retry import Circuit_Breaker, Destination_Guard, is_retryable, retry_after_of
+
+
+class Http_Error(Exception):
+    def __init__(self, status, headers=None):
+        super().__init__(status)
+        self.response = MagicMock(status_code=status, headers=headers or {})
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def failing(*errors):
+    """A function raising the given errors on its first calls, and succeeding afterwards."""
+    function = MagicMock(side_effect=list(errors) + [None] * 10)
+    return function
+
+
+# Tests helper functions
+def test_retry_after_of_reads_seconds_and_dates():
+    # act / assert
+    assert retry_after_of(Http_Error(429, {"Retry-After": "3"})) == 3.0
+    assert retry_after_of(Http_Error(429, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+    assert retry_after_of(Http_Error(429)) is None
+    assert retry_after_of(ValueError("FOO")) is None
+
+
+def test_is_retryable_accepts_connection_errors_and_transient_statuses_only():
+    # act / assert
+    assert is_retryable(ConnectionError("FOO"))
+    assert is_retryable(Http_Error(503))
+    assert not is_retryable(Http_Error(400))
+    assert not is_retryable(ValueError("FOO"))
+
+
+# Tests Circuit_Breaker class
+def test_circuit_breaker_opens_after_threshold_and_lets_one_trial_call_through_after_timeout():
+    # arrange
+    clock = Clock()
+    breaker = Circuit_Breaker(failure_threshold=2, reset_timeout=10, clock=clock)
+
+    # act
+    breaker.record_failure()
+    allowed_after_one = breaker.allow()
+    breaker.record_failure()
+    allowed_when_open = breaker.allow()
+    clock.now = 10
+    allowed_after_timeout = [breaker.allow(), breaker.allow()]
+    breaker.record_success()
+
+    # assert
+    assert allowed_after_one and not allowed_when_open
+    assert allowed_after_timeout == [True, False]
+    assert breaker.state == "closed"
+
+
+# Tests Destination_Guard class
+def test_call_retries_transient_failures_with_growing_backoff():
+    # arrange
+    sleep = MagicMock()
+    guard = Destination_Guard("aml", attempts=3, base_delay=1, max_delay=10, sleep=sleep)
+    function = failing(ConnectionError("FOO"), Http_Error(503))
+
+    # act
+    succeeded = guard.call(function, "loss", 0.5)
+
+    # assert
+    assert succeeded
+    assert function.call_count == 3
+    function.assert_called_with("loss", 0.5)
+    delays = [call[0][0] for call in sleep.call_args_list]
+    assert 0 <= delays[0] <= 1 and 0 <= delays[1] <= 2
+    assert guard.retries == 2
+
+
+def test_call_waits_as_long_as_a_throttling_response_asks():
+    # arrange
+    sleep = MagicMock()
+    guard = Destination_Guard("aml", base_delay=0.1, max_delay=10, sleep=sleep)
+
+    # act
+    guard.call(failing(Http_Error(429, {"Retry-After": "4"})))
+
+    # assert
+    assert 4 <= sleep.call_args[0][0] <= 4.1
+
+
+def test_call_opens_circuit_if_throttling_response_asks_to_wait_longer_than_max_delay():
+    # arrange
+    clock = Clock()
+    sleep = MagicMock()
+    guard = Destination_Guard("aml", max_delay=10, reset_timeout=5, sleep=sleep, clock=clock)
+    function = failing(Http_Error(429, {"Retry-After": "120"}))
+
+    # act
+    guard.call(function)
+    clock.now = 60
+    guard.call(function)
+
+    # assert
+    sleep.assert_not_called()
+    assert function.call_count == 1
+    assert guard.breaker.state == "open"
+    assert len(guard.shed) == 2
+
+
+def test_call_does_not_retry_or_keep_other_errors():
+    # arrange
+    guard = Destination_Guard("aml", sleep=MagicMock())
+    function = failing(ValueError("FOO"))
+
+    # act
+    succeeded = guard.call(function)
+
+    # assert
+    assert not succeeded
+    assert function.call_count == 1
+    assert not guard.shed
+    assert guard.breaker.state == "closed"
+
+
+def test_call_keeps_calls_while_open_and_replays_them_in_order_once_back():
+    # arrange
+    clock = Clock()
+    guard = Destination_Guard("aml", attempts=1, failure_threshold=2, reset_timeout=30, sleep=MagicMock(),
+                              clock=clock)
+    made = []
+    healthy = {"value": False}
+
+    def log(name, value):
+        if not healthy["value"]:
+            raise ConnectionError("FOO")
+        made.append(value)
+
+    # act
+    for value in range(4):
+        guard.call(log, "loss", value)
+    calls_while_open = len(guard.shed)
+    healthy["value"] = True
+    clock.now = 30
+    guard.call(log, "loss", 4)
+
+    # assert
+    assert calls_while_open == 4
+    assert made == [0, 1, 2, 3, 4]
+    assert guard.stats() == {"state": "closed", "retries": 0, "shed": 0, "lost": 0}
+
+
+def test_call_waits_behind_kept_calls_if_replay_stops():
+    # arrange
+    clock = Clock()
+    guard = Destination_Guard("aml", attempts=1, failure_threshold=1, reset_timeout=30, sleep=MagicMock(),
+                              clock=clock)
+    made = []
+    failures = {"value": 2}
+
+    def log(name, value):
+        if failures["value"]:
+            failures["value"] -= 1
+            raise ConnectionError("FOO")
+        made.append(value)
+
+    guard.call(log, "loss", 0)
+    clock.now = 30
+
+    # act
+    succeeded = guard.call(log, "loss", 1)
+    clock.now = 60
+    guard.call(log, "loss", 2)
+
+    # assert
+    assert succeeded is False
+    assert made == [0, 1, 2]
+    assert not guard.shed
+
+
+def test_keep_drops_oldest_calls_past_shed_capacity():
+    # arrange
+    guard = Destination_Guard("aml", attempts=1, failure_threshold=1, shed_capacity=2, sleep=MagicMock())
+    function = MagicMock(side_effect=ConnectionError("FOO"))
+
+    # act
+    for value in range(4):
+        guard.call(function, value)
+
+    # assert
+    assert [args for _, args, _ in guard.shed] == [(2,), (3,)]
+    assert guard.lost == 2
+
+
+# Fault injection against a local ingestion endpoint
+class Faulty_Ingestion_Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        received = len(json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0)))))
+        self.server.requests += 1
+        if self.server.failures > 0:
+            self.server.failures -= 1
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.server.envelopes += received
+        body = json.dumps({"itemsReceived": received, "itemsAccepted": received, "errors": []}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def ingestion():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Faulty_Ingestion_Handler)
+    server.requests = server.envelopes = server.failures = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def exporter(ingestion, monkeypatch):
+    metrics_exporter = pytest.importorskip("opencensus.ext.azure.metrics_exporter")
+    monkeypatch.setenv("APPLICATIONINSIGHTS_STATSBEAT_DISABLED_ALL", "true")
+    exporter = metrics_exporter.MetricsExporter(
+        connection_string="InstrumentationKey=00000000-0000-0000-0000-000000000000;IngestionEndpoint="
+                          "http://127.0.0.1:{}".format(ingestion.server_address[1]),
+        enable_local_storage=False)
+    yield exporter
+    exporter.shutdown()
+
+
+def test_wrap_transmit_retries_exports_until_ingestion_recovers(ingestion, exporter):
+    # arrange
+    guard = Destination_Guard("app_insights", attempts=3, base_delay=0.01, sleep=MagicMock())
+    guard.wrap_transmit(exporter)
+    ingestion.failures = 2
+
+    # act
+    result = exporter._transmit([{"name": "loss"}])
+
+    # assert
+    assert result == 0
+    assert ingestion.requests == 3
+    assert ingestion.envelopes == 1
+
+
+def test_wrap_transmit_stops_sending_while_ingestion_is_down_and_sends_kept_exports_once_back(ingestion, exporter):
+    # arrange
+    clock = Clock()
+    guard = Destination_Guard("app_insights", attempts=2, failure_threshold=1, reset_timeout=60, sleep=MagicMock(),
+                              clock=clock)
+    guard.wrap_transmit(exporter)
+    ingestion.failures = 100
+
+    # act
+    for _ in range(3):
+        exporter._transmit([{"name": "loss"}])
+    requests_while_down = ingestion.requests
+    ingestion.failures = 0
+    clock.now = 60
+    exporter._transmit([{"name": "accuracy"}])
+
+    # assert
+    assert requests_while_down == 2
+    assert ingestion.envelopes == 4
+    assert guard.stats()["shed"] == 0
+
+
+def test_wrap_transmit_answers_failed_exports_with_retry_so_they_count_as_export_errors(ingestion, exporter):
+    # arrange
+    guard = Destination_Guard("app_insights", attempts=2, failure_threshold=1, sleep=MagicMock())
+    guard.wrap_transmit(exporter)
+    stats = Reporter_Stats()
+    stats.instrument_exporter(exporter)
+    ingestion.failures = 100
+
+    # act
+    results = [exporter._transmit([{"name": "loss"}]) for _ in range(3)]
+
+    # assert
+    assert results == [1, 1, 1]
+    assert (stats.exports, stats.export_errors) == (3, 3)
+    assert guard.stats()["shed"] == 3
+
+
+def test_wrap_transmit_leaves_exporter_without_transmission_as_is():
+    # arrange
+    exporter = object.__new__(type("Exporter", (), {}))
+    guard = Destination_Guard("app_insights")
+
+    # act
+    guard.wrap_transmit(exporter)
+
+    # assert
+    assert not hasattr(exporter, "_transmit")
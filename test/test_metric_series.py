@@ -0,0 +1,109 @@
+import pytest
+
+from src.metric_series import Metric_Series, lttb, min_max
+
+
+# Tests lttb function
+def test_lttb_keeps_first_and_last_points_and_threshold():
+    # arrange
+    steps = list(range(100))
+    values = [float(step % 7) for step in steps]
+
+    # act
+    selected = lttb(steps, values, 10)
+
+    # assert
+    assert len(selected) == 10
+    assert selected[0] == 0 and selected[-1] == 99
+    assert selected == sorted(selected)
+
+
+def test_lttb_keeps_a_spike():
+    # arrange
+    steps = list(range(1000))
+    values = [1.0] * 1000
+    values[500] = 100.0
+
+    # act
+    selected = lttb(steps, values, 20)
+
+    # assert
+    assert 500 in selected
+
+
+def test_lttb_keeps_all_points_under_threshold():
+    # act
+    selected = lttb([0, 1, 2], [1.0, 2.0, 3.0], 10)
+
+    # assert
+    assert selected == [0, 1, 2]
+
+
+# Tests min_max function
+def test_min_max_keeps_minimum_and_maximum_of_each_bucket():
+    # arrange
+    steps = list(range(100))
+    values = [0.0] * 100
+    values[10], values[60] = -5.0, 9.0
+
+    # act
+    selected = min_max(steps, values, 6)
+
+    # assert
+    assert {0, 10, 60, 99} <= set(selected)
+    assert len(selected) <= 6
+
+
+# Tests Metric_Series class
+def test_metric_series_initialization_raises_for_unknown_strategy():
+    # act / assert
+    with pytest.raises(ValueError):
+        Metric_Series("loss", strategy="FOO")
+
+
+def test_add_returns_downsampled_range_once_range_is_complete():
+    # arrange
+    series = Metric_Series("loss", resolution=5, range_size=50)
+
+    # act
+    points = [series.add(step, step * 0.5) for step in range(50)]
+
+    # assert
+    assert all(point == [] for point in points[:-1])
+    assert len(points[-1]) == 5
+    assert points[-1][0] == (0, 0.0)
+    assert points[-1][-1] == (49, 24.5)
+    assert len(series) == 0
+
+
+def test_finalize_returns_remaining_points_ending_on_exact_last_point():
+    # arrange
+    series = Metric_Series("loss", strategy="min_max", resolution=4, range_size=50)
+    for step in range(60):
+        series.add(step, float(step))
+
+    # act
+    points = series.finalize()
+
+    # assert
+    assert points[0] == (50, 50.0)
+    assert points[-1] == (59, 59.0)
+    assert len(points) <= 4
+    assert series.finalize() == []
+
+
+def test_add_downsamples_points_held_past_max_points():
+    # arrange
+    series = Metric_Series("loss", strategy="min_max", resolution=4, range_size=1000, max_points=100)
+
+    # act
+    points = [series.add(step, float(step % 10)) for step in range(999)]
+    held = len(series)
+    last_range = series.add(999, 50.0)
+
+    # assert
+    assert all(point == [] for point in points)
+    assert held < 100
+    assert last_range[0] == (0, 0.0)
+    assert last_range[-1] == (999, 50.0)
+    assert len(series) == 0
@@ -0,0 +1,97 @@
+import urllib.request
+import pytest
+from src.metric_sinks import Arrow_Sink, Metric_Sink, Ring_Buffer_Sink
+from src.prometheus_sink import Prometheus_Sink
+
+
+# Tests accepts method
+def test_accepts_filters_by_names_or_function():
+    # arrange
+    all_metrics = Metric_Sink()
+    named = Metric_Sink(metrics={"loss"})
+    matched = Metric_Sink(metrics=lambda name: name.startswith("step_"))
+
+    # act & assert
+    assert all_metrics.accepts("loss")
+    assert named.accepts("loss") and not named.accepts("accuracy")
+    assert matched.accepts("step_loss") and not matched.accepts("loss")
+
+
+# Tests Ring_Buffer_Sink
+def test_ring_buffer_sink_keeps_the_most_recent_values():
+    # arrange
+    sink = Ring_Buffer_Sink(capacity=3)
+
+    # act
+    for step in range(5):
+        sink.write("loss", step * 0.1, step=step)
+    sink.write("accuracy", 0.9)
+
+    # assert
+    assert [(value, step) for _, value, step in sink.values("loss")] == [(0.30000000000000004, 3), (0.4, 4)]
+    assert len(sink.records) == 3
+
+
+# Tests Arrow_Sink
+@pytest.mark.parametrize("file_name", ["metrics.parquet", "metrics.arrow"])
+def test_arrow_sink_writes_columns_in_row_groups(tmp_path, file_name):
+    # arrange
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+    import pyarrow.parquet
+    path = str(tmp_path / file_name)
+    sink = Arrow_Sink(path, batch_size=2)
+
+    # act
+    sink.write("loss", 0.5, step=1)
+    sink.write("loss", 0.4, step=2, tags={"shard": "1"})
+    sink.write("accuracy", 0.9)
+    sink.close()
+
+    # assert
+    if file_name.endswith(".parquet"):
+        table = pyarrow.parquet.read_table(path)
+        assert pyarrow.parquet.ParquetFile(path).num_row_groups == 2
+    else:
+        table = pyarrow.ipc.open_file(path).read_all()
+    assert table.column("name").to_pylist() == ["loss", "loss", "accuracy"]
+    assert table.column("value").to_pylist() == [0.5, 0.4, 0.9]
+    assert table.column("step").to_pylist() == [1, 2, None]
+    assert table.column("tags").to_pylist() == [None, '{"shard": "1"}', None]
+
+
+# Tests Prometheus_Sink
+def test_prometheus_sink_serves_last_values_as_gauges():
+    # arrange
+    sink = Prometheus_Sink(port=0, address="127.0.0.1")
+    sink.write("loss", 0.5, description="Training loss")
+    sink.write("loss", 0.4, description="Training loss")
+    sink.write("val-accuracy", 0.9, tags={"shard": 'a"b'})
+
+    # act
+    with urllib.request.urlopen("http://127.0.0.1:{}/metrics".format(sink.port)) as response:
+        text = response.read().decode()
+    sink.close()
+
+    # assert
+    lines = text.splitlines()
+    assert lines[:2] == ["# HELP loss Training loss", "# TYPE loss gauge"]
+    assert lines[2].startswith("loss 0.4 ")
+    assert lines[3] == "# TYPE val_accuracy gauge"
+    assert lines[4].startswith('val_accuracy{shard="a\\"b"} 0.9 ')
+    assert len(lines) == 5
+
+
+def test_prometheus_sink_listens_on_local_host_and_names_empty_metric():
+    # arrange
+    sink = Prometheus_Sink(port=0)
+    sink.write("", 1.0)
+
+    # act
+    text = sink.exposition()
+    sink.close()
+
+    # assert
+    assert sink.server.server_address[0] == "127.0.0.1"
+    assert text.splitlines()[0] == "# TYPE _ gauge"
+    assert text.splitlines()[1].startswith("_ 1.0 ")
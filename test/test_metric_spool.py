@@ -0,0 +1,87 @@
+import pytest
+from mock import MagicMock
+from src.metric_spool import Metric_Spool
+
+
+# Tests append method
+def test_append_writes_records_that_read_returns_in_order(tmp_path):
+    # arrange
+    path = str(tmp_path / "spool.jsonl")
+    spool = Metric_Spool(path)
+
+    # act
+    spool.append("report_metric", name="FOO", value=1)
+    spool.append("report_list", name="BAR", value=[1, 2])
+    spool.close()
+
+    # assert
+    assert list(Metric_Spool.read(path)) == [("report_metric", {"name": "FOO", "value": 1}),
+                                             ("report_list", {"name": "BAR", "value": [1, 2]})]
+
+
+def test_append_keeps_existing_records(tmp_path):
+    # arrange
+    path = str(tmp_path / "spool.jsonl")
+    spool = Metric_Spool(path)
+    spool.append("report_metric", name="FOO", value=1)
+    spool.close()
+
+    # act
+    spool = Metric_Spool(path)
+    spool.append("report_metric", name="FOO", value=2)
+    spool.close()
+
+    # assert
+    assert len(list(Metric_Spool.read(path))) == 2
+
+
+def test_append_converts_numpy_values(tmp_path):
+    # arrange
+    numpy = pytest.importorskip("numpy")
+    path = str(tmp_path / "spool.jsonl")
+    spool = Metric_Spool(path)
+
+    # act
+    spool.append("report_metric", name="FOO", value=numpy.float32(0.5))
+    spool.append("report_metric", name="BAR", value=numpy.int64(2))
+    spool.append("report_table", name="BAZ", value={"x": numpy.array([1, 2]), "y": numpy.array([[0.5], [1.5]])})
+    spool.close()
+
+    # assert
+    assert list(Metric_Spool.read(path)) == [("report_metric", {"name": "FOO", "value": 0.5}),
+                                             ("report_metric", {"name": "BAR", "value": 2}),
+                                             ("report_table", {"name": "BAZ", "value": {"x": [1, 2],
+                                                                                        "y": [[0.5], [1.5]]}})]
+
+
+# Tests read method
+def test_read_skips_record_cut_short(tmp_path):
+    # arrange
+    path = tmp_path / "spool.jsonl"
+    path.write_text('{"time":1,"method":"report_metric","kwargs":{"name":"FOO","value":1}}\n{"time":2,"meth')
+
+    # act
+    records = list(Metric_Spool.read(str(path)))
+
+    # assert
+    assert records == [("report_metric", {"name": "FOO", "value": 1})]
+
+
+# Tests replay method
+def test_replay_calls_reporter_methods_and_flushes(tmp_path):
+    # arrange
+    path = str(tmp_path / "spool.jsonl")
+    spool = Metric_Spool(path)
+    spool.append("report_metric", name="FOO", value=1, description="", report_to_parent=True)
+    spool.append("report_row", name="BAR", report_to_parent=False, x=1, y=2)
+    spool.close()
+    reporter = MagicMock()
+
+    # act
+    count = Metric_Spool.replay(path, reporter)
+
+    # assert
+    assert count == 2
+    reporter.report_metric.assert_called_once_with(name="FOO", value=1, description="", report_to_parent=True)
+    reporter.report_row.assert_called_once_with(name="BAR", report_to_parent=False, x=1, y=2)
+    assert reporter.flush.call_count == 1
@@ -0,0 +1,106 @@
+import pytest
+from src.metric_summary import Metric_Summary
+
+
+# Tests results method
+def test_results_returns_count_for_count_aggregation():
+    # arrange
+    summary = Metric_Summary("count")
+
+    # act
+    for value in [1, 2, 3]:
+        summary.add(value)
+
+    # assert
+    assert summary.results() == {"count": 3}
+
+
+def test_results_returns_sum_for_sum_aggregation():
+    # arrange
+    summary = Metric_Summary("sum")
+
+    # act
+    for value in [1, 2, 3]:
+        summary.add(value)
+
+    # assert
+    assert summary.results() == {"sum": 6}
+
+
+def test_results_returns_count_min_max_mean_for_summary_aggregation():
+    # arrange
+    summary = Metric_Summary("summary")
+
+    # act
+    for value in [4, 1, 7]:
+        summary.add(value)
+
+    # assert
+    assert summary.results() == {"count": 3, "min": 1, "max": 7, "mean": 4}
+
+
+def test_results_returns_percentiles_for_distribution_aggregation():
+    # arrange
+    summary = Metric_Summary("distribution", buckets=(10, 20, 30))
+
+    # act
+    for value in range(1, 101):
+        summary.add(value)
+    results = summary.results()
+
+    # assert
+    assert results["count"] == 100
+    assert results["p50"] == pytest.approx(50, abs=1)
+    assert results["p99"] == pytest.approx(99, abs=1)
+    assert results["min"] <= results["p50"] <= results["p95"] <= results["p99"] <= results["max"]
+
+
+def test_results_only_has_zero_count_after_reset():
+    # arrange
+    summary = Metric_Summary("summary")
+    summary.add(1)
+
+    # act
+    summary.reset()
+
+    # assert
+    assert summary.results() == {"count": 0}
+
+
+def test_results_returns_zero_count_and_sum_for_empty_interval():
+    # arrange
+    count, total = Metric_Summary("count"), Metric_Summary("sum")
+    count.add(1)
+    total.add(2)
+
+    # act
+    count.reset()
+    total.reset()
+
+    # assert
+    assert count.results() == {"count": 0}
+    assert total.results() == {"sum": 0.0}
+
+
+def test_init_raises_for_last_value_aggregation():
+    # act & assert
+    with pytest.raises(ValueError):
+        Metric_Summary("last_value")
+
+
+# Tests add_values method
+def test_add_values_aggregates_numpy_array_like_single_values():
+    # arrange
+    numpy = pytest.importorskip("numpy")
+    values = [0.3, 1.5, 0.7, 4.0, 12.0]
+    summary = Metric_Summary("distribution", buckets=(0.5, 1, 5))
+    expected = Metric_Summary("distribution", buckets=(0.5, 1, 5))
+
+    # act
+    summary.add_values(numpy.array(values))
+    for value in values:
+        expected.add(value)
+
+    # assert
+    assert summary.results() == expected.results()
+    assert summary.bucket_counts == expected.bucket_counts
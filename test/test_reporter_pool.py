@@ -0,0 +1,113 @@
+from mock import MagicMock, patch
+from src.reporter_pool import Reporter_Pool
+
+
+# Tests Reporter_Pool class
+@patch("src.reporter_pool.Env")
+@patch("src.reporter_pool.metrics_exporter")
+@patch("src.reporter_pool.stats_module")
+def test_acquire_creates_and_registers_one_exporter_for_all_reporters(mock_stats, mock_exporter, mock_env):
+    # arrange
+    pool = Reporter_Pool(export_interval=15)
+
+    # act
+    first = pool.acquire(MagicMock())
+    second = pool.acquire(MagicMock())
+
+    # assert
+    assert first is second
+    assert mock_exporter.new_metrics_exporter.call_count == 1
+    assert mock_exporter.new_metrics_exporter.call_args[1]["export_interval"] == 15
+    mock_stats.stats.view_manager.register_exporter.assert_called_once_with(first)
+    assert mock_env.return_value.read_env.call_count == 1
+    assert len(pool) == 2
+
+
+@patch("src.reporter_pool.Env")
+@patch("src.reporter_pool.metrics_exporter")
+@patch("src.reporter_pool.stats_module")
+def test_acquire_lets_latest_reporter_process_the_export_batches(mock_stats, mock_exporter, mock_env):
+    # arrange
+    pool = Reporter_Pool()
+    first, second = MagicMock(), MagicMock()
+    exporter = pool.acquire(first)
+
+    # act
+    pool.acquire(second)
+
+    # assert
+    assert exporter.apply_telemetry_processors == second.process_batch
+    pool.release(second)
+    assert exporter.apply_telemetry_processors == first.process_batch
+
+
+@patch("src.reporter_pool.Env")
+@patch("src.reporter_pool.metrics_exporter")
+@patch("src.reporter_pool.stats_module")
+@patch("src.reporter_pool.condensed_binocular.Condensed_Binocular.shutdown_exporter")
+def test_release_shuts_down_exporter_once_last_reporter_is_released(mock_shutdown, mock_stats, mock_exporter, mock_env):
+    # arrange
+    pool = Reporter_Pool()
+    first, second = MagicMock(), MagicMock()
+    exporter = pool.acquire(first)
+    pool.acquire(second)
+
+    # act
+    pool.release(first)
+    mock_shutdown.assert_not_called()
+    pool.release(second)
+    pool.release(second)
+
+    # assert
+    mock_shutdown.assert_called_once_with(exporter)
+    assert pool.exporter is None
+    assert pool.acquire(first) is not None
+    assert mock_exporter.new_metrics_exporter.call_count == 2
+
+
+@patch("src.reporter_pool.Env")
+@patch("src.reporter_pool.metrics_exporter")
+def test_release_drops_the_time_series_of_closed_runs(mock_exporter, mock_env):
+    # arrange
+    from src.reporter_pool import stats_module
+    pool = Reporter_Pool()
+    name = "pooled_runs_loss"
+    open_reporter = pool.reporter(MagicMock(), summary_interval=60)
+    open_reporter.report_metric(name, 1.0)
+
+    # act
+    for index in range(200):
+        reporter = pool.reporter(MagicMock(), summary_interval=60)
+        reporter.report_metric(name, float(index))
+        reporter.close()
+
+    # assert
+    series = [metric.time_series for metric in stats_module.stats.get_metrics()
+              if metric.descriptor.name == name]
+    assert len(series) == 1 and len(series[0]) == 1
+    open_reporter.close()
+
+
+@patch("src.reporter_pool.Env")
+def test_pool_guards_app_insights_exports_with_its_retry_settings(mock_env):
+    # act
+    pool = Reporter_Pool(retry_attempts=1, retry_max_delay=2.0, failure_threshold=3, reset_timeout=4.0)
+
+    # assert
+    assert pool.guard.attempts == 1
+    assert pool.guard.max_delay == 2.0
+    assert pool.guard.breaker.failure_threshold == 3
+    assert pool.guard.breaker.reset_timeout == 4.0
+
+
+@patch("src.reporter_pool.Env")
+def test_shared_returns_the_same_pool(mock_env):
+    # arrange
+    Reporter_Pool.shared_pool = None
+
+    # act
+    pool = Reporter_Pool.shared()
+
+    # assert
+    assert Reporter_Pool.shared() is pool
+    Reporter_Pool.shared_pool = None
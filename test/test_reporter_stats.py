@@ -0,0 +1,178 @@
+import time
+from mock import MagicMock
+from src.reporter_stats import Reporter_Stats, percentile
+
+
+class Fake_Reporter:
+    def __init__(self):
+        self.logged = []
+
+    def report_metric(self, name, value):
+        time.sleep(0.002)
+        self.log_to_aml(name, value)
+        self.record_app_insights(name, value)
+
+    def report_metrics(self, values):
+        for name, value in values.items():
+            self.report_metric(name, value)
+
+    def report_metric_with_run_tagging(self, name, value):
+        pass
+
+    def report_step(self, name, value, step):
+        pass
+
+    def report_list(self, name, value):
+        pass
+
+    def report_row(self, name, **kwargs):
+        pass
+
+    def report_table(self, name, value):
+        pass
+
+    def report_image(self, name, path=None):
+        pass
+
+    def process_batch(self, envelopes):
+        return envelopes
+
+    def log_to_aml(self, name, value):
+        time.sleep(0.004)
+        self.logged.append((name, value))
+
+    def upload_image(self, name, path):
+        pass
+
+    def record_app_insights(self, name, value):
+        self.record_last_value(name, value)
+
+    def record_last_value(self, name, value):
+        time.sleep(0.001)
+
+    def record_last_values(self, values):
+        pass
+
+    def record_summaries(self):
+        pass
+
+
+# Tests percentile function
+def test_percentile_uses_nearest_rank():
+    # arrange
+    values = list(range(1, 101))
+
+    # act & assert
+    assert [percentile(values, rank) for rank in (50, 95, 99, 100)] == [50, 95, 99, 100]
+    assert percentile([7], 50) == 7
+
+
+# Tests instrument method
+def test_instrument_splits_latency_into_components():
+    # arrange
+    stats = Reporter_Stats()
+    reporter = Fake_Reporter()
+    stats.instrument(reporter)
+
+    # act
+    reporter.report_metric("FOO", 1)
+
+    # assert
+    latency = stats.results()["latency_ms"]["report_metric"]
+    assert latency["aml"]["p50"] >= 4
+    assert 1 <= latency["app_insights"]["p50"] < 4
+    assert latency["local"]["p50"] >= 2
+    assert latency["total"]["p50"] >= latency["aml"]["p50"] + latency["app_insights"]["p50"]
+    assert reporter.logged == [("FOO", 1)]
+
+
+def test_instrument_counts_nested_calls_once():
+    # arrange
+    stats = Reporter_Stats()
+    reporter = Fake_Reporter()
+    stats.instrument(reporter)
+
+    # act
+    reporter.report_metrics({"FOO": 1, "BAR": 2})
+    reporter.process_batch([])
+
+    # assert
+    assert stats.results()["calls"] == {"report_metrics": 1, "process_batch": 1}
+
+
+def test_instrument_does_not_record_components_outside_calls():
+    # arrange
+    stats = Reporter_Stats()
+    reporter = Fake_Reporter()
+    stats.instrument(reporter)
+
+    # act
+    reporter.log_to_aml("FOO", 1)
+
+    # assert
+    assert stats.results()["calls"] == {}
+
+
+def test_instrument_keeps_only_window_calls():
+    # arrange
+    stats = Reporter_Stats(window=2)
+    reporter = Fake_Reporter()
+    stats.instrument(reporter)
+
+    # act
+    for index in range(5):
+        reporter.report_list("FOO", [index])
+
+    # assert
+    assert stats.calls["report_list"] == 5
+    assert len(stats.latencies["report_list"]["total"]) == 2
+
+
+def test_instrument_emits_once_per_interval():
+    # arrange
+    emit = MagicMock()
+    stats = Reporter_Stats(emit=emit, emit_interval=0)
+    reporter = Fake_Reporter()
+    stats.instrument(reporter)
+
+    # act
+    reporter.report_list("FOO", [1])
+    reporter.process_batch([])
+
+    # assert
+    assert emit.call_count == 1
+
+
+# Tests instrument_exporter method
+def test_instrument_exporter_counts_failed_exports():
+    # arrange
+    stats = Reporter_Stats()
+    exporter = MagicMock()
+    exporter._transmit.side_effect = [0, 1, 2]
+
+    # act
+    stats.instrument_exporter(exporter)
+    results = [exporter._transmit([]) for _ in range(3)]
+
+    # assert
+    assert results == [0, 1, 2]
+    assert stats.results()["exports"] == 3
+    assert stats.results()["export_errors"] == 2
+
+
+# Tests to_metrics method
+def test_to_metrics_flattens_statistics():
+    # arrange
+    stats = {"calls": {"report_metric": 3}, "latency_ms": {"report_metric": {"aml": {"p95": 1.5}}},
+             "queue_depth": {"dispatcher": 2}, "exports": 4, "export_errors": 1, "dropped": 0}
+
+    # act
+    metrics = Reporter_Stats.to_metrics(stats)
+
+    # assert
+    assert metrics == {"condensed_binocular_report_metric_calls": 3,
+                       "condensed_binocular_report_metric_aml_p95_ms": 1.5,
+                       "condensed_binocular_dispatcher_queue_depth": 2,
+                       "condensed_binocular_exports": 4,
+                       "condensed_binocular_export_errors": 1,
+                       "condensed_binocular_dropped": 0}
@@ -0,0 +1,45 @@
+import threading
+from src.sweeper import Sweeper
+
+
+# Tests Sweeper class
+def test_sweeper_calls_function_once_per_interval_until_closed():
+    # arrange
+    called = threading.Event()
+    calls = []
+
+    def function():
+        calls.append(None)
+        if len(calls) == 2:
+            called.set()
+
+    # act
+    sweeper = Sweeper(function, interval=0.01)
+    called.wait(5)
+    sweeper.close()
+    count = len(calls)
+
+    # assert
+    assert count >= 2
+    assert not sweeper.thread.is_alive()
+    assert len(calls) == count
+
+
+def test_sweeper_keeps_running_if_function_raises():
+    # arrange
+    called = threading.Event()
+    calls = []
+
+    def function():
+        calls.append(None)
+        if len(calls) == 2:
+            called.set()
+        raise ValueError("FOO")
+
+    # act
+    sweeper = Sweeper(function, interval=0.01)
+    called.wait(5)
+    sweeper.close()
+
+    # assert
+    assert len(calls) >= 2
@@ -0,0 +1,93 @@
+import pytest
+from mock import MagicMock, call
+from src.table_stream import Table_Stream_Writer
+
+
+# Tests write_row method
+def test_write_row_reports_chunks_of_chunk_rows():
+    # arrange
+    reporter = MagicMock()
+    writer = Table_Stream_Writer(reporter, "FOO", chunk_rows=2)
+
+    # act
+    with writer:
+        writer.write_rows({"x": index, "y": index * 10} for index in range(5))
+
+    # assert
+    assert reporter.report_table.call_args_list == [
+        call("FOO", {"x": [0, 1], "y": [0, 10]}, report_to_parent=False),
+        call("FOO", {"x": [2, 3], "y": [20, 30]}, report_to_parent=False),
+        call("FOO", {"x": [4], "y": [40]}, report_to_parent=False)]
+    assert writer.rows_written == 5
+    assert writer.chunks_written == 3
+
+
+def test_write_row_raises_for_different_columns():
+    # arrange
+    writer = Table_Stream_Writer(MagicMock(), "FOO")
+    writer.write_row(x=1)
+
+    # act & assert
+    with pytest.raises(ValueError):
+        writer.write_row(y=1)
+
+
+# Tests write_columns method
+def test_write_columns_splits_numpy_arrays_into_chunks():
+    # arrange
+    numpy = pytest.importorskip("numpy")
+    reporter = MagicMock()
+    writer = Table_Stream_Writer(reporter, "FOO", chunk_rows=3)
+    writer.write_row(x=-1, y=-1.0)
+
+    # act
+    writer.write_columns({"x": numpy.arange(4), "y": numpy.arange(4) / 2})
+    writer.close()
+
+    # assert
+    assert reporter.report_table.call_args_list == [
+        call("FOO", {"x": [-1, 0, 1], "y": [-1.0, 0.0, 0.5]}, report_to_parent=False),
+        call("FOO", {"x": [2, 3], "y": [1.0, 1.5]}, report_to_parent=False)]
+
+
+def test_write_columns_raises_for_columns_of_different_lengths():
+    # arrange
+    reporter = MagicMock()
+    writer = Table_Stream_Writer(reporter, "FOO")
+
+    # act & assert
+    with pytest.raises(ValueError):
+        writer.write_columns({"x": [1, 2, 3], "y": [10, 20]})
+    writer.close()
+    reporter.report_table.assert_not_called()
+
+
+def test_write_columns_slices_arrow_like_tables():
+    # arrange
+    reporter = MagicMock()
+    writer = Table_Stream_Writer(reporter, "FOO", chunk_rows=2)
+    table = MagicMock(num_rows=3)
+    table.slice.side_effect = lambda offset, length: MagicMock(
+        to_pydict=lambda: {"x": list(range(3))[offset:offset + length]})
+
+    # act
+    writer.write_columns(table)
+    writer.close()
+
+    # assert
+    assert reporter.report_table.call_args_list == [call("FOO", {"x": [0, 1]}, report_to_parent=False),
+                                                    call("FOO", {"x": [2]}, report_to_parent=False)]
+
+
+# Tests flush method
+def test_flush_calls_progress_with_rows_written():
+    # arrange
+    progress = MagicMock()
+    writer = Table_Stream_Writer(MagicMock(), "FOO", progress=progress)
+    writer.write_row(x=1)
+
+    # act
+    writer.flush()
+
+    # assert
+    assert progress.call_args[0][0] == 1
@@ -0,0 +1,161 @@
+import threading
+from mock import MagicMock
+from src.thread_buffers import Thread_Buffers
+
+
+class Fake_Reporter:
+    def __init__(self):
+        self.calls = []
+        self.threads = set()
+
+    def report_metric(self, name, value):
+        self.calls.append((name, value))
+        self.threads.add(threading.current_thread().name)
+
+    def report_metric_with_run_tagging(self, name, value):
+        self.calls.append((name, value))
+
+    def report_row(self, name, **kwargs):
+        self.calls.append((name, kwargs))
+
+
+# Tests install method
+def test_install_buffers_calls_until_flush():
+    # arrange
+    buffers = Thread_Buffers(interval=60)
+    reporter = Fake_Reporter()
+    buffers.install(reporter)
+
+    # act
+    reporter.report_metric("FOO", 1)
+    reporter.report_row("BAR", x=1)
+    pending = buffers.pending()
+    buffers.flush()
+
+    # assert
+    assert pending == 2
+    assert reporter.calls == [("FOO", 1), ("BAR", {"x": 1})]
+    buffers.close()
+
+
+def test_install_reports_calls_of_each_thread_in_order_from_the_flusher():
+    # arrange
+    buffers = Thread_Buffers(interval=0.01)
+    reporter = Fake_Reporter()
+    buffers.install(reporter)
+
+    def work(name):
+        for value in range(1000):
+            reporter.report_metric(name, value)
+
+    threads = [threading.Thread(target=work, args=("FOO_%d" % index,)) for index in range(4)]
+
+    # act
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    buffers.close()
+
+    # assert
+    assert len(reporter.calls) == 4000
+    for index in range(4):
+        name = "FOO_%d" % index
+        assert [value for call_name, value in reporter.calls if call_name == name] == list(range(1000))
+    assert reporter.threads <= {"condensed-binocular-flusher", threading.current_thread().name}
+    assert buffers.buffers == []
+
+
+def test_buffered_copies_mapping_arguments():
+    # arrange
+    buffers = Thread_Buffers(interval=60)
+    function = MagicMock()
+    tags = {"region": "westeurope"}
+
+    # act
+    buffers.buffered(function)("FOO", 1, tags, tags=tags)
+    tags["region"] = "eastus"
+    buffers.flush()
+
+    # assert
+    function.assert_called_once_with("FOO", 1, {"region": "westeurope"}, tags={"region": "westeurope"})
+    buffers.close()
+
+
+def test_buffered_drops_newest_calls_once_buffer_is_full():
+    # arrange
+    buffers = Thread_Buffers(interval=60, capacity=2, backpressure="drop_newest")
+    function = MagicMock()
+
+    # act
+    for value in range(4):
+        buffers.buffered(function)(value)
+    buffers.flush()
+
+    # assert
+    assert [call[0][0] for call in function.call_args_list] == [0, 1]
+    assert buffers.dropped == 2
+    buffers.close()
+
+
+def test_buffered_drops_oldest_calls_once_buffer_is_full():
+    # arrange
+    buffers = Thread_Buffers(interval=60, capacity=2, backpressure="drop_oldest")
+    function = MagicMock()
+
+    # act
+    for value in range(4):
+        buffers.buffered(function)(value)
+    buffers.flush()
+
+    # assert
+    assert [call[0][0] for call in function.call_args_list] == [2, 3]
+    assert buffers.dropped == 2
+    buffers.close()
+
+
+def test_buffered_flushes_on_calling_thread_once_buffer_is_full_if_block():
+    # arrange
+    buffers = Thread_Buffers(interval=60, capacity=2)
+    function = MagicMock()
+
+    # act
+    for value in range(3):
+        buffers.buffered(function)(value)
+    pending = buffers.pending()
+
+    # assert
+    assert [call[0][0] for call in function.call_args_list] == [0, 1]
+    assert pending == 1
+    assert buffers.dropped == 0
+    buffers.close()
+
+
+def test_flush_logs_failing_calls_and_runs_the_others():
+    # arrange
+    buffers = Thread_Buffers(interval=60)
+    failing = MagicMock(side_effect=ValueError("boom"))
+    succeeding = MagicMock()
+
+    # act
+    buffers.buffered(failing)(1)
+    buffers.buffered(succeeding)(2)
+    buffers.flush()
+
+    # assert
+    succeeding.assert_called_once_with(2)
+    buffers.close()
+
+
+def test_close_reports_later_calls_right_away():
+    # arrange
+    buffers = Thread_Buffers(interval=60)
+    function = MagicMock()
+    buffered_function = buffers.buffered(function)
+    buffers.close()
+
+    # act
+    buffered_function(1)
+
+    # assert
+    function.assert_called_once_with(1)